@@ -0,0 +1,21 @@
+"""
+Benchmark suite for the Attendance System and QR Code Generator
+
+    python -m benchmarks.run                       # full run -> JSON report
+    python -m benchmarks.run --quick               # smaller inputs
+    python -m benchmarks.run --compare old.json    # diff against an older report
+
+Inputs are synthetic (see benchmarks.synthetic): SF2-shaped workbooks
+with header/filler rows that must be filtered, and camera-like frames
+with rendered QR codes, noise and blur.
+"""
+
+import sys
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parent.parent / "src" / "attendanceapp"
+
+# The app modules import each other by plain module name when they are
+# not loaded as a package (same as running the app from the sources)
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
@@ -0,0 +1,106 @@
+"""
+Microbenchmark: student-name validation, before vs after
+
+Compares the old per-call loop (`for pattern in excluded_patterns:
+if pattern in name_upper`) with the shared compiled + memoized
+validator in attendanceapp/name_filter.py.
+
+Usage:
+    python benchmarks/bench_name_filter.py
+"""
+
+import re
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "attendanceapp"))
+
+import name_filter  # noqa: E402
+
+
+def legacy_is_valid_student_name(name):
+    """The pre-compiled-filter implementation, kept for comparison"""
+    if not name or not isinstance(name, str):
+        return False
+    
+    name = name.strip()
+    if len(name) < 2:
+        return False
+    
+    name_upper = name.upper()
+    
+    excluded_patterns = list(name_filter.EXCLUDED_PATTERNS)
+    for pattern in excluded_patterns:
+        if pattern in name_upper:
+            return False
+    
+    if not any(c.isalpha() for c in name):
+        return False
+    
+    if name.replace('.', '').replace(',', '').replace(' ', '').isdigit():
+        return False
+    
+    if re.match(r'^\d{1,2}[/-]\d{1,2}[/-]\d{2,4}$', name):
+        return False
+    
+    if not any(c.isalnum() for c in name):
+        return False
+    
+    return True
+
+
+SAMPLES = [
+    "DELA CRUZ, JUAN SANTOS",
+    "SANTOS, MARIA CLARA REYES",
+    "GARCIA, JOSE MIGUEL",
+    "REYES, ANNA MARIE T.",
+    "BAUTISTA, CARLO",
+    "TOTAL FOR THE MONTH",
+    "=SUMIF(C13:C50,\"✓\")",
+    "12/05/2025",
+    "MALE | TOTAL Per Day",
+    "Average Daily Attendance",
+    "School Form 2 (SF2) Daily Attendance Report of Learners",
+    "123",
+]
+
+
+def check_equivalence():
+    mismatches = [s for s in SAMPLES
+                  if legacy_is_valid_student_name(s) != name_filter.is_valid_student_name(s)]
+    if mismatches:
+        raise SystemExit(f"Verdicts differ for: {mismatches}")
+
+
+def bench(label, func, samples, number):
+    def run():
+        for sample in samples:
+            func(sample)
+    
+    seconds = min(timeit.repeat(run, number=number, repeat=5))
+    per_call_us = seconds / (number * len(samples)) * 1e6
+    print(f"  {label:<38s} {per_call_us:8.3f} µs/call")
+    return per_call_us
+
+
+def main():
+    check_equivalence()
+    number = 2000
+    
+    print("is_valid_student_name - per-call cost")
+    before = bench("before (pattern loop)", legacy_is_valid_student_name, SAMPLES, number)
+    
+    compiled = name_filter._is_valid_name.__wrapped__
+    stripped = [s.strip() for s in SAMPLES]
+    after_cold = bench("after, compiled regex (cache miss)", compiled, stripped, number)
+    
+    name_filter._is_valid_name.cache_clear()
+    after_hot = bench("after, memoized (scanner repeats)", name_filter.is_valid_student_name,
+                      SAMPLES, number)
+    
+    print(f"\n  speedup: {before / after_cold:.1f}x cold, {before / after_hot:.1f}x memoized")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,237 @@
+"""
+Run the benchmark suite and write a JSON report
+
+Usage:
+    python -m benchmarks.run [--quick] [--output report.json] [--compare old.json]
+
+Groups (each is skipped, with the reason in the report, if a dependency
+is missing):
+- parse:       read_sf2 (cold) and RosterCache hit at 50/500/5000 rows
+- name_filter: is_valid_student_name per call (see bench_name_filter)
+- decode:      decode_frame per synthetic frame with 0, 1 and 3 codes
+- autosave:    AutosaveWorker flush latency for 1 and 10 marks
+- qr:          QR generation, one process vs the CPU-count pool
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from benchmarks import APP_DIR
+
+
+def timed(func, repeat=3):
+    """Best wall time of `repeat` calls, in seconds"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+class Report:
+    """Flat name -> {value, unit, better} results plus run metadata"""
+    
+    def __init__(self):
+        self.results = {}
+        self.skipped = {}
+    
+    def add(self, name, value, unit, better="lower"):
+        self.results[name] = {"value": round(value, 4), "unit": unit, "better": better}
+        print(f"  {name:<44s} {value:12.3f} {unit}")
+    
+    def skip(self, group, reason):
+        self.skipped[group] = reason
+        print(f"  ⊘  {group} skipped: {reason}")
+    
+    def to_json(self):
+        return {
+            "meta": {
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "git": git_revision(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+            },
+            "results": self.results,
+            "skipped": self.skipped,
+        }
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=APP_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def bench_parse(report, workdir, sizes=None):
+    from benchmarks.synthetic import SIZES, make_sf2_workbook
+    from sf2_reader import read_sf2
+    from roster_cache import RosterCache
+    
+    cache = RosterCache()
+    for rows in sizes or SIZES:
+        path = workdir / f"sf2_{rows}.xlsx"
+        make_sf2_workbook(path, rows)
+        
+        data = read_sf2(path)
+        assert len(data.students) == rows, f"parsed {len(data.students)} of {rows} learners"
+        report.add(f"parse.read_sf2.{rows}_rows", timed(lambda: read_sf2(path)) * 1000, "ms")
+        
+        cache.read(path)  # Store
+        report.add(f"parse.cache_hit.{rows}_rows", timed(lambda: cache.read(path)) * 1000, "ms")
+
+
+def bench_name_filter(report, quick):
+    from benchmarks import bench_name_filter as bnf
+    import name_filter
+    
+    bnf.check_equivalence()
+    number = 200 if quick else 2000
+    report.add("name_filter.legacy",
+               bnf.bench("before (pattern loop)", bnf.legacy_is_valid_student_name, bnf.SAMPLES, number), "µs")
+    compiled = name_filter._is_valid_name.__wrapped__
+    report.add("name_filter.compiled",
+               bnf.bench("compiled regex", compiled, [s.strip() for s in bnf.SAMPLES], number), "µs")
+    name_filter._is_valid_name.cache_clear()
+    report.add("name_filter.memoized",
+               bnf.bench("memoized", name_filter.is_valid_student_name, bnf.SAMPLES, number), "µs")
+
+
+def bench_decode(report, quick):
+    from benchmarks.synthetic import make_qr_frame, student_names
+    from scan_pipeline import decode_frame
+    
+    seeds = range(3 if quick else 10)
+    names = student_names(3)
+    for count in (0, 1, 3):
+        frames = [make_qr_frame(names[:count], seed=seed) for seed in seeds]
+        found = 0
+        start = time.perf_counter()
+        for frame in frames:
+            found += len(decode_frame(frame))
+        per_frame = (time.perf_counter() - start) / len(frames)
+        report.add(f"decode.frame.{count}_codes", per_frame * 1000, "ms")
+        if count:
+            report.add(f"decode.detection_rate.{count}_codes",
+                       found / (count * len(frames)) * 100, "%", better="higher")
+
+
+def bench_autosave(report, workdir, quick):
+    from benchmarks.synthetic import make_sf2_workbook
+    from persistence import AutosaveWorker
+    
+    source = workdir / "sf2_autosave.xlsx"
+    make_sf2_workbook(source, 500, mark_rate=0.0)
+    repeat = 2 if quick else 5
+    
+    for marks in (1, 10):
+        path = workdir / f"sf2_autosave_{marks}.xlsx"
+        shutil.copy(source, path)
+        worker = AutosaveWorker(path, interval=3600, batch_size=10 ** 6)
+        latencies = []
+        row = 13
+        try:
+            for _ in range(repeat):
+                start = time.perf_counter()
+                for _ in range(marks):
+                    worker.submit(f"learner {row}", row, 4)
+                    row += 1
+                worker.flush(timeout=120)
+                latencies.append(time.perf_counter() - start)
+        finally:
+            worker.stop()
+        # First save also opens the editable workbook - report it separately
+        report.add(f"autosave.first_flush.{marks}_marks", latencies[0] * 1000, "ms")
+        report.add(f"autosave.flush.{marks}_marks", statistics.median(latencies[1:]) * 1000, "ms")
+
+
+def bench_qr(report, workdir, quick):
+    from benchmarks.synthetic import student_names
+    from qr_render import QRBatch, render_chunk, qr_filename
+    
+    count = 40 if quick else 200
+    out = workdir / "qr"
+    out.mkdir(exist_ok=True)
+    jobs = [(name, name, out / qr_filename(name)) for name in student_names(count)]
+    
+    start = time.perf_counter()
+    render_chunk(jobs)
+    report.add("qr.render.sequential", count / (time.perf_counter() - start), "codes/s", better="higher")
+    
+    batch = QRBatch(jobs, mode="process")
+    start = time.perf_counter()
+    for future in batch.start():
+        future.result()
+    elapsed = time.perf_counter() - start
+    batch.shutdown()
+    report.add(f"qr.render.pool_{batch.workers}_{batch.mode}", count / elapsed, "codes/s", better="higher")
+
+
+def compare(old, new):
+    """Print new vs old for every result the two reports share"""
+    print(f"\nCOMPARISON (old: {old['meta'].get('git')} {old['meta'].get('timestamp')})")
+    print(f"  {'benchmark':<44s} {'old':>12s} {'new':>12s} {'change':>9s}")
+    for name, result in new["results"].items():
+        before = old["results"].get(name)
+        if not before or not before["value"]:
+            continue
+        change = (result["value"] - before["value"]) / before["value"] * 100
+        worse = change > 10 if result["better"] == "lower" else change < -10
+        flag = "  ⚠️ slower" if worse else ""
+        print(f"  {name:<44s} {before['value']:12.3f} {result['value']:12.3f} {change:+8.1f}%{flag}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Attendance System benchmark suite")
+    parser.add_argument("--quick", action="store_true", help="Smaller inputs and fewer repeats")
+    parser.add_argument("--output", type=Path,
+                        default=Path(f"benchmark-{datetime.now():%Y%m%d-%H%M%S}.json"),
+                        help="Where to write the JSON report")
+    parser.add_argument("--compare", type=Path, help="Older JSON report to compare against")
+    args = parser.parse_args(argv)
+    
+    sizes = (50, 500) if args.quick else None
+    report = Report()
+    with tempfile.TemporaryDirectory(prefix="sf2-bench-") as temp:
+        workdir = Path(temp)
+        groups = [
+            ("parse", lambda: bench_parse(report, workdir, sizes)),
+            ("name_filter", lambda: bench_name_filter(report, args.quick)),
+            ("decode", lambda: bench_decode(report, args.quick)),
+            ("autosave", lambda: bench_autosave(report, workdir, args.quick)),
+            ("qr", lambda: bench_qr(report, workdir, args.quick)),
+        ]
+        for group, run in groups:
+            print(f"\n[{group}]")
+            try:
+                run()
+            except ImportError as e:
+                report.skip(group, f"missing dependency: {e.name or e}")
+    
+    data = report.to_json()
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    print(f"\n📄 Report written to {args.output}")
+    
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            compare(json.load(f), data)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""
+Synthetic inputs for the benchmarks
+
+- make_sf2_workbook: SF2-shaped workbook with the school header (incl.
+  Section), Row 11 days, Row 12 day letters, learner rows from Row 13
+  (numbers in A, names in B, some ✓ marks) and the filler rows a real
+  SF2 has (MALE/FEMALE totals, formulas, summary and guidelines text)
+  that the name filter must reject.
+- make_qr_frame: 640x480 BGR camera-like frame with 0..N QR codes,
+  uneven lighting, sensor noise and blur.
+"""
+
+import itertools
+import random
+
+from openpyxl import Workbook
+
+from benchmarks import APP_DIR  # noqa: F401  (puts the app modules on sys.path)
+from name_filter import is_valid_student_name
+from sf2_reader import DATE_ROW, FIRST_STUDENT_ROW, MARK
+
+
+SIZES = (50, 500, 5000)
+
+LAST_NAMES = ("SANTOS", "REYES", "CRUZ", "BAUTISTA", "GARCIA", "MENDOZA", "TORRES",
+              "TOMAS", "ANDRES", "CASTILLO", "FLORES", "VILLANUEVA", "RAMOS", "AQUINO",
+              "NAVARRO", "SALAZAR", "MERCADO", "AGUILAR", "PASCUAL", "DIZON", "LUNA",
+              "ROXAS", "LOPEZ", "CABRERA", "GONZAGA", "BALTAZAR", "CORPUZ", "LACSON")
+FIRST_NAMES = ("JUAN", "JOSE", "MARIA", "ANA", "CARLO", "MIGUEL", "PAOLO", "ANGELA",
+               "BEA", "LUIS", "KIM", "RICO", "GINA", "JOY", "ELLA", "MARCO", "LEA",
+               "RAMON", "TESS", "BRYAN")
+INITIALS = "ABCDEFGHJKLMPRSTUVY"
+
+FILLER_ROWS = (
+    "MALE | TOTAL Per Day",
+    "FEMALE | TOTAL Per Day",
+    "COMBINED TOTAL PER DAY",
+    '=SUMIF(D13:D60,"✓")',
+    "12/05/2025",
+    "GUIDELINES:",
+    "1. The attendance shall be accomplished daily. Refer to the codes for checking learners' attendance.",
+    "Average Daily Attendance",
+    "Percentage of Attendance for the month",
+    "I certify that this is a true and correct report.",
+    "(Signature of Teacher over Printed Name)",
+)
+
+DAY_LETTERS = ("M", "T", "W", "TH", "F")
+FIRST_DATE_COL = 4  # Column D
+
+
+def student_names(count):
+    """Deterministic, unique names that pass the SF2 name filter"""
+    names = []
+    for last, first, initial in itertools.product(LAST_NAMES, FIRST_NAMES, INITIALS):
+        name = f"{last}, {first} {initial}."
+        if is_valid_student_name(name):
+            names.append(name)
+            if len(names) == count:
+                return names
+    raise ValueError(f"Cannot make {count} unique names")
+
+
+def make_sf2_workbook(path, rows, seed=0, mark_rate=0.3):
+    """Write an SF2-shaped workbook with `rows` learners; returns the names"""
+    rng = random.Random(seed)
+    names = student_names(rows)
+    days = list(range(1, 32))
+    last_col = FIRST_DATE_COL + len(days) - 1
+    
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("SF2")
+    
+    header = [
+        ["School Form 2 (SF2) Daily Attendance Report of Learners"],
+        [],
+        ["School ID", "123456", None, "School Year", "2025-2026"],
+        ["Name of School", "Dr. Alfredo Pio De Roda ES"],
+        ["Report for the Month of", "January"],
+        ["Grade Level", "6", None, "Section", None, "Rizal"],
+        [], [], [],
+        ["LEARNER'S NAME (Last Name, First Name, Middle Name)"],
+    ]
+    for values in header:
+        sheet.append(values)
+    
+    # Row 11: days, Row 12: day letters
+    sheet.append([None] * (FIRST_DATE_COL - 1) + days)
+    sheet.append([None] * (FIRST_DATE_COL - 1) + [DAY_LETTERS[i % 5] for i in range(len(days))])
+    assert DATE_ROW == 11 and FIRST_STUDENT_ROW == 13
+    
+    fillers = itertools.cycle(FILLER_ROWS)
+    for index, name in enumerate(names, 1):
+        marks = [MARK if rng.random() < mark_rate else None for _ in days]
+        sheet.append([index, name, None] + marks)
+        if index % 25 == 0:
+            # Subtotal / formula rows inside the roster, like real SF2 files
+            sheet.append([None, next(fillers)] + [None] * (last_col - 2))
+    
+    for filler in FILLER_ROWS:
+        sheet.append([None, filler])
+    
+    workbook.save(path)
+    return names
+
+
+def make_qr_frame(payloads, size=(640, 480), noise=8.0, blur=3, seed=0):
+    """BGR frame with one QR code per payload on a lit, noisy background"""
+    # Imaging deps only here, so the workbook benchmarks run without them
+    import cv2
+    import numpy as np
+    from qr_sheets import make_qr_sticker
+    
+    rng = np.random.default_rng(seed)
+    width, height = size
+    
+    # Uneven lighting: horizontal gradient + random offset
+    gradient = np.linspace(150, 210, width, dtype=np.float32)
+    frame = np.tile(gradient, (height, 1)) + rng.uniform(-10, 10)
+    
+    if payloads:
+        # One grid cell per code so codes never overlap
+        columns = int(np.ceil(np.sqrt(len(payloads))))
+        rows = int(np.ceil(len(payloads) / columns))
+        cell_w, cell_h = width // columns, height // rows
+        for index, payload in enumerate(payloads):
+            row, column = divmod(index, columns)
+            sticker = np.asarray(make_qr_sticker(payload, int(min(cell_w, cell_h) * 0.85)),
+                                 dtype=np.float32)
+            x = column * cell_w + int(rng.integers(0, max(1, cell_w - sticker.shape[1])))
+            y = row * cell_h + int(rng.integers(0, max(1, cell_h - sticker.shape[0])))
+            frame[y:y + sticker.shape[0], x:x + sticker.shape[1]] = sticker * 0.9 + 10
+    
+    frame += rng.normal(0, noise, frame.shape)
+    frame = np.clip(frame, 0, 255).astype(np.uint8)
+    if blur > 1:
+        blur |= 1  # Kernel must be odd
+        frame = cv2.GaussianBlur(frame, (blur, blur), 0)
+    return cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
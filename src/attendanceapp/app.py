@@ -15,38 +15,83 @@ PERFECTED FEATURES:
 import toga
 from toga.style import Pack
 from toga.style.pack import COLUMN, ROW
-import cv2
-from PIL import Image
-from pyzbar.pyzbar import decode
-from openpyxl import load_workbook
 from datetime import datetime
 import os
-import re
 import threading
-import queue
+import concurrent.futures
 import time
 import subprocess
 from pathlib import Path
 
+try:
+    from .preview import PreviewSink, cleanup_legacy_frames
+    from .roster import RosterIndex
+    from .persistence import AutosaveWorker
+    from .journal import ScanJournal
+    from .roster_cache import RosterCache
+    from .table_model import IncrementalTable
+    from .ui_scheduler import UiRefreshScheduler
+    from .excel_lock import ExcelLockDetector
+    from .badge_id import workbook_section
+    from .metrics import PipelineMetrics
+    from .camera_probe import CameraProbe, backend_name
+    from .lanes import CameraLane, load_lane_specs, open_lanes
+    from .recorder import ScanRecorder, NEW, BEFORE, AGAIN
+    from .collector import (AckLog, CollectorServer, CollectorUnavailable, ScanForwarder,
+                            load_station_config)
+    from .sections import SectionIndex, SectionWorkbook, active_workbooks, load_sections
+    from .pools import default_mode
+except ImportError:
+    from preview import PreviewSink, cleanup_legacy_frames
+    from roster import RosterIndex
+    from persistence import AutosaveWorker
+    from journal import ScanJournal
+    from roster_cache import RosterCache
+    from table_model import IncrementalTable
+    from ui_scheduler import UiRefreshScheduler
+    from excel_lock import ExcelLockDetector
+    from badge_id import workbook_section
+    from metrics import PipelineMetrics
+    from camera_probe import CameraProbe, backend_name
+    from lanes import CameraLane, load_lane_specs, open_lanes
+    from recorder import ScanRecorder, NEW, BEFORE, AGAIN
+    from collector import (AckLog, CollectorServer, CollectorUnavailable, ScanForwarder,
+                           load_station_config)
+    from sections import SectionIndex, SectionWorkbook, active_workbooks, load_sections
+    from pools import default_mode
+
 
 class AttendanceSystem(toga.App):
     def startup(self):
         """Setup the application"""
         # Initialize variables (avoid 'camera' - it's a reserved Toga property)
-        self.video_capture = None
         self.camera_active = False
-        self.camera_thread = None
-        self.frame_queue = queue.Queue(maxsize=1)
-        self.sf2_workbook = None
-        self.sf2_sheet = None
+        self.camera_probe = None  # Background device discovery while starting
+        self.lane_opening = None  # Cancel event while configured lanes open
+        self.lanes = []  # CameraLane: capture -> grabber -> decoder pool, one per camera
+        self.lane_previews = []  # PreviewSink per lane (lane 0 -> camera_label)
+        self.lane_labels = []  # FPS / decode load label per lane
+        self.decoder_workers = max(1, min(4, (os.cpu_count() or 2) - 1))
+        self.decoder_mode = "thread"  # "thread" or "process"
         self.sf2_file = None
-        self.student_names = []
-        self.scanned_today = []
-        self.existing_marks = {}  # Track existing ✓ from Excel
+        self.roster_cache = RosterCache()  # Parsed SF2 files keyed on fingerprint
+        self.autosave = None  # Write-behind saver for the loaded workbook
+        self.sections = None  # SectionIndex when every Active workbook is loaded
+        self.section_load_mode = default_mode()  # Loader pool for multi-section mode (threads on Android)
+        self.autosave_interval = 2.0  # Seconds between coalesced saves
+        self.autosave_batch = 10  # ...or save as soon as this many marks wait
+        self.excel_lock = ExcelLockDetector(ttl=2.0)  # Cached "open in Excel?" check
+        self.roster = RosterIndex()  # name -> row, number, ✓ before, scanned today
         self.current_column = None
-        self.last_scanned = None  # Track last scan to prevent rapid re-scans
-        self.last_scan_time = 0  # Track scan time
         self.temp_image_path = None  # Store persistent temp path
+        self.ui_max_fps = 30  # Cap on coalesced widget commits per second
+        self.metrics = PipelineMetrics()  # Per-stage latency, FPS, dropped frames
+        self.metrics_refresh = 1.0  # Seconds between SETTINGS tab metric updates
+        self.recorder = ScanRecorder(self.roster, self.metrics)  # Dedupe shared by every lane
+        self.tables_rebuild_pending = False
+        self.pending_scanned_rows = []  # Row-level table ops for the next UI tick
+        self.pending_preview_status = {}
+        self.pending_section_rows = set()  # Section workbooks whose counters row changed
         
         # Dark theme colors (EXACT match to Tkinter)
         self.BG_DARK = "#0f1419"
@@ -72,106 +117,75 @@ class AttendanceSystem(toga.App):
         for folder in [self.active_folder, self.backup_folder, self.archive_folder, self.qr_folder]:
             folder.mkdir(parents=True, exist_ok=True)
         
-        # Create persistent temp image path
+        # Durable record of every scan, written before any workbook work
+        self.journal = ScanJournal(self.base_folder / "scan_journal.jsonl")
+        try:
+            self.journal.compact()
+        except OSError as e:
+            print(f"⚠️  Journal error: {e}")
+        
+        # Standalone, collector (owns the workbook) or scanner (forwards scans)
+        self.station = load_station_config(self.base_folder / "station.json")
+        self.collector = None  # CollectorServer in collector mode
+        self.forwarder = None  # ScanForwarder in scanner mode
+        self.forwarded_payloads = set()  # Badges already sent this session
+        self.exiting = False  # on_exit started saving
+        
+        # Create persistent temp image path (only used by the disk fallback)
         self.temp_image_path = self.home_dir / "camera_feed.jpg"
+        cleanup_legacy_frames(self.temp_image_path)
         
         # Build UI
         self.main_window = toga.MainWindow(title="QR Attendance System - Dr. Alfredo Pio De Roda ES")
         
         # Create tab container
         self.setup_ui()
+        self.ui_scheduler = UiRefreshScheduler(self.loop, self.ui_max_fps)
+        self.preview = PreviewSink(self.camera_label, self.temp_image_path)
+        self.start_station()
         
-        # Auto-load file
-        self.auto_load_file()
+        # Auto-load file (scanners leave the workbook to the collector)
+        if not self.forwarder:
+            self.auto_load_file()
         
         self.main_window.show()
     
-    def is_valid_student_name(self, name):
-        """Validate if text is a real student name with comprehensive filtering"""
-        if not name or not isinstance(name, str):
-            return False
-        
-        name = name.strip()
-        if len(name) < 2:
-            return False
-        
-        name_upper = name.upper()
-        
-        # COMPREHENSIVE EXCLUSION LIST (same as Tkinter version)
-        excluded_patterns = [
-            "SUMIF", "COUNTIF", "AVERAGE", "SUM(", "COUNT(", "IF(",
-            "VLOOKUP", "HLOOKUP", "INDEX", "MATCH",
-            "SCHOOL FORM", "SF2", "DAILY ATTENDANCE", "ATTENDANCE REPORT",
-            "LEARNER'S NAME", "LAST NAME", "FIRST NAME", "MIDDLE NAME",
-            "CODES FOR CHECKING", "PRESENT", "ABSENT", "TARDY",
-            "HALF SHADED", "UPPER", "LOWER", "CUTTING CLASSES", "LATE COMER",
-            "DROPPED", "TRANSFERRED", "ENROLLED", "REGISTRATION",
-            "TOTAL", "COMBINED", "PER DAY", "SUMMARY", "MALE", "FEMALE",
-            "MONTH:", "BLANK", "(BLANK)", "NO. OF DAYS", "CLASSES",
-            "PERCENTAGE", "ENROLMENT", "AVERAGE DAILY", "ATTENDANCE",
-            "REGISTERED LEARNERS", "END OF THE MONTH", "SCHOOL YEAR",
-            "1ST FRIDAY", "REPORTING MONTH", "SCHOOL DAYS",
-            "REASONS", "CAUSES", "DROPPING OUT", "DROP OUT", "DROPOUT",
-            "DOMESTIC-RELATED", "INDIVIDUAL-RELATED", "SCHOOL-RELATED",
-            "GEOGRAPHIC", "ENVIRONMENTAL", "FINANCIAL-RELATED",
-            "TAKE CARE", "SIBLINGS", "EARLY MARRIAGE", "PREGNANCY",
-            "PARENTS' ATTITUDE", "FAMILY PROBLEMS", "ILLNESS",
-            "OVERAGE", "DEATH", "DRUG ABUSE", "ACADEMIC PERFORMANCE",
-            "LACK OF INTEREST", "DISTRACTIONS", "HUNGER", "MALNUTRITION",
-            "TEACHER FACTOR", "PHYSICAL CONDITION", "CLASSROOM",
-            "PEER INFLUENCE", "DISTANCE", "HOME AND SCHOOL",
-            "ARMED CONFLICT", "TRIBAL WARS", "CLAN FEUDS",
-            "CALAMITIES", "DISASTERS", "CHILD LABOR", "WORK",
-            "OTHERS (SPECIFY)",
-            "GUIDELINES:", "ACCOMPLISHED", "REFER", "DATES SHALL",
-            "WRITTEN IN", "COLUMNS AFTER", "COMPUTE", "FOLLOWING",
-            "EVERY END", "ADVISER", "SUBMIT", "OFFICE", "PRINCIPAL",
-            "RECORDING", "SUMMARY TABLE", "FORM 4", "SIGNED",
-            "RETURNED", "PROVIDE", "NECESSARY", "INTERVENTIONS",
-            "HOME VISITATION", "ABSENT FOR 5", "CONSECUTIVE DAYS",
-            "RISK OF", "PERFORMANCE", "REFLECTED", "FORM 137", "FORM 138",
-            "GRADING PERIOD", "BEGINNING", "CUT-OFF",
-            "MONDAY", "TUESDAY", "WEDNESDAY", "THURSDAY", "FRIDAY",
-            "MONDAY,", "TUESDAY,", "WEDNESDAY,", "THURSDAY,", "FRIDAY,",
-            "CERTIFY", "TRUE", "CORRECT", "REPORT", "SIGNATURE",
-            "PRINTED NAME", "TEACHER", "SCHOOL HEAD", "ATTESTED",
-            "PAGE", "OF", "SCHOOL FORM 2", "___",
-            "LEARNER", "STUDENT", "NAME", "NAMES", "ID", "NUMBER",
-            "ENROLLMENT", "ENROL",
-            "NAN", "NONE", "N/A", "NULL", "BLANK", "EMPTY",
-            "PERCENTAGE OF ENROLMENT", "PERCENTAGE OF ENROLLMENT",
-            "AVERAGE DAILY ATTENDANCE", 
-            "PERCENTAGE OF ATTENDANCE FOR THE MONTH",
-            "PERCENTAGE OF ATTENDANCE",
-        ]
-        
-        for pattern in excluded_patterns:
-            if pattern in name_upper:
-                return False
-        
-        if not any(c.isalpha() for c in name):
-            return False
-        
-        if name.replace('.', '').replace(',', '').replace(' ', '').isdigit():
-            return False
-        
-        if re.match(r'^\d{1,2}[/-]\d{1,2}[/-]\d{2,4}$', name):
-            return False
-        
-        if not any(c.isalnum() for c in name):
-            return False
-        
-        return True
+    def start_station(self):
+        """Start the collector endpoint or the scan forwarder (station.json)"""
+        try:
+            if self.station.mode == "collector":
+                self.collector = CollectorServer(
+                    self.receive_remote_scans,
+                    status=self.collector_status,
+                    host=self.station.host,
+                    port=self.station.port,
+                    ack_log=AckLog(self.base_folder / "collector_acks.jsonl"),
+                    token=self.station.token,
+                )
+                self.collector.start()
+            elif self.station.mode == "scanner":
+                if not self.station.token:
+                    raise ValueError('a scanner needs the collector\'s "token" in station.json')
+                self.forwarder = ScanForwarder(
+                    self.station.collector_url,
+                    self.base_folder / "forward_buffer.jsonl",
+                    self.station.station,
+                    token=self.station.token,
+                    on_ack=lambda results: self.loop.call_soon_threadsafe(self.on_forward_ack, results),
+                    on_state_change=lambda online: self.loop.call_soon_threadsafe(
+                        self.ui_scheduler.mark_dirty, "save_status", self.update_save_status),
+                    on_reject=lambda message, halted: self.loop.call_soon_threadsafe(
+                        self.on_forward_rejected, message, halted),
+                )
+                print(f"📡 Scanner '{self.station.station}' -> {self.station.collector_url}")
+                self.set_label(self.save_status, f"📡 Scanner: {self.forwarder.summary()}")
+        except Exception as e:
+            print(f"❌ Cannot start {self.station.mode} mode: {e}")
+            self.main_window.error_dialog("Station Error", f"Cannot start {self.station.mode} mode: {e}")
     
     def is_excel_file_open(self, file_path):
-        """Check if Excel file is open/locked"""
-        try:
-            temp_name = str(file_path) + ".tmp"
-            os.rename(file_path, temp_name)
-            os.rename(temp_name, file_path)
-            return False
-        except (OSError, IOError):
-            return True
+        """Check if Excel file is open/locked (owner file / open probe, cached)"""
+        return self.excel_lock.is_locked(file_path)
     
     def setup_ui(self):
         """Setup the complete UI with EXACT Tkinter layout"""
@@ -215,6 +229,10 @@ class AttendanceSystem(toga.App):
         )
         left_box.add(self.camera_label)
         
+        # Extra camera lanes (camera.json "lanes") get smaller views here
+        self.extra_lanes_box = toga.Box(style=Pack(direction=ROW, padding=0))
+        left_box.add(self.extra_lanes_box)
+        
         # Camera controls
         camera_controls = toga.Box(style=Pack(direction=ROW, padding=5))
         self.start_btn = toga.Button(
@@ -232,6 +250,16 @@ class AttendanceSystem(toga.App):
         camera_controls.add(self.stop_btn)
         left_box.add(camera_controls)
         
+        self.camera_status = toga.Label(
+            "📷 Camera: idle",
+            style=Pack(padding=2)
+        )
+        left_box.add(self.camera_status)
+        
+        # Per-lane FPS and decode load
+        self.lane_status_box = toga.Box(style=Pack(direction=COLUMN, padding=0))
+        left_box.add(self.lane_status_box)
+        
         top_container.add(left_box)
         
         # ===== RIGHT SIDE: SYSTEM INFO =====
@@ -256,9 +284,14 @@ class AttendanceSystem(toga.App):
             "👥 Students: 0",
             style=Pack(padding=2)
         )
+        self.save_status = toga.Label(
+            "💾 Auto-save: --",
+            style=Pack(padding=2)
+        )
         right_box.add(self.file_status)
         right_box.add(self.date_status)
         right_box.add(self.students_status)
+        right_box.add(self.save_status)
         
         right_box.add(toga.Divider(style=Pack(padding=5)))
         
@@ -285,6 +318,16 @@ class AttendanceSystem(toga.App):
         right_box.add(self.absent_label)
         right_box.add(self.total_label)
         
+        # Per-section counters (multi-section mode)
+        self.section_tree = toga.Table(
+            headings=["Section", "File", "Present", "New", "Absent", "Total"],
+            data=[],
+            accessors=["section", "file", "present", "new", "absent", "total"],
+            style=Pack(height=140, padding=5)
+        )
+        right_box.add(self.section_tree)
+        self.section_table = IncrementalTable(self.section_tree, "file")
+        
         right_box.add(toga.Divider(style=Pack(padding=5)))
         
         # Scanned Students section
@@ -301,6 +344,7 @@ class AttendanceSystem(toga.App):
             style=Pack(flex=1, padding=5)
         )
         right_box.add(self.student_tree)
+        self.scanned_table = IncrementalTable(self.student_tree, "name")
         
         top_container.add(right_box)
         main_box.add(top_container)
@@ -382,8 +426,15 @@ class AttendanceSystem(toga.App):
             style=Pack(flex=1, padding=5)
         )
         
+        sections_btn = toga.Button(
+            "🏫 LOAD ALL SECTIONS",
+            on_press=self.load_all_sections,
+            style=Pack(flex=1, padding=5)
+        )
+        
         actions_box.add(refresh_btn)
         actions_box.add(browse_btn)
+        actions_box.add(sections_btn)
         main_box.add(actions_box)
         
         return main_box
@@ -407,6 +458,7 @@ class AttendanceSystem(toga.App):
             style=Pack(flex=1, padding=5)
         )
         main_box.add(self.preview_tree)
+        self.preview_table = IncrementalTable(self.preview_tree, "key")  # See preview_key
         
         # Action buttons
         actions_box = toga.Box(style=Pack(direction=ROW, padding=10))
@@ -504,21 +556,54 @@ class AttendanceSystem(toga.App):
         actions_box.add(active_btn)
         main_box.add(actions_box)
         
+        main_box.add(toga.Divider(style=Pack(padding=10)))
+        
+        # Pipeline performance
+        perf_header = toga.Label(
+            "📈 Scanner Performance:",
+            style=Pack(padding=3, font_weight='bold')
+        )
+        main_box.add(perf_header)
+        
+        self.metrics_view = toga.MultilineTextInput(
+            value="\n".join(self.metrics.summary_lines()),
+            readonly=True,
+            style=Pack(flex=1, padding=5, font_family='monospace')
+        )
+        main_box.add(self.metrics_view)
+        
+        metrics_box = toga.Box(style=Pack(direction=ROW, padding=10))
+        metrics_box.add(toga.Button(
+            "🔄 REFRESH",
+            on_press=lambda widget: self.update_metrics_view(),
+            style=Pack(flex=1, padding=5)
+        ))
+        metrics_box.add(toga.Button(
+            "💾 EXPORT METRICS",
+            on_press=self.export_metrics,
+            style=Pack(flex=1, padding=5)
+        ))
+        main_box.add(metrics_box)
+        
         return main_box
     
     def auto_load_file(self):
-        """Auto-load the most recent file"""
+        """Auto-load the most recent file (or every file in multi-section mode)"""
         try:
+            if self.station.multi_section:
+                self.loop.create_task(self.load_all_sections(None))
+                return
+            
             files = list(self.active_folder.glob("*.xlsx"))
             files = [f for f in files if not f.name.startswith('~')]
             
             if files:
                 most_recent = max(files, key=lambda f: f.stat().st_mtime)
-                self.load_file(most_recent)
+                self.loop.create_task(self.load_file(most_recent))
         except Exception as e:
             print(f"Auto-load error: {e}")
     
-    def load_file(self, file_path):
+    async def load_file(self, file_path):
         """Load SF2 file with EXACT Tkinter logic"""
         try:
             if isinstance(file_path, list):
@@ -533,22 +618,26 @@ class AttendanceSystem(toga.App):
             print(f"LOADING FILE: {file_path.name}")
             print(f"{'='*80}")
             
-            # Check if Excel is open
-            if self.is_excel_file_open(file_path):
-                self.main_window.error_dialog(
-                    "Excel File Open",
-                    "❌ Excel file is currently open!\n\nClose the file in Excel before loading."
-                )
-                return
+            # Excel being open does not stop loading (we only read the sheet);
+            # marks just wait in the auto-save queue until the file is closed
+            self.excel_lock.invalidate(file_path)
+            excel_open = self.is_excel_file_open(file_path)
+            if excel_open:
+                print("⚠️  WARNING: Excel file is OPEN! Scans will be queued until it is closed")
+            
+            # Save anything still pending for the previous file(s)
+            await self.stop_autosave()
+            self.sections = None
             
-            # Load workbook
-            self.sf2_workbook = load_workbook(file_path)
-            self.sf2_sheet = self.sf2_workbook.active
+            # Cached parse if the file is unchanged, otherwise stream the sheet
+            # read-only in ONE pass (editable workbook is only opened by the
+            # auto-save worker when a mark is written)
+            sf2_data, _ = self.roster_cache.read(file_path)
             self.sf2_file = file_path
             
-            self.student_names = []
-            self.scanned_today = []
-            self.existing_marks = {}  # Reset
+            section = workbook_section(sf2_data.section, file_path)
+            roster = RosterIndex(section)  # Reset
+            print(f"🏷️  Section code for ID badges: {section}")
             
             # EXACT TKINTER LOGIC: Find date in Row 11
             today = datetime.now()
@@ -557,80 +646,65 @@ class AttendanceSystem(toga.App):
             print(f"\n🔍 Looking for date: {day_of_month}")
             print(f"Searching Row 11 for the date...")
             
-            date_column = None
-            for col in range(1, self.sf2_sheet.max_column + 1):
-                cell_value = self.sf2_sheet.cell(11, col).value
-                
-                if cell_value is not None:
-                    try:
-                        date_num = int(cell_value)
-                        if date_num == day_of_month:
-                            date_column = col
-                            print(f"✅ FOUND! Date {day_of_month} in Column {col}")
-                            break
-                    except (ValueError, TypeError):
-                        continue
+            date_column, day_letter = sf2_data.date_columns.get(day_of_month, (None, None))
             
             if date_column is None:
                 print(f"⚠️  Date {day_of_month} NOT FOUND in Row 11")
-                self.date_status.text = f"📅 Date: {day_of_month} NOT FOUND"
+                self.set_label(self.date_status, f"📅 Date: {day_of_month} NOT FOUND")
                 self.current_column = None
             else:
-                # Get day letter from Row 12
-                day_letter = self.sf2_sheet.cell(12, date_column).value
-                
+                print(f"✅ FOUND! Date {day_of_month} in Column {date_column}")
                 print(f"✅ Will mark attendance in Column {date_column} ({day_letter})")
                 
                 self.current_column = date_column
-                self.date_status.text = f"📅 Date: {day_of_month} ({day_letter}) → Col {date_column}"
+                self.set_label(self.date_status, f"📅 Date: {day_of_month} ({day_letter}) → Col {date_column}")
             
-            # EXACT TKINTER LOGIC: Load students from Column B (column 2), starting Row 13
+            # EXACT TKINTER LOGIC: Students from Column B (column 2), starting Row 13
             print(f"\n👥 Loading students from Column B...")
             print("-" * 80)
             
-            for row in range(13, self.sf2_sheet.max_row + 1):
-                name_cell = self.sf2_sheet.cell(row, 2).value  # Column B
-                
-                if not name_cell:
-                    continue
+            for student in sf2_data.students:
+                # CHECK EXISTING MARKS IN TODAY'S COLUMN!
+                marked_before = self.current_column in student.marks
                 
-                num_cell = self.sf2_sheet.cell(row, 1).value  # Column A
-                student_num = str(num_cell).strip() if num_cell else ""
-                
-                if self.is_valid_student_name(name_cell):
-                    name = name_cell.strip()
-                    self.student_names.append({
-                        "name": name,
-                        "number": student_num,
-                        "row": row
-                    })
-                    
-                    # CHECK EXISTING MARKS IN TODAY'S COLUMN!
-                    if self.current_column:
-                        existing_mark = self.sf2_sheet.cell(row, self.current_column).value
-                        if existing_mark and str(existing_mark).strip() == "✓":
-                            self.existing_marks[name] = True
-                            print(f"  ✓ {student_num:3s} | {name} (already marked)")
-                        else:
-                            self.existing_marks[name] = False
-                            print(f"    {student_num:3s} | {name}")
-                    else:
-                        self.existing_marks[name] = False
-                        print(f"    {student_num:3s} | {name}")
+                roster.add(student.name, student.number, student.row, marked_before)
+                if marked_before:
+                    print(f"  ✓ {student.number:3s} | {student.name} (already marked)")
+                else:
+                    print(f"    {student.number:3s} | {student.name}")
+            roster.warn_collisions()
+            
+            self.roster = roster
+            self.recorder.set_roster(roster)
+            self.autosave = AutosaveWorker(
+                file_path,
+                interval=self.autosave_interval,
+                batch_size=self.autosave_batch,
+                is_locked=self.is_excel_file_open,
+                on_lock_change=self.on_autosave_lock_change,
+                on_flush=self.on_autosave_flush,
+                journal=self.journal,
+            )
+            
+            # Put back scans that never made it into this workbook
+            self.replay_journal()
             
             print("-" * 80)
-            print(f"✅ Loaded {len(self.student_names)} students")
+            print(f"✅ Loaded {len(self.roster)} students")
             print(f"{'='*80}\n")
             
             # Update UI
-            self.file_status.text = f"📁 File: {file_path.name}"
-            self.students_status.text = f"👥 Students: {len(self.student_names)}"
-            self.current_file_label.text = file_path.name
+            self.set_label(self.file_status, f"📁 File: {file_path.name}")
+            self.set_label(self.students_status, f"👥 Students: {len(self.roster)}")
+            self.set_label(self.current_file_label, file_path.name)
             
-            # Update counters and preview
-            self.update_student_list()
-            self.update_counters()
-            self.update_preview(None)
+            # Update counters and preview (full rebuild on the next UI tick)
+            self.request_tables_rebuild()
+            self.ui_scheduler.mark_dirty("counters", self.update_counters)
+            if excel_open:
+                self.set_label(self.save_status, "💾 Auto-save: Excel open - scans will wait")
+            else:
+                self.ui_scheduler.mark_dirty("save_status", self.update_save_status)
             
         except Exception as e:
             print(f"❌ Load error: {e}")
@@ -638,145 +712,248 @@ class AttendanceSystem(toga.App):
             traceback.print_exc()
             self.main_window.error_dialog("Error", f"Failed to load file:\n{e}")
     
+    async def load_all_sections(self, widget):
+        """Load every workbook in Active at once and scan into all of them"""
+        paths = active_workbooks(self.active_folder)
+        if not paths:
+            print("⚠️  No SF2 workbooks in the Active folder")
+            if widget:
+                self.main_window.info_dialog("No Files", "No SF2 workbooks in the Active folder")
+            return
+        
+        print(f"\n{'='*80}")
+        print(f"LOADING {len(paths)} SECTIONS")
+        print(f"{'='*80}")
+        self.set_label(self.file_status, f"📁 Loading {len(paths)} sections...")
+        
+        try:
+            # Parsed side by side: about as long as the slowest file
+            start = time.perf_counter()
+            loads = await self.loop.run_in_executor(
+                None, load_sections, paths, None, self.section_load_mode)
+            await self.install_sections(loads, time.perf_counter() - start)
+        except Exception as e:
+            print(f"❌ Load error: {e}")
+            import traceback
+            traceback.print_exc()
+            self.main_window.error_dialog("Error", f"Failed to load sections:\n{e}")
+    
+    async def install_sections(self, loads, elapsed):
+        """Build the global index and one auto-saver per workbook"""
+        day = datetime.now().day
+        workbooks = []
+        for load in loads:
+            name = Path(load.path).name
+            if load.error:
+                print(f"❌ {name}: {load.error}")
+                continue
+            workbook = SectionWorkbook(load.path, load.data, day)
+            if workbook.column is None:
+                print(f"⚠️  {name}: Date {day} NOT FOUND in Row 11 - scans will not be saved")
+            print(f"  🏷️  {workbook.section:12s} {len(workbook.roster):3d} students  {name}")
+            workbooks.append(workbook)
+        
+        if not workbooks:
+            self.main_window.error_dialog("Error", "No section workbook could be loaded")
+            return
+        
+        # Save anything still pending for the previous file(s)
+        await self.stop_autosave()
+        
+        index = SectionIndex(workbooks)
+        self.sections = index
+        self.roster = index
+        self.recorder.set_roster(index)
+        self.sf2_file = None
+        self.current_column = None
+        
+        for workbook in workbooks:
+            workbook.autosave = AutosaveWorker(
+                workbook.path,
+                interval=self.autosave_interval,
+                batch_size=self.autosave_batch,
+                is_locked=self.is_excel_file_open,
+                on_lock_change=self.on_autosave_lock_change,
+                on_flush=self.on_autosave_flush,
+                journal=self.journal,
+            )
+            self.replay_journal(workbook)
+        
+        for name, sections in index.ambiguous_names.items():
+            print(f"⚠️  {name} is in {', '.join(sections)} - needs an ID badge")
+        
+        slowest = max(load.seconds for load in loads)
+        one_by_one = sum(load.seconds for load in loads)
+        print("-" * 80)
+        print(f"✅ Loaded {len(workbooks)} sections, {len(index)} students in {elapsed:.2f}s "
+              f"(slowest file {slowest:.2f}s, {one_by_one:.2f}s one by one)")
+        print(f"{'='*80}\n")
+        
+        dated = sum(1 for w in workbooks if w.column is not None)
+        self.set_label(self.file_status, f"📁 Files: {len(workbooks)} sections")
+        self.set_label(self.students_status, f"👥 Students: {len(index)}")
+        self.set_label(self.date_status, f"📅 Date: {day} → found in {dated}/{len(workbooks)} sections")
+        self.set_label(self.current_file_label, f"{len(workbooks)} sections (multi-section mode)")
+        
+        self.request_tables_rebuild()
+        self.ui_scheduler.mark_dirty("counters", self.update_counters)
+        self.ui_scheduler.mark_dirty("save_status", self.update_save_status)
+    
     def start_camera(self, widget):
-        """Start camera with EXACT Tkinter logic - MOBILE OPTIMIZED"""
+        """Start camera - device discovery runs in the background"""
+        if self.camera_active or self.camera_probe or self.lane_opening:
+            return
+        
+        print("📷 Attempting to open camera...")
+        self.start_btn.enabled = False
+        self.stop_btn.enabled = True  # STOP also cancels a pending start
+        self.set_label(self.camera_status, "📷 Camera: starting...")
+        
+        # Several entry lanes configured: open all of their cameras at once
+        specs = load_lane_specs(self.base_folder / "camera.json")
+        if specs:
+            self.lane_opening = threading.Event()
+            threading.Thread(target=self.open_lanes_worker, args=(specs, self.lane_opening),
+                             daemon=True).start()
+            return
+        
+        # Last working device first, then every index/backend concurrently
+        self.camera_probe = CameraProbe(self.base_folder / "camera.json")
+        self.camera_probe.start(
+            on_ready=lambda found: self.loop.call_soon_threadsafe(self.on_camera_ready, found),
+            on_failed=lambda: self.loop.call_soon_threadsafe(self.on_camera_failed),
+        )
+    
+    def on_camera_ready(self, found):
+        """A camera delivered its first frame - start the live feed"""
+        probe, self.camera_probe = self.camera_probe, None
+        if probe is None or probe.cancelled.is_set():
+            found.capture.release()  # STOP was pressed while probing
+            return
+        
+        print(f"✅ Successfully read test frame: {found.frame.shape}")
+        if not self.start_lanes([("Camera", found.capture, found.frame, None)], found.latency):
+            return
+        
+        device = f"{found.candidate.index} ({backend_name(found.candidate.backend)})"
+        remembered = ", remembered device" if found.cached else ""
+        print(f"▶ Camera {device} started in {found.latency * 1000:.0f} ms{remembered}")
+        self.set_label(self.camera_status,
+                       f"📷 Camera {device} - started in {found.latency * 1000:.0f} ms{remembered}")
+    
+    def open_lanes_worker(self, specs, cancelled):
+        """Background: open every configured lane camera concurrently"""
+        start = time.perf_counter()
+        opened = open_lanes(specs)
+        latency = time.perf_counter() - start
+        self.loop.call_soon_threadsafe(self.on_lanes_opened, opened, latency, cancelled)
+    
+    def on_lanes_opened(self, opened, latency, cancelled):
+        """Configured lane cameras are open (or failed) - start the ones that work"""
+        if cancelled.is_set() or cancelled is not self.lane_opening:
+            for spec, result in opened:
+                if result:
+                    result[0].release()  # STOP was pressed while opening
+            return
+        self.lane_opening = None
+        
+        working = [(spec.name, *result, spec.workers) for spec, result in opened if result]
+        missing = [spec.name for spec, result in opened if not result]
+        for name in missing:
+            print(f"⚠️  {name}: camera did not open")
+        if not working:
+            self.report_camera_failure()
+            return
+        
+        if not self.start_lanes(working, latency):
+            return
+        
+        status = f"📷 {len(working)}/{len(opened)} camera lane(s) started in {latency * 1000:.0f} ms"
+        if missing:
+            status += f" - not found: {', '.join(missing)}"
+        print(f"▶ {status}")
+        self.set_label(self.camera_status, status)
+    
+    def start_lanes(self, lanes, latency):
+        """Start one CameraLane per (name, capture, first_frame, workers)"""
         try:
-            # Try to open camera (index 0 for mobile, or auto-detect)
-            print("📷 Attempting to open camera...")
-            
-            # For Windows: Try DirectShow backend first (more reliable)
-            if os.name == 'nt':
-                print("   Using DirectShow backend for Windows...")
-                self.video_capture = cv2.VideoCapture(0, cv2.CAP_DSHOW)
-            else:
-                self.video_capture = cv2.VideoCapture(0)
-            
-            # Wait a moment for camera to initialize
-            time.sleep(0.5)
-            
-            # If camera 0 fails, try different indices (for mobile devices)
-            if not self.video_capture.isOpened():
-                print("⚠️  Camera 0 failed, trying other indices...")
-                for i in range(1, 5):
-                    print(f"   Trying camera index {i}...")
-                    if os.name == 'nt':
-                        self.video_capture = cv2.VideoCapture(i, cv2.CAP_DSHOW)
-                    else:
-                        self.video_capture = cv2.VideoCapture(i)
-                    time.sleep(0.3)
-                    if self.video_capture.isOpened():
-                        print(f"✅ Camera {i} opened!")
-                        break
-            
-            if not self.video_capture.isOpened():
-                self.main_window.error_dialog(
-                    "Camera Error", 
-                    "Cannot access camera!\n\n"
-                    "Possible issues:\n"
-                    "• Camera is being used by another app\n"
-                    "• Camera permissions not granted\n"
-                    "• No camera detected\n\n"
-                    "Try closing other apps using the camera."
-                )
-                return
-            
-            # Set camera properties for better mobile performance
-            self.video_capture.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-            self.video_capture.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-            self.video_capture.set(cv2.CAP_PROP_FPS, 30)
-            self.video_capture.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # Reduce buffer for less lag
-            
-            # Test read
-            ret, test_frame = self.video_capture.read()
-            if not ret:
-                self.video_capture.release()
-                self.main_window.error_dialog(
-                    "Camera Error",
-                    "Camera opened but cannot read frames!\n\n"
-                    "The camera may be locked by another application.\n"
-                    "Please close other camera apps and try again."
-                )
-                return
-            
-            print(f"✅ Successfully read test frame: {test_frame.shape}")
-            
             self.camera_active = True
-            self.start_btn.enabled = False
-            self.stop_btn.enabled = True
+            self.metrics.reset()
+            self.metrics.set_startup(latency)
             
-            # Start background thread
-            self.camera_thread = threading.Thread(target=self.camera_worker, daemon=True)
-            self.camera_thread.start()
+            for number, (name, capture, first_frame, workers) in enumerate(lanes):
+                # Grabber thread keeps the camera drained; the feeder hands the
+                # latest frame to this lane's decoders whenever one is free
+                lane = CameraLane(name, capture, workers or self.decoder_workers,
+                                  self.decoder_mode, self.metrics)
+                self.lanes.append(lane)
+                self.lane_previews.append(self.make_lane_preview(number))
+                label = toga.Label(f"{name}: starting...", style=Pack(padding=2))
+                self.lane_status_box.add(label)
+                self.lane_labels.append(label)
+                lane.start(first_frame)
             
             # Start UI updates using asyncio
             import asyncio
             asyncio.create_task(self.update_camera_loop())
-            
-            print("▶ Camera started successfully!")
+            return True
         except Exception as e:
             print(f"❌ Camera error: {e}")
             import traceback
             traceback.print_exc()
+            self.stop_camera(None)
             self.main_window.error_dialog("Error", f"Camera error: {e}")
+            return False
     
-    def camera_worker(self):
-        """Background worker to read camera frames continuously for LIVE FEED"""
-        consecutive_failures = 0
-        max_failures = 30  # Stop after 30 consecutive failures
-        frame_drop_counter = 0
-        
-        while self.camera_active:
-            try:
-                if not self.video_capture or not self.video_capture.isOpened():
-                    print("⚠️  Camera not opened in worker thread")
-                    break
-                
-                ret, frame = self.video_capture.read()
-                
-                if ret and frame is not None:
-                    consecutive_failures = 0  # Reset counter on success
-                    
-                    # Drop oldest frame if queue is full to keep live feed smooth
-                    if self.frame_queue.full():
-                        try:
-                            self.frame_queue.get_nowait()  # Remove oldest
-                            frame_drop_counter += 1
-                        except queue.Empty:
-                            pass
-                    
-                    try:
-                        self.frame_queue.put_nowait(frame)
-                    except queue.Full:
-                        pass  # Silently drop if still full
-                else:
-                    consecutive_failures += 1
-                    if consecutive_failures >= max_failures:
-                        print(f"❌ Camera worker: {max_failures} consecutive failures, stopping...")
-                        break
-                    time.sleep(0.05)  # Brief wait before retry
-                    continue
-                
-                # Minimal sleep to maintain responsiveness without blocking
-                time.sleep(0.005)
-            except Exception as e:
-                print(f"Camera worker error: {e}")
-                consecutive_failures += 1
-                if consecutive_failures >= max_failures:
-                    break
-                time.sleep(0.1)
-        
-        print(f"Camera worker thread stopped (dropped {frame_drop_counter} frames)")
+    def make_lane_preview(self, number):
+        """Lane 0 shows in the main view; other lanes get a smaller view each"""
+        if number == 0:
+            return self.preview
+        view = toga.ImageView(style=Pack(width=320, height=240, padding=5))
+        self.extra_lanes_box.add(view)
+        fallback = self.temp_image_path.with_name(
+            f"{self.temp_image_path.stem}_lane{number}{self.temp_image_path.suffix}")
+        return PreviewSink(view, fallback)
+    
+    def on_camera_failed(self):
+        """No candidate produced a frame"""
+        probe, self.camera_probe = self.camera_probe, None
+        if probe is None or probe.cancelled.is_set():
+            return
+        self.report_camera_failure()
+    
+    def report_camera_failure(self):
+        """Back to idle and tell the user why"""
+        self.start_btn.enabled = True
+        self.stop_btn.enabled = False
+        self.set_label(self.camera_status, "📷 Camera: not found")
+        self.main_window.error_dialog(
+            "Camera Error", 
+            "Cannot access camera!\n\n"
+            "Possible issues:\n"
+            "• Camera is being used by another app\n"
+            "• Camera permissions not granted\n"
+            "• No camera detected\n\n"
+            "Try closing other apps using the camera."
+        )
     
     async def update_camera_loop(self):
         """Async loop to update camera display - OPTIMIZED FOR LIVE FEED"""
         import asyncio
         frame_counter = 0
+        last_metrics = time.monotonic()
         while self.camera_active:
             try:
                 # Call update more frequently for smoother playback
                 frame_counter += 1
                 self.update_camera_frame()
                 
+                if time.monotonic() - last_metrics >= self.metrics_refresh:
+                    last_metrics = time.monotonic()
+                    self.ui_scheduler.mark_dirty("metrics", self.update_metrics_view)
+                    for lane, label in zip(self.lanes, self.lane_labels):
+                        self.set_label(label, lane.status_text())
+                
                 # Wait ~16ms for ~60 FPS update rate
                 await asyncio.sleep(0.016)
             except Exception as e:
@@ -784,182 +961,473 @@ class AttendanceSystem(toga.App):
                 break
     
     def update_camera_frame(self):
-        """Update camera display with EXACT Tkinter logic - OPTIMIZED FOR LIVE FEED"""
-        try:
-            frame = self.frame_queue.get_nowait()
-        except queue.Empty:
+        """Drain decoded frames of every lane: mark new scans, show the newest previews"""
+        if not self.lanes:
             return
         
-        # SCAN QR CODES
-        try:
-            decoded_objects = decode(frame)
-            for obj in decoded_objects:
-                qr_data = obj.data.decode('utf-8').strip()
-                
-                if self.is_valid_student_name(qr_data):
-                    matching_student = any(s['name'] == qr_data for s in self.student_names)
-                    
-                    if matching_student:
-                        # CHECK: Already has ✓ from before?
-                        has_existing_mark = self.existing_marks.get(qr_data, False)
-                        
-                        # CHECK: Already scanned in THIS session?
-                        already_scanned = any(s['name'] == qr_data for s in self.scanned_today)
-                        
-                        # Prevent rapid re-scans within 1 second
-                        current_time = datetime.now().timestamp()
-                        rapid_rescan = (qr_data == self.last_scanned and 
-                                      (current_time - self.last_scan_time) < 1)
-                        
-                        if has_existing_mark:
-                            print(f"⚠️  {qr_data}: Already marked from before!")
-                        elif already_scanned:
-                            print(f"⚠️  Already scanned in this session: {qr_data}")
-                        elif rapid_rescan:
-                            pass  # Silently ignore rapid rescans
-                        else:
-                            # NEW SCAN!
-                            self.scanned_today.append({
-                                'name': qr_data,
-                                'time': datetime.now().strftime("%H:%M:%S")
-                            })
-                            self.last_scanned = qr_data
-                            self.last_scan_time = current_time
-                            
-                            print(f"✅ Scanned: {qr_data}")
-                            self.update_student_list()
-                            self.update_counters()
-                            self.update_preview(None)
-                            
-                            # AUTO-SAVE!
-                            self.auto_save_attendance()
-        except Exception as e:
-            pass  # Silently ignore QR decode errors
-        
-        # DRAW QR BOXES
-        try:
-            decoded_objects = decode(frame)
-            for obj in decoded_objects:
-                points = obj.polygon
-                if len(points) > 0:
-                    pts = [(int(p.x), int(p.y)) for p in points]
-                    import numpy as np
-                    pts_array = np.array([pts], dtype=np.int32)
-                    cv2.polylines(frame, pts_array, True, (0, 255, 0), 3)  # Thicker line for mobile
-        except Exception as e:
-            pass
+        replaced = grabbed = dropped = failures = 0
+        for lane, preview in zip(self.lanes, self.lane_previews):
+            results = lane.poll()
+            replaced += lane.previews_replaced
+            grabbed += lane.grabber.grabbed
+            dropped += lane.pipeline.pool.dropped
+            failures += lane.grabber.failures
+            
+            # SCAN QR CODES - detections were decoded ONCE by the lane's worker
+            for result in results:
+                self.metrics.record("decode", result.decode_seconds)
+                for detection in result.detections:
+                    try:
+                        self.handle_detection(detection, lane.name)
+                    except Exception as e:
+                        print(f"Scan error: {e}")
+            
+            image = lane.take_preview()
+            if image is None:
+                continue
+            
+            # DISPLAY FRAME - in memory, no file per frame
+            try:
+                start = time.perf_counter()
+                preview.show(image)
+                self.metrics.record("display", time.perf_counter() - start)
+                self.metrics.tick("display")
+                lane.shown()
+            except Exception as e:
+                pass  # Silently continue on display errors
         
-        # DISPLAY FRAME - OPTIMIZED: Force image reload each frame for smooth live feed
-        try:
-            # Convert BGR to RGB
-            image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            # Resize to fit display
-            image = cv2.resize(image, (640, 480))
-            pil_image = Image.fromarray(image)
+        self.metrics.set_counter("frames_stale", replaced)
+        self.metrics.set_counter("frames_captured", grabbed)
+        self.metrics.set_counter("frames_dropped", dropped)
+        self.metrics.set_counter("capture_failures", failures)
+    
+    def handle_detection(self, detection, lane=None):
+        """Match, dedupe and mark one decoded QR code (shared by every lane)"""
+        if self.forwarder:
+            self.forward_detection(detection)
+            return
+        self.apply_outcome(self.recorder.record(detection, lane), detection.timestamp)
+    
+    def apply_outcome(self, outcome, timestamp, event_id=None):
+        """Log one ScanOutcome; a NEW scan goes to the tables and auto-save
+        
+        event_id: the scan was already journaled under this id
+        """
+        student = outcome.student
+        
+        if outcome.status == BEFORE:
+            print(f"⚠️  {student.name}: Already marked from before!")
+        elif outcome.status == AGAIN:
+            print(f"⚠️  Already scanned in this session: {student.name}")
+        elif outcome.status == NEW:
+            where = f" ({outcome.lane})" if outcome.lane and (len(self.lanes) > 1 or self.collector) else ""
+            print(f"✅ Scanned: {student.name}{where}")
+            # Row-level updates: one new scanned row, one preview status cell,
+            # committed together with the counters on the next UI tick
+            if not self.tables_rebuild_pending:
+                self.pending_scanned_rows.append({'name': student.name, 'time': student.scan_time})
+                self.pending_preview_status[self.preview_key(student)] = student.status
+                if self.sections is not None:
+                    self.pending_section_rows.add(self.sections.workbook_of(student))
+                self.ui_scheduler.mark_dirty("tables", self.commit_tables)
+            self.ui_scheduler.mark_dirty("counters", self.update_counters)
             
-            # Save with timestamp to force reload (prevents image caching)
-            import time as time_module
-            cache_bust = str(int(time_module.time() * 1000))
-            temp_path = str(self.temp_image_path).replace('.jpg', f'_{cache_bust}.jpg')
-            pil_image.save(temp_path, 'JPEG', quality=85)
+            # AUTO-SAVE!
+            self.auto_save_attendance(student, timestamp, event_id)
+    
+    def receive_remote_scans(self, station, scans, acknowledge):
+        """Collector handler thread: record a scanner's batch on the UI loop"""
+        future = concurrent.futures.Future()
+        
+        def record():
+            try:
+                future.set_result(self.record_remote_scans(scans, acknowledge))
+            except Exception as e:
+                future.set_exception(e)
+        
+        self.loop.call_soon_threadsafe(record)
+        return future.result(timeout=10)
+    
+    def record_remote_scans(self, scans, acknowledge):
+        """Same path as a local scan, but journaled BEFORE the student is marked
+        
+        Each scan is acknowledged (ack log) right after it is recorded. A
+        journal write failure leaves that student unmarked and refuses the
+        rest of the batch (503), so the scanner retries instead of getting
+        an ack for a scan that would not survive a crash; the scans before
+        it get their original result on that retry.
+        """
+        if self.sections is None and (not self.autosave or self.current_column is None):
+            raise CollectorUnavailable("No workbook loaded on the collector")
+        
+        for scan in scans:
+            journaled = {}
             
-            # Update image view with unique path to force reload
-            self.camera_label.image = toga.Image(temp_path)
+            def journal_first(student, scan=scan):
+                autosave, column, file_path = self.save_target(student)
+                if autosave and column is not None:
+                    journaled["id"] = self.journal.append(student.name, student.row, column,
+                                                          file_path, scan.timestamp)
             
-        except Exception as e:
-            pass  # Silently continue on display errors
+            try:
+                outcome = self.recorder.record(scan, scan.station, before_mark=journal_first)
+            except OSError as e:
+                print(f"❌ Journal error - refusing the batch from {scan.station}: {e}")
+                raise CollectorUnavailable(f"Journal write failed: {e}")
+            self.apply_outcome(outcome, scan.timestamp, journaled.get("id"))
+            acknowledge(scan, outcome)
+    
+    def collector_status(self):
+        """Extra fields for the collector's GET /status"""
+        return {
+            "file": (f"{len(self.sections.workbooks)} sections" if self.sections is not None
+                     else Path(self.sf2_file).name if self.sf2_file else None),
+            "section": self.roster.section,
+            "students": len(self.roster),
+            "present": self.roster.total_present,
+            "new": self.roster.new_present,
+            "autosave": self.autosave.summary() if self.autosave else None,
+        }
+    
+    def forward_detection(self, detection):
+        """Scanner mode: send a valid badge to the collector once per session"""
+        payload = detection.payload
+        if payload in self.forwarded_payloads or not RosterIndex.validate(payload):
+            return
+        self.forwarded_payloads.add(payload)
+        
+        try:
+            self.forwarder.submit(payload, detection.timestamp)
+            print(f"📤 Forwarded: {payload}")
+        except OSError as e:
+            self.forwarded_payloads.discard(payload)  # Not buffered - allow a re-scan
+            print(f"❌ Forward buffer error: {e}")
+        self.ui_scheduler.mark_dirty("save_status", self.update_save_status)
+    
+    def on_forward_ack(self, results):
+        """Scanner mode: the collector acknowledged a batch"""
+        scan_time = datetime.now().strftime("%H:%M:%S")
+        for result in results:
+            status, student = result.get("status"), result.get("student")
+            if status == NEW:
+                print(f"✅ Scanned: {student} (saved by collector)")
+                self.pending_scanned_rows.append({'name': student, 'time': scan_time})
+                self.ui_scheduler.mark_dirty("tables", self.commit_tables)
+            elif status == BEFORE:
+                print(f"⚠️  {student}: Already marked from before!")
+            elif status == AGAIN:
+                print(f"⚠️  Already scanned in this session: {student}")
+            elif status in ("invalid", "unknown"):
+                print(f"⊘  Not on the collector's roster: {result.get('payload')}")
+        self.ui_scheduler.mark_dirty("save_status", self.update_save_status)
+    
+    def on_forward_rejected(self, message, halted):
+        """Scanner mode: the collector refused a batch (4xx)"""
+        self.ui_scheduler.mark_dirty("save_status", self.update_save_status)
+        if halted:
+            self.main_window.error_dialog(
+                "Collector Refused",
+                f"The {message}.\n\nScans are kept and sent after restarting with the "
+                f"collector's \"token\" in station.json.")
     
     def stop_camera(self, widget):
         """Stop camera with EXACT Tkinter logic"""
+        if self.camera_probe:
+            self.camera_probe.cancel()
+            self.camera_probe = None
+        if self.lane_opening:
+            self.lane_opening.set()
+            self.lane_opening = None
         self.camera_active = False
         
-        if self.camera_thread:
-            self.camera_thread.join(timeout=1.0)
+        # Each lane stops grabbing before its capture is released
+        for lane in self.lanes:
+            lane.stop()
+        self.lanes = []
+        
+        for preview in self.lane_previews:
+            if preview is not self.preview:
+                preview.close()
+        self.lane_previews = []
+        for child in list(self.extra_lanes_box.children):
+            self.extra_lanes_box.remove(child)
+        for label in self.lane_labels:
+            self.lane_status_box.remove(label)
+        self.lane_labels = []
+        
+        if len(self.recorder.counts) > 1:
+            print(f"🚪 Scans per lane: {self.recorder.counts}")
+        
+        print(f"🖥️  UI refresh: {self.ui_scheduler.summary()}")
+        print("⏱️  Pipeline metrics:")
+        for line in self.metrics.summary_lines():
+            print(f"   {line}")
+        self.ui_scheduler.mark_dirty("metrics", self.update_metrics_view)
         
-        if self.video_capture:
-            self.video_capture.release()
-            self.video_capture = None
+        self.preview.close()
+        
+        # Write out any coalesced marks now that scanning paused
+        if not self.exiting:  # finish_exit() stops (and flushes) the workers itself
+            self.loop.create_task(self.flush_autosave())
         
         self.start_btn.enabled = True
         self.stop_btn.enabled = False
+        self.set_label(self.camera_status, "📷 Camera: idle")
         
         print("⏹ Camera stopped")
     
+    def set_label(self, label, text):
+        """Coalesced label update, committed on the next UI tick"""
+        self.ui_scheduler.mark_dirty(label, lambda: setattr(label, 'text', text))
+    
+    def request_tables_rebuild(self):
+        """Schedule a full rebuild of both tables (replaces pending row ops)"""
+        self.tables_rebuild_pending = True
+        self.pending_scanned_rows = []
+        self.pending_preview_status = {}
+        self.pending_section_rows = set()
+        self.ui_scheduler.mark_dirty("tables", self.commit_tables)
+    
+    def commit_tables(self):
+        """Apply pending table changes (runs on a UI tick)"""
+        if self.tables_rebuild_pending:
+            self.tables_rebuild_pending = False
+            self.update_student_list()
+            self.update_preview(None)
+            self.update_section_table()
+            return
+        
+        rows, self.pending_scanned_rows = self.pending_scanned_rows, []
+        statuses, self.pending_preview_status = self.pending_preview_status, {}
+        sections, self.pending_section_rows = self.pending_section_rows, set()
+        for row in rows:
+            self.scanned_table.append(row)
+        for key, status in statuses.items():
+            self.preview_table.update(key, status=status)
+        for workbook in sections:
+            self.section_table.update(workbook.path.name, **workbook.counters())
+    
     def update_student_list(self):
-        """Update scanned students table"""
-        data = [{'name': s['name'], 'time': s['time']} for s in self.scanned_today]
-        self.student_tree.data = data
+        """Rebuild scanned students table (file loads only)"""
+        data = [{'name': s.name, 'time': s.scan_time} for s in self.roster.scanned]
+        self.scanned_table.reset(data)
     
     def update_counters(self):
         """Update attendance counters with EXACT Tkinter logic"""
-        existing_present = sum(1 for v in self.existing_marks.values() if v)
-        new_present = len(self.scanned_today)
-        total_present = existing_present + new_present
-        total_students = len(self.student_names)
-        absent = total_students - total_present
+        existing_present = self.roster.existing_present
+        new_present = self.roster.new_present
+        total_present = self.roster.total_present
+        total_students = len(self.roster)
+        absent = self.roster.absent
         
         self.present_label.text = f"✅ Present: {total_present} (Existing: {existing_present} + New: {new_present})"
         self.absent_label.text = f"❌ Absent: {absent}"
         self.total_label.text = f"📊 Total: {total_students}"
     
+    def update_section_table(self):
+        """Rebuild the per-section counters table (loads only)"""
+        workbooks = self.sections.workbooks if self.sections is not None else []
+        self.section_table.reset([workbook.counters() for workbook in workbooks])
+    
     def update_preview(self, widget):
-        """Update preview table with EXACT Tkinter logic"""
-        if not self.student_names:
+        """Rebuild preview table with EXACT Tkinter logic (file loads / refresh)"""
+        if not self.roster.records:
             return
         
         data = []
-        for idx, student in enumerate(self.student_names, 1):
-            name = student['name']
-            
-            if self.existing_marks.get(name, False):
-                status = "✅ (Before)"
-            elif any(s['name'] == name for s in self.scanned_today):
-                status = "✅ (Today)"
-            else:
-                status = "⭕ Absent"
-            
+        for idx, student in enumerate(self.roster.records, 1):
             data.append({
                 'number': str(idx),
-                'name': name,
-                'status': status
+                'name': student.name,
+                'status': student.status,
+                'key': self.preview_key(student),
             })
         
-        self.preview_tree.data = data
+        self.preview_table.reset(data)
+    
+    def preview_key(self, student):
+        """Preview row key: workbook + sheet row (names repeat across sections)"""
+        if self.sections is not None:
+            return f"{self.sections.workbook_of(student).path.name}:{student.row}"
+        return str(student.row)
     
-    def auto_save_attendance(self):
-        """Auto-save attendance after each scan with EXACT Tkinter logic"""
+    def auto_save_attendance(self, student, seen_at=None, event_id=None):
+        """Queue the ✓ for a scanned student - saved in the background
+        
+        event_id: already journaled (remote scans); otherwise journaled here
+        """
         try:
-            if not self.sf2_file or self.current_column is None:
+            autosave, column, file_path = self.save_target(student)
+            if not autosave or column is None:
                 return
             
-            # CHECK IF EXCEL IS OPEN!
-            if self.is_excel_file_open(self.sf2_file):
-                print(f"⚠️  WARNING: Excel file is OPEN! Cannot save!")
-                self.main_window.error_dialog(
-                    "Excel Open",
-                    "❌ Excel file is currently open!\n\n"
-                    "Close the file in Excel before scanning more students.\n\n"
-                    "The system cannot write while Excel has the file locked!"
-                )
-                return
+            timestamp = seen_at or time.time()  # When the badge was in front of the camera
+            if event_id is None:
+                try:
+                    event_id = self.journal.append(student.name, student.row, column,
+                                                   file_path, timestamp)
+                except OSError as e:
+                    print(f"⚠️  Journal error: {e}")
             
-            # Mark the last scanned student
-            if self.scanned_today:
-                last_scanned = self.scanned_today[-1]['name']
-                
-                for student in self.student_names:
-                    if student['name'] == last_scanned:
-                        row = student['row']
-                        self.sf2_sheet.cell(row, self.current_column).value = "✓"
-                        print(f"  💾 Auto-saved: {last_scanned}")
-                        break
-                
-                # Save file
-                self.sf2_workbook.save(self.sf2_file)
+            autosave.submit(student.name, student.row, column, timestamp, event_id)
+            self.metrics.scan_queued(event_id, timestamp)
+            self.ui_scheduler.mark_dirty("save_status", self.update_save_status)
         
         except Exception as e:
             print(f"❌ Auto-save error: {e}")
     
+    def save_target(self, student):
+        """(auto-saver, today's column, workbook) a scanned student is written to"""
+        if self.sections is not None:
+            workbook = self.sections.workbook_of(student)
+            return workbook.autosave, workbook.column, workbook.path
+        return self.autosave, self.current_column, self.sf2_file
+    
+    def autosave_workers(self):
+        """Every running auto-saver (one per workbook in multi-section mode)"""
+        if self.sections is not None:
+            return [workbook.autosave for workbook in self.sections.workbooks if workbook.autosave]
+        return [self.autosave] if self.autosave else []
+    
+    def replay_journal(self, section=None):
+        """Re-apply journaled scans for the loaded file (or one section) that were never saved"""
+        file_path = section.path if section else self.sf2_file
+        autosave = section.autosave if section else self.autosave
+        column = section.column if section else self.current_column
+        roster = section.roster if section else self.roster
+        try:
+            pending = self.journal.pending(file_path)
+        except OSError as e:
+            print(f"⚠️  Journal error: {e}")
+            return
+        
+        if not pending:
+            return
+        
+        print(f"♻️  Replaying {len(pending)} unsaved scan(s) from the journal")
+        today = datetime.now().date()
+        for entry in pending:
+            autosave.submit(entry["student"], entry["row"], entry["column"],
+                            entry["timestamp"], entry["id"])
+            
+            # Show today's recovered scans as scanned in this session
+            # (self.roster is the SectionIndex in multi-section mode)
+            scanned_at = datetime.fromtimestamp(entry["timestamp"])
+            student = roster.get(entry["student"])
+            if (student and entry["column"] == column and scanned_at.date() == today
+                    and not student.marked_before and not student.scanned):
+                self.roster.mark_record(student, scanned_at.strftime("%H:%M:%S"))
+                print(f"  ♻️  {student.name} ({scanned_at:%H:%M:%S})")
+        
+        self.loop.run_in_executor(None, autosave.flush)  # Save them now, off the UI thread
+    
+    def on_autosave_flush(self, worker):
+        """Called on the auto-save thread after each save"""
+        self.metrics.record("persist", worker.last_flush_latency)
+        self.metrics.scans_saved([event.event_id for event in worker.last_saved],
+                                 worker.last_flush_time)
+        
+        # Keep the parsed-roster cache valid for the next launch
+        if worker.last_pre_save_stat:
+            try:
+                self.roster_cache.apply_marks(
+                    worker.file_path,
+                    [(event.row, event.column) for event in worker.last_saved],
+                    worker.last_pre_save_stat,
+                )
+            except OSError as e:
+                print(f"⚠️  Roster cache write error: {e}")
+        
+        self.loop.call_soon_threadsafe(self.ui_scheduler.mark_dirty, "save_status", self.update_save_status)
+    
+    def on_autosave_lock_change(self, locked):
+        """Called on the auto-save thread when Excel opens/closes the file"""
+        # Status label only - a modal dialog here would interrupt scanning
+        self.loop.call_soon_threadsafe(self.ui_scheduler.mark_dirty, "save_status", self.update_save_status)
+    
+    def update_save_status(self):
+        """Show auto-save queue depth and last save latency"""
+        if self.forwarder:
+            self.save_status.text = f"📡 Scanner: {self.forwarder.summary()}"
+        elif self.sections is not None:
+            workers = self.autosave_workers()
+            locked = sum(1 for worker in workers if worker.locked)
+            waiting = sum(worker.queue_depth for worker in workers)
+            text = f"{'⏳' if locked else '💾'} Auto-save: {len(workers)} workbooks, {waiting} waiting"
+            if locked:
+                text += f", {locked} open in Excel"
+            self.save_status.text = text
+        elif self.autosave:
+            prefix = "⏳" if self.autosave.locked else "💾"
+            self.save_status.text = f"{prefix} Auto-save: {self.autosave.summary()}"
+    
+    def update_metrics_view(self):
+        """Show the latest pipeline metrics in the SETTINGS tab"""
+        self.metrics_view.value = "\n".join(self.metrics.summary_lines())
+    
+    def export_metrics(self, widget):
+        """Save a metrics snapshot as JSON next to the SF2 folders"""
+        try:
+            path = self.base_folder / f"metrics_{datetime.now():%Y%m%d_%H%M%S}.json"
+            self.metrics.export(path)
+            print(f"💾 Metrics exported: {path}")
+            self.main_window.info_dialog("Metrics Exported", f"✅ Saved to:\n{path}")
+        except Exception as e:
+            print(f"❌ Metrics export error: {e}")
+            self.main_window.error_dialog("Error", f"Cannot export metrics: {e}")
+    
+    async def flush_autosave(self):
+        """Save every worker's pending marks (in parallel, off the UI thread)"""
+        import asyncio
+        workers = self.autosave_workers()
+        await asyncio.gather(*(self.loop.run_in_executor(None, worker.flush)
+                               for worker in workers))
+        self.ui_scheduler.mark_dirty("save_status", self.update_save_status)
+    
+    async def stop_autosave(self):
+        """Flush and stop the auto-save worker(s) for the current file(s)
+        
+        Detached first, so scans arriving meanwhile are not queued into a
+        stopping worker; the blocking stop() calls run in the executor.
+        """
+        import asyncio
+        workers = self.autosave_workers()
+        self.autosave = None
+        if self.sections is not None:
+            for workbook in self.sections.workbooks:
+                workbook.autosave = None
+        await asyncio.gather(*(self.loop.run_in_executor(None, worker.stop)
+                               for worker in workers))
+    
+    def on_exit(self):
+        """Save pending marks before the app closes
+        
+        The first request only starts the shutdown and keeps the app open;
+        finish_exit() saves off the UI thread, then exits for real.
+        """
+        if self.exiting:
+            return True
+        self.exiting = True
+        if self.camera_active:
+            self.stop_camera(None)
+        if self.collector:
+            self.collector.stop()
+        if self.forwarder:
+            self.forwarder.stop()  # Unsent scans stay in the buffer for next time
+        self.set_label(self.save_status, "💾 Saving before exit...")
+        self.loop.create_task(self.finish_exit())
+        return False
+    
+    async def finish_exit(self):
+        try:
+            await self.stop_autosave()
+            self.journal.compact()
+        except OSError as e:
+            print(f"⚠️  Journal error: {e}")
+        except Exception as e:
+            print(f"❌ Exit save error: {e}")
+        self.exit()
+    
     def refresh_file_list(self, widget):
         """Refresh file list"""
         try:
@@ -0,0 +1,137 @@
+"""
+Dr. Alfredo Pio De Roda ES - Compact Badge IDs
+Short, checksummed QR payloads resolved through the roster
+
+A full student name makes a long payload, so the QR needs a higher
+version (denser modules) that decodes slower and worse at distance.
+A badge ID is only the section code plus the learner number from
+Column A and a check character:
+
+    ID:GRADE6RIZAL-12-K
+
+Everything is in the QR alphanumeric set (0-9, A-Z, space $%*+-./:),
+which packs 5.5 bits per character instead of 8. The check character
+(Luhn mod 36) rejects misreads before the roster lookup. Name badges
+keep working: anything without the ID: prefix is treated as a name.
+
+Learner numbers must be unique within a section. Rows sharing a number
+(or whose numbers normalise to the same code, e.g. "12" and "12.0") get
+no ID badge at all - they fall back to name badges, with a warning -
+instead of one learner silently being marked for another.
+"""
+
+import re
+from pathlib import Path
+
+
+BADGE_PREFIX = "ID:"
+ALPHABET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+MAX_SECTION_LENGTH = 12
+
+_NOT_ALNUM = re.compile(r'[^0-9A-Z]')
+_SECTION_LABEL = re.compile(r'^\s*section\b\s*:?\s*(.*)$', re.IGNORECASE)
+
+
+def section_code(text):
+    """'Grade 6 - Rizal' -> 'GRADE6RIZAL' (alphanumeric, bounded length)"""
+    return _NOT_ALNUM.sub('', str(text).upper())[:MAX_SECTION_LENGTH]
+
+
+def learner_code(number):
+    """Column A value -> ID part ('12', 12, 12.0 -> '12'); '' if unusable"""
+    if isinstance(number, float) and number.is_integer():
+        number = int(number)
+    text = str(number or '').strip()
+    if text.endswith(".0") and text[:-2].isdigit():
+        text = text[:-2]
+    return _NOT_ALNUM.sub('', text.upper())
+
+
+def check_char(body):
+    """Luhn mod 36 over the alphanumeric characters of body"""
+    total = 0
+    factor = 2
+    for char in reversed(_NOT_ALNUM.sub('', body)):
+        addend = factor * ALPHABET.index(char)
+        total += addend // 36 + addend % 36
+        factor = 1 if factor == 2 else 2
+    return ALPHABET[(36 - total % 36) % 36]
+
+
+def workbook_section(section, file_path):
+    """Section code for a workbook: its header Section, else the file name"""
+    return section_code(section or Path(file_path).stem)
+
+
+def badge_key(section, number):
+    """'SECTION-NUM' roster key, or None if there is no usable number"""
+    section = section_code(section)
+    number = learner_code(number)
+    if not section or not number:
+        return None
+    return f"{section}-{number}"
+
+
+def make_badge_id(section, number):
+    """Badge payload for a learner, or None if there is no usable number"""
+    body = badge_key(section, number)
+    if body is None:
+        return None
+    return f"{BADGE_PREFIX}{body}-{check_char(body)}"
+
+
+def is_badge_id(payload):
+    return payload.startswith(BADGE_PREFIX)
+
+
+def parse_badge_id(payload):
+    """'ID:SECTION-NUM-C' -> 'SECTION-NUM' if the check character matches"""
+    if not is_badge_id(payload):
+        return None
+    body, _, check = payload[len(BADGE_PREFIX):].strip().upper().rpartition('-')
+    if not body or len(check) != 1 or check_char(body) != check:
+        return None
+    return body
+
+
+def find_section(values):
+    """Section name from one SF2 header row, or None
+    
+    Handles "Section" / "Section:" followed by the value in a later cell
+    (merged header cells leave blanks in between) and "Section: Rizal"
+    in a single cell.
+    """
+    for index, value in enumerate(values):
+        if not isinstance(value, str):
+            continue
+        match = _SECTION_LABEL.match(value)
+        if not match:
+            continue
+        if match.group(1).strip():
+            return match.group(1).strip()
+        for later in values[index + 1:]:
+            if later is not None and str(later).strip():
+                return str(later).strip()
+    return None
+
+
+def badge_collisions(section, learners):
+    """Badge IDs shared by several rows: {'SECTION-NUM': [(row, name), ...]}
+    
+    learners: iterable of (row, name, number); rows without a usable
+    number have no badge ID and are not reported here.
+    """
+    rows_by_key = {}
+    for row, name, number in learners:
+        key = badge_key(section, number)
+        if key:
+            rows_by_key.setdefault(key, []).append((row, name))
+    return {key: rows for key, rows in rows_by_key.items() if len(rows) > 1}
+
+
+def warn_badge_collisions(collisions):
+    """Print which rows share a learner number (they get name badges)"""
+    for key, rows in sorted(collisions.items()):
+        listed = ", ".join(f"row {row} ({name})" for row, name in rows)
+        print(f"⚠️  Learner no. {key.rsplit('-', 1)[1]} is used by {listed} - "
+              f"fix Column A; name badges until then")
@@ -0,0 +1,241 @@
+"""
+Dr. Alfredo Pio De Roda ES - Headless Batch Attendance
+Mark attendance from a folder of images or a recorded video
+
+Runs the same decode -> validate/match -> mark pipeline as the camera
+scanner, without Toga or a camera: frames are decoded in parallel
+(decode_frame on a thread or process pool), matched and deduplicated by
+the same ScanRecorder the camera lanes use (ID badges and names) and
+written to the SF2 workbook by the AutosaveWorker. Also a GUI-free way
+to measure decode throughput.
+
+Video frames are timed by their position in the recording
+(CAP_PROP_POS_MSEC), so scan times and the rapid re-scan window follow
+the video, not the replay.
+
+Usage:
+    python src/attendanceapp/batch.py SF2.xlsx photos/
+    python src/attendanceapp/batch.py SF2.xlsx recording.mp4 --every 5 --workers 4
+    python src/attendanceapp/batch.py SF2.xlsx recording.mp4 --dry-run
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+import cv2
+
+try:
+    from .scan_pipeline import decode_frame
+    from .recorder import ScanRecorder, NEW, BEFORE, INVALID, UNKNOWN
+    from .roster import RosterIndex
+    from .roster_cache import RosterCache
+    from .persistence import AutosaveWorker
+    from .excel_lock import ExcelLockDetector
+    from .badge_id import workbook_section
+    from .pools import create_executor, default_mode
+except ImportError:
+    from scan_pipeline import decode_frame
+    from recorder import ScanRecorder, NEW, BEFORE, INVALID, UNKNOWN
+    from roster import RosterIndex
+    from roster_cache import RosterCache
+    from persistence import AutosaveWorker
+    from excel_lock import ExcelLockDetector
+    from badge_id import workbook_section
+    from pools import create_executor, default_mode
+
+
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".bmp", ".webp", ".tif", ".tiff"}
+
+
+def iter_frames(source, every=1):
+    """Yield (label, frame, timestamp) from an image folder or a video file
+    
+    Images are timed by their file mtime. Video frames by their position
+    in the video, counted from when the recording started (the file's
+    mtime minus the video length - the recorder writes until the end).
+    """
+    source = Path(source)
+    if source.is_dir():
+        paths = sorted(p for p in source.iterdir() if p.suffix.lower() in IMAGE_SUFFIXES)
+        for index, path in enumerate(paths):
+            if index % every:
+                continue
+            frame = cv2.imread(str(path))
+            if frame is None:
+                print(f"⚠️  Cannot read image: {path.name}")
+                continue
+            yield path.name, frame, path.stat().st_mtime
+        return
+    
+    capture = cv2.VideoCapture(str(source))
+    if not capture.isOpened():
+        raise ValueError(f"Cannot open video: {source}")
+    try:
+        fps = capture.get(cv2.CAP_PROP_FPS)
+        frame_count = capture.get(cv2.CAP_PROP_FRAME_COUNT)
+        length = frame_count / fps if fps > 0 and frame_count > 0 else 0.0
+        started = source.stat().st_mtime - length
+        
+        index = 0
+        while True:
+            if index % every:
+                # Skip without decoding the image
+                if not capture.grab():
+                    break
+            else:
+                ret, frame = capture.read()
+                if not ret:
+                    break
+                position = capture.get(cv2.CAP_PROP_POS_MSEC) / 1000
+                yield f"frame {index} ({position:.1f}s)", frame, started + position
+            index += 1
+    finally:
+        capture.release()
+
+
+def decode_item(item):
+    """Decode one (label, frame, timestamp) - runs inside a pool worker"""
+    label, frame, timestamp = item
+    start = time.perf_counter()
+    try:
+        detections = decode_frame(frame, timestamp)
+    except Exception:
+        detections = []  # Silently ignore QR decode errors
+    return label, timestamp, detections, time.perf_counter() - start
+
+
+def decode_all(frames, workers, mode):
+    """Decode frames in parallel, in order, with a bounded number in flight"""
+    executor, mode = create_executor(mode, workers, "qr-decoder")
+    in_flight = deque()
+    try:
+        for item in frames:
+            in_flight.append(executor.submit(decode_item, item))
+            if len(in_flight) >= workers * 2:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+def build_roster(workbook, day):
+    """Parse the workbook; returns (RosterIndex, date column or None)"""
+    sf2_data, _ = RosterCache().read(workbook)
+    date_column, day_letter = sf2_data.date_columns.get(day, (None, None))
+    if date_column is None:
+        print(f"⚠️  Date {day} NOT FOUND in Row 11")
+    else:
+        print(f"✅ Date {day} ({day_letter}) → Column {date_column}")
+    
+    roster = RosterIndex(workbook_section(sf2_data.section, workbook))
+    for student in sf2_data.students:
+        roster.add(student.name, student.number, student.row, date_column in student.marks)
+    roster.warn_collisions()
+    print(f"👥 {len(roster)} students, section code {roster.section}")
+    return roster, date_column
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Mark SF2 attendance from images or a video, without the GUI")
+    parser.add_argument("workbook", type=Path, help="SF2 Excel file to mark")
+    parser.add_argument("source", type=Path, help="Folder of images or a video file")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Parallel decoders (default: CPU count)")
+    parser.add_argument("--mode", choices=("thread", "process"), default=default_mode(),
+                        help="Decoder pool type (default: process, threads on Android)")
+    parser.add_argument("--every", type=int, default=1,
+                        help="Decode every Nth frame/image (default: 1)")
+    parser.add_argument("--day", type=int, default=datetime.now().day,
+                        help="Day of month to mark (default: today)")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Report matches without writing the workbook")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    workers = max(1, args.workers)
+    every = max(1, args.every)
+    
+    print(f"\n{'='*80}")
+    print(f"BATCH ATTENDANCE: {args.workbook.name} <- {args.source}")
+    print(f"{'='*80}")
+    
+    roster, date_column = build_roster(args.workbook, args.day)
+    dry_run = args.dry_run or date_column is None
+    
+    writer = None
+    if not dry_run:
+        cache = RosterCache()
+        
+        def refresh_cache(worker):
+            if worker.last_pre_save_stat:
+                cache.apply_marks(worker.file_path,
+                                  [(event.row, event.column) for event in worker.last_saved],
+                                  worker.last_pre_save_stat)
+        
+        writer = AutosaveWorker(args.workbook, interval=5.0, batch_size=500,
+                                is_locked=ExcelLockDetector().is_locked, on_flush=refresh_cache)
+    
+    recorder = ScanRecorder(roster)
+    frames = 0
+    detections = 0
+    decode_seconds = 0.0
+    unknown = set()
+    already_marked = set()
+    
+    start = time.perf_counter()
+    for label, timestamp, found, seconds in decode_all(iter_frames(args.source, every), workers, args.mode):
+        frames += 1
+        decode_seconds += seconds
+        detections += len(found)
+        
+        for detection in found:
+            # Same validate -> match -> dedupe -> mark step as the camera lanes
+            outcome = recorder.record(detection)
+            if outcome.status in (INVALID, UNKNOWN):
+                unknown.add(detection.payload)
+            elif outcome.status == BEFORE:
+                already_marked.add(outcome.student.name)
+            elif outcome.status == NEW:
+                student = outcome.student
+                print(f"  ✅ {student.name} ({label}, {student.scan_time})")
+                if writer:
+                    writer.submit(student.name, student.row, date_column, detection.timestamp)
+    elapsed = time.perf_counter() - start
+    
+    saved = True
+    if writer:
+        writer.stop(timeout=None)  # A big batch may take a while - wait for the save
+        saved = writer.unsaved == 0
+    
+    fps = frames / elapsed if elapsed else 0.0
+    avg_ms = decode_seconds / frames * 1000 if frames else 0.0
+    print(f"\n{'-'*80}")
+    print(f"🎞️  Frames: {frames} decoded in {elapsed:.2f}s ({fps:.1f} fps, "
+          f"avg decode {avg_ms:.1f} ms, {workers} {args.mode} worker(s))")
+    print(f"🔍 QR codes: {detections} detections, {len(unknown)} unknown payload(s)")
+    for payload in sorted(unknown):
+        print(f"    ⊘  {payload}")
+    print(f"✅ New marks: {roster.new_present}   "
+          f"✓ Already marked: {len(already_marked)}   "
+          f"⭕ Absent: {roster.absent}   Total present: {roster.total_present}/{len(roster)}")
+    
+    if dry_run:
+        print("💤 Dry run - workbook not modified")
+    elif saved:
+        print(f"💾 Saved to {args.workbook}")
+    else:
+        print(f"❌ {writer.unsaved} mark(s) NOT saved - is the file open in Excel?")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
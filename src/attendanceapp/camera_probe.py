@@ -0,0 +1,234 @@
+"""
+Dr. Alfredo Pio De Roda ES - Camera Discovery
+Non-blocking camera startup for the Attendance System
+
+start_camera used to open index 0 on the UI thread, sleep 0.5 s, then
+try indices 1-4 one after another with 0.3 s sleeps - a failed start
+froze the window for ~2 s. Now:
+
+1. The device that worked last time (SF2_Files/camera.json) is opened
+   first, on a background thread.
+2. If it fails (or there is none), every camera index is probed
+   concurrently. Within one index the backends are tried one after
+   another, preferred first (DSHOW and MSMF opening the same device at
+   the same time fight over exclusive access). The lowest working index
+   wins, so the choice does not depend on which driver answers first
+   (an IR or virtual camera at a higher index is not locked in), and
+   the feed starts as soon as no lower index is still being probed.
+   Cameras opened by the other probes are released.
+3. The winner's capture and first frame are handed back with the
+   startup latency, and remembered for the next start.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import cv2
+
+
+# One device to try: camera index + OpenCV capture backend (cv2.CAP_*)
+CameraCandidate = namedtuple("CameraCandidate", ["index", "backend"])
+
+# What a successful probe hands back
+CameraStart = namedtuple("CameraStart", ["capture", "frame", "candidate", "latency", "cached"])
+
+MAX_INDEX = 4
+FRAME_WIDTH = 640
+FRAME_HEIGHT = 480
+FRAME_FPS = 30
+
+
+def backend_name(backend):
+    for name in ("CAP_ANY", "CAP_DSHOW", "CAP_MSMF", "CAP_V4L2", "CAP_AVFOUNDATION", "CAP_ANDROID"):
+        if getattr(cv2, name, None) == backend:
+            return name[4:]
+    return str(backend)
+
+
+def platform_backends():
+    """Capture backends worth trying on this OS, most reliable first"""
+    if os.name == 'nt':
+        # DirectShow first (more reliable), Media Foundation as fallback
+        return [cv2.CAP_DSHOW, cv2.CAP_MSMF]
+    if sys.platform == 'darwin':
+        return [cv2.CAP_AVFOUNDATION]
+    return [cv2.CAP_ANY]
+
+
+def default_candidates():
+    return [CameraCandidate(index, backend)
+            for index in range(MAX_INDEX + 1) for backend in platform_backends()]
+
+
+def open_candidate(candidate):
+    """Open one device and read a real frame; (capture, frame) or None"""
+    capture = cv2.VideoCapture(candidate.index, candidate.backend)
+    if not capture.isOpened():
+        capture.release()
+        return None
+    
+    # Set camera properties for better mobile performance
+    capture.set(cv2.CAP_PROP_FRAME_WIDTH, FRAME_WIDTH)
+    capture.set(cv2.CAP_PROP_FRAME_HEIGHT, FRAME_HEIGHT)
+    capture.set(cv2.CAP_PROP_FPS, FRAME_FPS)
+    capture.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # Reduce buffer for less lag
+    
+    ret, frame = capture.read()
+    if not ret or frame is None:
+        capture.release()
+        return None
+    return capture, frame
+
+
+class CameraProbe:
+    """Find a working camera in the background, cached choice first"""
+    
+    def __init__(self, config_path, candidates=None, workers=4):
+        self.config_path = config_path
+        self.candidates = candidates or default_candidates()
+        self.workers = workers
+        self.cancelled = threading.Event()
+        self.thread = None
+    
+    def load_cached(self):
+        try:
+            with open(self.config_path, encoding='utf-8') as f:
+                data = json.load(f)
+            return CameraCandidate(int(data["index"]), int(data["backend"]))
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+    
+    def save(self, candidate):
+        """Remember the working device (keeps other keys in camera.json)"""
+        try:
+            with open(self.config_path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        data.update({"index": candidate.index, "backend": candidate.backend,
+                     "backend_name": backend_name(candidate.backend)})
+        temp_path = self.config_path.with_name(self.config_path.name + ".tmp")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+        os.replace(temp_path, self.config_path)
+    
+    def start(self, on_ready, on_failed):
+        """Probe on a background thread; exactly one callback runs on it"""
+        self.cancelled.clear()
+        self.thread = threading.Thread(target=self._run, args=(on_ready, on_failed),
+                                       name="camera-probe", daemon=True)
+        self.thread.start()
+    
+    def cancel(self):
+        """Give up; a camera found afterwards is released instead of delivered"""
+        self.cancelled.set()
+    
+    def _run(self, on_ready, on_failed):
+        start = time.perf_counter()
+        try:
+            cached = self.load_cached()
+            opened = found = None
+            if cached is not None:
+                print(f"📷 Trying last camera: index {cached.index} ({backend_name(cached.backend)})")
+                opened = open_candidate(cached)
+                if opened:
+                    found = CameraStart(*opened, cached, time.perf_counter() - start, True)
+            
+            if not opened:
+                found = self._probe_all(exclude=cached, start=start)
+            
+            if self.cancelled.is_set():
+                if found:
+                    found.capture.release()
+                return
+            
+            if found is None:
+                on_failed()
+                return
+            
+            try:
+                self.save(found.candidate)
+            except OSError as e:
+                print(f"⚠️  Cannot remember camera: {e}")
+            on_ready(found)
+        except Exception as e:
+            print(f"❌ Camera probe error: {e}")
+            on_failed()
+    
+    def _probe_all(self, exclude, start):
+        """Probe every index concurrently; the lowest working index wins
+        
+        Waits on the probes in rank order, so it returns as soon as the
+        best remaining index opens - slower, worse-ranked probes are not
+        waited for and release their camera when they finish.
+        """
+        groups = {}  # index -> its backends, preferred first
+        for candidate in sorted(self.candidates, key=candidate_rank):
+            if candidate != exclude:
+                groups.setdefault(candidate.index, []).append(candidate)
+        print(f"📷 Probing {len(groups)} camera index(es) concurrently...")
+        
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="camera-probe")
+        futures = [executor.submit(self._open_index, group) for group in groups.values()]
+        winner = None
+        winning_future = None
+        try:
+            for future in futures:
+                while not self.cancelled.is_set() and not wait([future], timeout=0.2).done:
+                    pass
+                if self.cancelled.is_set():
+                    break
+                try:
+                    opened = future.result()
+                except Exception as e:
+                    print(f"   Camera probe: {e}")
+                    continue
+                if opened:
+                    winner, winning_future = opened, future
+                    break
+        finally:
+            for future in futures:
+                if future is not winning_future and not future.cancel():
+                    future.add_done_callback(_release_opened)
+            executor.shutdown(wait=False)
+        
+        if winner is None:
+            return None
+        candidate, (capture, frame) = winner
+        if self.cancelled.is_set():
+            capture.release()
+            return None
+        print(f"✅ Camera {candidate.index} ({backend_name(candidate.backend)}) opened!")
+        return CameraStart(capture, frame, candidate, time.perf_counter() - start, False)
+    
+    def _open_index(self, candidates):
+        """One device index: its backends in order, the next only if the previous failed"""
+        for candidate in candidates:
+            if self.cancelled.is_set():
+                return None
+            opened = open_candidate(candidate)
+            if opened:
+                return candidate, opened
+        return None
+
+
+def candidate_rank(candidate):
+    """Sort key: lower index first, then the platform's preferred backend"""
+    backends = platform_backends()
+    preference = backends.index(candidate.backend) if candidate.backend in backends else len(backends)
+    return candidate.index, preference
+
+
+def _release_opened(future):
+    try:
+        opened = future.result()
+    except Exception:
+        return
+    if opened:
+        candidate, (capture, frame) = opened
+        capture.release()
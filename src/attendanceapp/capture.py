@@ -0,0 +1,119 @@
+"""
+Dr. Alfredo Pio De Roda ES - Frame Grabber
+Event-driven camera capture for the Attendance System
+
+The capture thread calls grab() back to back - it blocks until the
+camera has the next frame, so there is no sleep-polling - and keeps the
+driver buffer drained so frames never go stale. The expensive part,
+retrieve() (decompress/convert into a BGR array), only runs when a
+consumer is waiting for a frame. The result goes into a single
+latest-frame slot guarded by a Condition: consumers block in read()
+until a newer frame than the one they already have is published.
+
+Counters: grabbed (every frame the camera produced), retrieved (turned
+into an image) and dropped (grabbed but nobody wanted it).
+"""
+
+import threading
+import time
+
+
+class FrameGrabber:
+    """Owns a cv2.VideoCapture and publishes the latest wanted frame"""
+    
+    def __init__(self, capture, max_failures=30, on_grab=None):
+        self.capture = capture
+        self.max_failures = max_failures  # Stop after this many failed grabs in a row
+        self.on_grab = on_grab  # Called with the grab() duration in seconds
+        
+        self.condition = threading.Condition()
+        self.frame = None
+        self.seq = 0
+        self.timestamp = None
+        self.waiting = 0  # Consumers blocked in read()
+        self.running = False
+        self.thread = None
+        
+        self.grabbed = 0
+        self.retrieved = 0
+        self.dropped = 0
+        self.failures = 0
+    
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="frame-grabber", daemon=True)
+        self.thread.start()
+    
+    def stop(self, timeout=1.0):
+        """Stop grabbing and wake every consumer (capture is not released)"""
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join(timeout)
+    
+    def read(self, last_seq=0, timeout=None):
+        """Block until a frame newer than last_seq exists
+        
+        Returns (seq, frame, timestamp), or None on timeout / stop.
+        """
+        with self.condition:
+            self.waiting += 1
+            try:
+                ready = self.condition.wait_for(
+                    lambda: self.seq > last_seq or not self.running, timeout)
+                if not ready or self.seq <= last_seq:
+                    return None
+                return self.seq, self.frame, self.timestamp
+            finally:
+                self.waiting -= 1
+    
+    def _run(self):
+        consecutive_failures = 0
+        while self.running:
+            try:
+                start = time.perf_counter()
+                ok = self.capture.grab()
+                if self.on_grab:
+                    self.on_grab(time.perf_counter() - start)
+            except Exception as e:
+                print(f"Frame grabber error: {e}")
+                ok = False
+            
+            if not ok:
+                self.failures += 1
+                consecutive_failures += 1
+                if consecutive_failures >= self.max_failures:
+                    print(f"❌ Frame grabber: {self.max_failures} consecutive failures, stopping...")
+                    break
+                time.sleep(0.05)  # Brief wait before retry
+                continue
+            
+            consecutive_failures = 0
+            self.grabbed += 1
+            
+            with self.condition:
+                wanted = self.waiting > 0
+            if not wanted:
+                self.dropped += 1  # Skipped cheaply - never decoded into an image
+                continue
+            
+            ok, frame = self.capture.retrieve()
+            if not ok or frame is None:
+                self.failures += 1
+                continue
+            
+            with self.condition:
+                self.frame = frame
+                self.seq += 1
+                self.timestamp = time.time()
+                self.retrieved += 1
+                self.condition.notify_all()
+        
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+    
+    def summary(self):
+        return (f"grabbed {self.grabbed}, retrieved {self.retrieved}, "
+                f"dropped {self.dropped}, failures {self.failures}")
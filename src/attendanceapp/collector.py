@@ -0,0 +1,575 @@
+"""
+Dr. Alfredo Pio De Roda ES - Scan Collector
+Several scanning stations sharing one workbook owner
+
+One device runs as the COLLECTOR: it owns the SF2 workbook (roster,
+journal, auto-save) and serves a small HTTP endpoint on the local
+network. Other devices run as thin SCANNERS: they decode badges and
+forward the payloads instead of writing their own copy of the xlsx.
+
+    POST /scans   {"station": "Door 2",
+                   "scans": [{"event_id": ..., "payload": ..., "timestamp": ...}]}
+              ->  {"results": [{"event_id": ..., "payload": ..., "status": "new",
+                                "student": ...}]}
+    GET  /status  roster counters, workbook, stations seen
+
+Every request must carry the shared station token in the
+X-Station-Token header (compared in constant time); anything else gets
+401. A collector without a token in station.json does not start.
+
+Every scan carries an event_id chosen by the scanner. The collector
+acknowledges a scan only after it is journaled (a journal write failure
+refuses the rest of the batch with 503, so the scanner retries) and
+remembers each acknowledged id with its result (collector_acks.jsonl).
+A retried batch gets the original results back for the scans already
+recorded, even when the first try failed halfway, instead of counting
+them twice. Scanners keep unacknowledged scans in a disk buffer
+(forward_buffer.jsonl) and retry with backoff while the collector is
+unreachable or answers 5xx. A 4xx is not retried: 401 stops the
+forwarder until the token is fixed, any other 4xx moves the batch to
+forward_buffer.rejected.jsonl so the scans behind it still go out.
+
+The role is set in SF2_Files/station.json:
+
+    {"mode": "collector", "host": "192.168.1.10", "port": 8765, "token": "..."}
+    {"mode": "scanner", "station": "Door 2", "collector_url": "http://192.168.1.10:8765",
+     "token": "..."}
+
+Bind the collector to its address on the school LAN. "0.0.0.0" listens
+on EVERY network the device is on (including a hotspot or public
+Wi-Fi) - the traffic is plain HTTP, so only the token keeps strangers
+from posting scans. Use a long random token, e.g.
+python -c "import secrets; print(secrets.token_urlsafe(24))".
+
+Everything also works on one machine (127.0.0.1), e.g. for testing:
+
+    python src/attendanceapp/collector.py --token ... status
+    python src/attendanceapp/collector.py --token ... send "SANTOS, JUAN A." --station test
+"""
+
+import argparse
+import hmac
+import json
+import os
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import namedtuple
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+
+DEFAULT_PORT = 8765
+DEFAULT_URL = f"http://127.0.0.1:{DEFAULT_PORT}"
+MODES = ("standalone", "collector", "scanner")
+MAX_BODY = 1024 * 1024  # Bytes accepted per POST
+TOKEN_HEADER = "X-Station-Token"
+# 4xx replies a retry cannot fix (408 timeout / 429 throttling are retried)
+FATAL_STATUS = frozenset(range(400, 500)) - {408, 429}
+
+# Where this device sits: standalone (own workbook), collector or scanner
+# (multi_section: load every workbook in Active, see sections.py)
+StationConfig = namedtuple("StationConfig", ["mode", "station", "host", "port", "collector_url",
+                                             "multi_section", "token"])
+
+# One scan received from a scanner station (duck-types a Detection for the ScanRecorder)
+RemoteScan = namedtuple("RemoteScan", ["event_id", "payload", "timestamp", "station"])
+
+
+class CollectorUnavailable(Exception):
+    """The collector cannot take scans right now (e.g. no workbook loaded)"""
+
+
+def load_station_config(path):
+    """Read station.json; a missing or broken file means standalone"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        data = {}
+    except (OSError, ValueError) as e:
+        print(f"⚠️  Cannot read {path}: {e} - running standalone")
+        data = {}
+    
+    mode = data.get("mode", "standalone")
+    if mode not in MODES:
+        print(f"⚠️  Unknown station mode '{mode}' - running standalone")
+        mode = "standalone"
+    return StationConfig(
+        mode=mode,
+        station=str(data.get("station") or os.environ.get("COMPUTERNAME") or "scanner"),
+        host=str(data.get("host", "127.0.0.1")),
+        port=int(data.get("port", DEFAULT_PORT)),
+        collector_url=str(data.get("collector_url", DEFAULT_URL)).rstrip("/"),
+        multi_section=bool(data.get("multi_section", False)),
+        token=str(data.get("token") or ""),
+    )
+
+
+class AckLog:
+    """Scans the collector already acknowledged, with the result each got
+    (append-only, fsync'd)
+    
+    Entries older than `keep_days` are dropped when the log is opened.
+    """
+    
+    def __init__(self, path, keep_days=7):
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        self.results = {}  # event_id -> result dict (None for old id-only entries)
+        self._load(time.time() - keep_days * 86400)
+    
+    def __contains__(self, event_id):
+        with self.lock:
+            return event_id in self.results
+    
+    def __len__(self):
+        return len(self.results)
+    
+    def get(self, event_id):
+        """The result the scan was acknowledged with, or None"""
+        with self.lock:
+            return self.results.get(event_id)
+    
+    def add(self, results):
+        """Remember result dicts (each with its "event_id")"""
+        now = time.time()
+        lines = "".join(json.dumps({"id": r["event_id"], "t": now, "r": r}, ensure_ascii=False) + "\n"
+                        for r in results)
+        if not lines:
+            return
+        with self.lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+            self.results.update((r["event_id"], r) for r in results)
+    
+    def _load(self, cutoff):
+        if not self.path.exists():
+            return
+        kept = []
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # Torn last line after a crash
+                if record.get("t", 0) >= cutoff:
+                    kept.append(record)
+        self.results = {record["id"]: record.get("r") for record in kept}
+        
+        temp_path = self.path.with_suffix(".tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            for record in kept:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        os.replace(temp_path, self.path)
+
+
+class CollectorServer:
+    """Local HTTP endpoint that feeds remote scans into handle_batch
+    
+    handle_batch(station, [RemoteScan], acknowledge) runs on an HTTP
+    handler thread, one batch at a time, and calls acknowledge(scan,
+    ScanOutcome) as soon as each scan is safely recorded. It raises
+    CollectorUnavailable (or anything else) to refuse the rest of the
+    batch so the scanner retries; scans acknowledged before that are
+    answered from the ack log on the retry.
+    """
+    
+    def __init__(self, handle_batch, status=None, host="127.0.0.1", port=DEFAULT_PORT,
+                 ack_log=None, token=""):
+        self.handle_batch = handle_batch
+        self.token = token  # Shared secret every request must send
+        self.status = status  # () -> dict merged into GET /status
+        self.host = host
+        self.port = port
+        self.ack_log = ack_log
+        self.lock = threading.Lock()  # One batch at a time
+        self.stations = {}  # station -> {"last_seen": ..., "scans": ...}
+        self.httpd = None
+        self.thread = None
+        
+        self.batches = 0
+        self.accepted = 0
+        self.duplicates = 0
+    
+    def start(self):
+        if not self.token:
+            raise ValueError('a collector needs a shared "token" in station.json')
+        self.httpd = ThreadingHTTPServer((self.host, self.port), _CollectorHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.collector = self
+        self.port = self.httpd.server_address[1]  # Port 0 -> the one actually bound
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="collector", daemon=True)
+        self.thread.start()
+        print(f"📡 Collector listening on http://{self.host}:{self.port}")
+    
+    def stop(self):
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+    
+    def receive(self, station, scans):
+        """Record a batch; returns one result dict per scan id
+        
+        An id acknowledged before (a retried batch) gets its original
+        result back instead of being recorded again.
+        """
+        with self.lock:
+            seen = self.stations.setdefault(station, {"last_seen": None, "scans": 0})
+            seen["last_seen"] = datetime.now().isoformat(timespec="seconds")
+            results = {}
+            fresh = []
+            for scan in scans:
+                if scan.event_id in results:
+                    continue  # Same id twice in one batch
+                if self.ack_log is not None and scan.event_id in self.ack_log:
+                    results[scan.event_id] = (self.ack_log.get(scan.event_id)
+                                              or _result(scan, "duplicate", None))
+                    self.duplicates += 1
+                else:
+                    results[scan.event_id] = None
+                    fresh.append(scan)
+            
+            def acknowledge(scan, outcome):
+                result = _result(scan, outcome.status, outcome.student.name if outcome.student else None)
+                if self.ack_log is not None:
+                    self.ack_log.add([result])
+                results[scan.event_id] = result
+                self.accepted += 1
+                seen["scans"] += 1
+            
+            if fresh:
+                self.handle_batch(station, fresh, acknowledge)
+            self.batches += 1
+            # A scan the handler did not acknowledge stays unanswered, so
+            # the scanner keeps it buffered and sends it again
+            return [result for result in results.values() if result is not None]
+    
+    def authorized(self, token):
+        return bool(token) and hmac.compare_digest(token.encode("utf-8"), self.token.encode("utf-8"))
+    
+    def status_payload(self):
+        data = {
+            "role": "collector",
+            "batches": self.batches,
+            "accepted": self.accepted,
+            "duplicates": self.duplicates,
+            "stations": dict(self.stations),
+        }
+        if self.status:
+            data.update(self.status())
+        return data
+
+
+def _result(scan, status, student):
+    return {"event_id": scan.event_id, "payload": scan.payload, "status": status, "student": student}
+
+
+class _CollectorHandler(BaseHTTPRequestHandler):
+    """POST /scans, GET /status"""
+    
+    def do_GET(self):
+        if not self._check_token():
+            return
+        if self.path.rstrip("/") != "/status":
+            self._reply(404, {"error": "not found"})
+            return
+        try:
+            self._reply(200, self.server.collector.status_payload())
+        except Exception as e:
+            self._reply(500, {"error": str(e)})
+    
+    def do_POST(self):
+        if not self._check_token():
+            return
+        if self.path.rstrip("/") != "/scans":
+            self._reply(404, {"error": "not found"})
+            return
+        
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            if not 0 < length <= MAX_BODY:
+                raise ValueError(f"body must be 1..{MAX_BODY} bytes")
+            body = json.loads(self.rfile.read(length))
+            station = str(body.get("station") or self.client_address[0])
+            scans = [RemoteScan(str(s["event_id"]), str(s["payload"]),
+                                float(s.get("timestamp") or time.time()), station)
+                     for s in body["scans"]]
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            self._reply(400, {"error": f"bad request: {e}"})
+            return
+        
+        try:
+            results = self.server.collector.receive(station, scans)
+        except CollectorUnavailable as e:
+            self._reply(503, {"error": str(e)})
+            return
+        except Exception as e:
+            print(f"❌ Collector error: {e}")
+            self._reply(500, {"error": str(e)})
+            return
+        self._reply(200, {"results": results})
+    
+    def _check_token(self):
+        if self.server.collector.authorized(self.headers.get(TOKEN_HEADER, "")):
+            return True
+        self._reply(401, {"error": "missing or wrong station token"})
+        return False
+    
+    def _reply(self, code, data):
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass  # Scans are logged by the app, not per request
+
+
+def post_json(url, data, timeout=3.0, token=None):
+    """POST data as JSON; returns the decoded reply (raises OSError / ValueError)"""
+    headers = {"Content-Type": "application/json"}
+    if token:
+        headers[TOKEN_HEADER] = token
+    request = urllib.request.Request(
+        url, data=json.dumps(data, ensure_ascii=False).encode("utf-8"),
+        headers=headers, method="POST")
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.loads(response.read())
+
+
+def get_json(url, timeout=3.0, token=None):
+    request = urllib.request.Request(url, headers={TOKEN_HEADER: token} if token else {})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.loads(response.read())
+
+
+def _error_detail(error):
+    """The "error" text of a collector reply, or the HTTP reason"""
+    try:
+        return json.loads(error.read())["error"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return error.reason
+
+
+class ScanForwarder:
+    """Scanner side: buffer scans on disk and post them to the collector in batches
+    
+    submit() never blocks on the network. A worker thread posts up to
+    `batch_size` scans at a time; acknowledged scans leave the buffer,
+    connection errors and 5xx are retried with exponential backoff (max
+    `max_backoff` s). A 4xx would fail the same way on every retry: 401/403
+    (wrong token) stops sending until restart, any other 4xx moves the
+    batch to the rejected file so the batches behind it still go out.
+    """
+    
+    def __init__(self, url, buffer_path, station, batch_size=25, timeout=3.0,
+                 max_backoff=30.0, on_ack=None, on_state_change=None, on_reject=None, token=""):
+        self.url = url.rstrip("/")
+        self.token = token  # Sent as X-Station-Token
+        self.buffer_path = Path(buffer_path)
+        self.station = station
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.max_backoff = max_backoff
+        self.on_ack = on_ack  # Called with the result dicts of each acked batch
+        self.on_state_change = on_state_change  # Called with True/False when online changes
+        self.on_reject = on_reject  # Called with (message, halted) when the collector answers 4xx
+        self.rejected_path = self.buffer_path.with_suffix(".rejected.jsonl")
+        
+        self.lock = threading.Lock()
+        self.pending = self._load()  # Unacknowledged scans, oldest first
+        self.wakeup = threading.Event()
+        self.stopping = threading.Event()
+        self.online = None  # Unknown until the first post
+        self.last_error = None
+        self.halted = None  # Why sending stopped (token refused), until restart
+        
+        self.sent = 0
+        self.acked = 0
+        self.retries = 0
+        self.rejected = 0
+        
+        if self.pending:
+            print(f"📦 {len(self.pending)} buffered scan(s) waiting for the collector")
+            self.wakeup.set()
+        self.thread = threading.Thread(target=self._run, name="forwarder", daemon=True)
+        self.thread.start()
+    
+    def submit(self, payload, timestamp=None):
+        """Durably buffer one scan for the collector; returns its event id"""
+        event = {"event_id": uuid.uuid4().hex, "payload": payload,
+                 "timestamp": timestamp or time.time()}
+        with self.lock:
+            with open(self.buffer_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(event, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self.pending.append(event)
+        self.wakeup.set()
+        return event["event_id"]
+    
+    @property
+    def waiting(self):
+        return len(self.pending)
+    
+    def summary(self):
+        state = {True: "online", False: "offline", None: "connecting"}[self.online]
+        if self.halted:
+            return f"stopped - {self.halted}, {self.waiting} waiting"
+        text = f"collector {state}, {self.acked} acked, {self.waiting} waiting"
+        if self.rejected:
+            text += f", {self.rejected} rejected"
+        if self.online is False and self.last_error:
+            text += f" ({self.last_error})"
+        return text
+    
+    def stop(self, timeout=2.0):
+        """Stop the worker; unacknowledged scans stay in the buffer file"""
+        self.stopping.set()
+        self.wakeup.set()
+        self.thread.join(timeout)
+    
+    def _run(self):
+        backoff = 0.5
+        while not self.stopping.is_set():
+            self.wakeup.wait()
+            self.wakeup.clear()
+            
+            while not self.stopping.is_set():
+                with self.lock:
+                    batch = self.pending[:self.batch_size]
+                if not batch:
+                    break
+                
+                try:
+                    reply = post_json(f"{self.url}/scans", {"station": self.station, "scans": batch},
+                                      self.timeout, self.token)
+                    results = reply["results"]
+                except (OSError, ValueError, KeyError, TypeError) as e:
+                    if isinstance(e, urllib.error.HTTPError) and e.code in FATAL_STATUS:
+                        self._reject(batch, e)
+                        if self.halted:
+                            return  # Buffered scans wait for a restart with the right token
+                        continue
+                    self.retries += 1
+                    self.last_error = str(e)
+                    self._set_online(False)
+                    self.stopping.wait(backoff)  # Only stop interrupts the backoff
+                    backoff = min(backoff * 2, self.max_backoff)
+                    continue
+                
+                backoff = 0.5
+                self.last_error = None
+                self._set_online(True)
+                self.sent += len(batch)
+                acked = self._drop({r["event_id"] for r in results if "event_id" in r})
+                self.acked += acked
+                if self.on_ack:
+                    try:
+                        self.on_ack(results)
+                    except Exception as e:
+                        print(f"Forwarder callback error: {e}")
+    
+    def _reject(self, batch, error):
+        """The collector refused the request itself (4xx) - retrying cannot help"""
+        detail = _error_detail(error)
+        self.last_error = f"HTTP {error.code}: {detail}"
+        if error.code in (401, 403):
+            self.halted = f"collector refused the station token (HTTP {error.code})"
+            print(f"❌ {self.halted} - check \"token\" in station.json; "
+                  f"{self.waiting} scan(s) stay buffered")
+        else:
+            record = {"rejected_at": time.time(), "status": error.code, "error": detail, "scans": batch}
+            with self.lock:
+                with open(self.rejected_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+            self.rejected += self._drop({event["event_id"] for event in batch})
+            print(f"❌ Collector rejected {len(batch)} scan(s) ({self.last_error}) - "
+                  f"moved to {self.rejected_path.name}")
+        if self.on_reject:
+            try:
+                self.on_reject(self.halted or self.last_error, bool(self.halted))
+            except Exception as e:
+                print(f"Forwarder callback error: {e}")
+    
+    def _drop(self, event_ids):
+        """Remove scans from the buffer and rewrite it; returns how many left"""
+        with self.lock:
+            before = len(self.pending)
+            self.pending = [e for e in self.pending if e["event_id"] not in event_ids]
+            
+            temp_path = self.buffer_path.with_suffix(".tmp")
+            with open(temp_path, "w", encoding="utf-8") as f:
+                for event in self.pending:
+                    f.write(json.dumps(event, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.buffer_path)
+            return before - len(self.pending)
+    
+    def _set_online(self, online):
+        if online == self.online:
+            return
+        self.online = online
+        print(f"📡 Collector {'online' if online else 'unreachable'}: {self.url}")
+        if self.on_state_change:
+            self.on_state_change(online)
+    
+    def _load(self):
+        pending = []
+        if not self.buffer_path.exists():
+            return pending
+        with open(self.buffer_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    pending.append(json.loads(line))
+                except ValueError:
+                    continue  # Torn last line after a crash
+        return pending
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Talk to a scan collector (local testing)")
+    parser.add_argument("--url", default=DEFAULT_URL, help=f"Collector URL (default {DEFAULT_URL})")
+    parser.add_argument("--token", default=os.environ.get("STATION_TOKEN"),
+                        help="Station token from station.json (default: $STATION_TOKEN)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("status", help="Show the collector status")
+    send = commands.add_parser("send", help="Post one scan, twice, to check idempotency")
+    send.add_argument("payload", help="Badge payload (name or ID: badge)")
+    send.add_argument("--station", default="cli")
+    args = parser.parse_args(argv)
+    
+    try:
+        if args.command == "status":
+            print(json.dumps(get_json(f"{args.url}/status", token=args.token), indent=2, ensure_ascii=False))
+            return 0
+        
+        scan = {"event_id": uuid.uuid4().hex, "payload": args.payload, "timestamp": time.time()}
+        for attempt in ("first", "retry"):
+            reply = post_json(f"{args.url}/scans", {"station": args.station, "scans": [scan]},
+                              token=args.token)
+            print(f"{attempt}: {reply['results'][0]}")
+        return 0
+    except urllib.error.HTTPError as e:
+        print(f"❌ Collector refused the request: HTTP {e.code}: {_error_detail(e)}")
+        return 1
+    except OSError as e:
+        print(f"❌ Collector not reachable at {args.url}: {e}")
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
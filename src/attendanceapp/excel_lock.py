@@ -0,0 +1,76 @@
+"""
+Dr. Alfredo Pio De Roda ES - Excel Lock Detection
+Non-destructive check whether Excel has an SF2 workbook open
+
+The old check renamed the workbook to .tmp and back on every scan.
+That is two metadata-changing syscalls, and a crash in between leaves
+the file renamed. Instead:
+
+1. Office owner file: Excel creates "~$<name>" (long names lose their
+   first two characters: "~$" + name[2:]) next to an open workbook.
+2. Non-blocking open probe: opening for read/write fails with a
+   permission error while Excel holds the file (Windows share lock).
+
+Results are cached for a short TTL so the scan path never pays for
+more than one probe per TTL.
+"""
+
+import errno
+import os
+import threading
+import time
+from pathlib import Path
+
+
+class ExcelLockDetector:
+    """Cached, thread-safe "is this workbook open in Excel?" check"""
+    
+    LOCKED_ERRNOS = {errno.EACCES, errno.EBUSY, errno.EPERM}
+    
+    def __init__(self, ttl=2.0):
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.cache = {}  # path -> (checked_at, locked)
+        self.probes = 0
+        self.cache_hits = 0
+    
+    def is_locked(self, file_path):
+        key = str(file_path)
+        now = time.monotonic()
+        with self.lock:
+            cached = self.cache.get(key)
+            if cached and now - cached[0] < self.ttl:
+                self.cache_hits += 1
+                return cached[1]
+        
+        locked = self._probe(Path(file_path))
+        with self.lock:
+            self.probes += 1
+            self.cache[key] = (now, locked)
+        return locked
+    
+    def invalidate(self, file_path=None):
+        """Forget cached results (all of them if no path is given)"""
+        with self.lock:
+            if file_path is None:
+                self.cache.clear()
+            else:
+                self.cache.pop(str(file_path), None)
+    
+    @staticmethod
+    def owner_files(file_path):
+        name = file_path.name
+        return {file_path.with_name("~$" + name), file_path.with_name("~$" + name[2:])}
+    
+    def _probe(self, file_path):
+        if any(owner.exists() for owner in self.owner_files(file_path)):
+            return True
+        
+        try:
+            fd = os.open(file_path, os.O_RDWR | getattr(os, "O_BINARY", 0))
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            return e.errno in self.LOCKED_ERRNOS or isinstance(e, PermissionError)
+        os.close(fd)
+        return False
@@ -0,0 +1,115 @@
+"""
+Dr. Alfredo Pio De Roda ES - Scan Journal
+Append-only, fsync'd record of every scan for the Attendance System
+
+Each scan is appended (and fsync'd) BEFORE any workbook work, so a
+crash or an Excel lock can no longer lose attendance. Once the
+auto-save worker has written a batch into the xlsx it appends an
+"applied" record. On load, entries that were never applied are
+replayed into the workbook.
+
+Format: one JSON object per line
+    {"type": "scan", "id": ..., "student": ..., "row": ..., "column": ...,
+     "timestamp": ..., "file": ...}
+    {"type": "applied", "ids": [...]}
+"""
+
+import json
+import os
+import threading
+import uuid
+from pathlib import Path
+
+
+class ScanJournal:
+    """Durable scan log with replay of entries not yet in the workbook"""
+    
+    def __init__(self, path):
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        self.appended = 0
+    
+    def append(self, student, row, column, file_path, timestamp):
+        """Durably record one scan; returns its id"""
+        entry = {
+            "type": "scan",
+            "id": uuid.uuid4().hex,
+            "student": student,
+            "row": row,
+            "column": column,
+            "timestamp": timestamp,
+            "file": self._key(file_path),
+        }
+        self._write([entry])
+        self.appended += 1
+        return entry["id"]
+    
+    def mark_applied(self, ids):
+        """Record that these scans are saved in the workbook"""
+        ids = [i for i in ids if i]
+        if ids:
+            self._write([{"type": "applied", "ids": ids}])
+    
+    def pending(self, file_path=None):
+        """Scan entries not yet applied (optionally only for one workbook)"""
+        key = self._key(file_path) if file_path else None
+        scans, applied = self._read()
+        return [entry for entry in scans
+                if entry["id"] not in applied and (key is None or entry["file"] == key)]
+    
+    def compact(self):
+        """Rewrite the journal keeping only entries that are still pending"""
+        with self.lock:
+            scans, applied = self._read()
+            keep = [entry for entry in scans if entry["id"] not in applied]
+            
+            if not keep:
+                if self.path.exists():
+                    self.path.unlink()
+                return 0
+            
+            temp_path = self.path.with_suffix(".tmp")
+            with open(temp_path, "w", encoding="utf-8") as f:
+                for entry in keep:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+            return len(keep)
+    
+    def _write(self, records):
+        data = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records).encode("utf-8")
+        with self.lock:
+            with open(self.path, "a+b") as f:
+                # Start on a fresh line if a crash left a torn last line
+                if f.seek(0, os.SEEK_END):
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        data = b"\n" + data
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+    
+    def _read(self):
+        scans = []
+        applied = set()
+        if not self.path.exists():
+            return scans, applied
+        
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # Torn last line after a crash
+                
+                if record.get("type") == "scan":
+                    scans.append(record)
+                elif record.get("type") == "applied":
+                    applied.update(record.get("ids", []))
+        
+        return scans, applied
+    
+    @staticmethod
+    def _key(file_path):
+        return str(Path(file_path).resolve())
@@ -0,0 +1,195 @@
+"""
+Dr. Alfredo Pio De Roda ES - Camera Lanes
+Several cameras scanning at once for the Attendance System
+
+A gate with more than one entry lane gets one camera per lane. Each
+CameraLane owns its capture, FrameGrabber, decoder pool (ScanPipeline)
+and feeder thread, so lanes never wait on each other and throughput
+grows with the number of lanes. The feeder renders every new frame into
+the lane's latest-preview slot and sends it to a decoder only when one
+is free, so the preview runs at camera speed however slow decoding is.
+The UI loop shows each lane's newest preview and hands the detections
+to the shared ScanRecorder.
+
+Lanes are configured in SF2_Files/camera.json (without "lanes" the
+app keeps using the single auto-discovered camera):
+
+    {"lanes": [{"name": "Left door", "index": 0},
+               {"name": "Right door", "index": 1, "backend": 700,
+                "workers": 2}]}
+"""
+
+import json
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from .camera_probe import CameraCandidate, open_candidate, platform_backends
+    from .capture import FrameGrabber
+    from .metrics import RateMeter
+    from .scan_pipeline import ScanPipeline
+except ImportError:
+    from camera_probe import CameraCandidate, open_candidate, platform_backends
+    from capture import FrameGrabber
+    from metrics import RateMeter
+    from scan_pipeline import ScanPipeline
+
+
+# One configured lane: display name, device to open, decoder workers (None = app default)
+LaneSpec = namedtuple("LaneSpec", ["name", "candidate", "workers"])
+
+
+def load_lane_specs(config_path):
+    """Configured lanes from camera.json ([] = single camera mode)"""
+    try:
+        with open(config_path, encoding='utf-8') as f:
+            entries = json.load(f).get("lanes") or []
+    except (OSError, ValueError, AttributeError):
+        return []
+    
+    specs = []
+    for number, entry in enumerate(entries, 1):
+        try:
+            backend = int(entry.get("backend", platform_backends()[0]))
+            candidate = CameraCandidate(int(entry["index"]), backend)
+            workers = entry.get("workers")
+            specs.append(LaneSpec(str(entry.get("name") or f"Lane {number}"), candidate,
+                                  int(workers) if workers else None))
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            print(f"⚠️  Ignoring camera lane {number}: {e}")
+    return specs
+
+
+def open_lanes(specs):
+    """Open every lane's device concurrently
+    
+    Returns [(spec, (capture, frame) or None)] in spec order.
+    """
+    if not specs:
+        return []
+    with ThreadPoolExecutor(max_workers=len(specs), thread_name_prefix="lane-open") as executor:
+        opened = list(executor.map(_try_open, specs))
+    return list(zip(specs, opened))
+
+
+def _try_open(spec):
+    try:
+        return open_candidate(spec.candidate)
+    except Exception as e:
+        print(f"❌ {spec.name}: {e}")
+        return None
+
+
+class CameraLane:
+    """One camera: grabber thread -> feeder thread -> preview slot + its own decoder pool"""
+    
+    def __init__(self, name, capture, workers=2, mode="thread", metrics=None):
+        self.name = name
+        self.capture = capture
+        self.metrics = metrics  # Shared PipelineMetrics (capture stage)
+        self.pipeline = ScanPipeline(workers, mode)
+        self.grabber = FrameGrabber(capture, on_grab=self._on_grab)
+        self.thread = None
+        self.active = False
+        
+        self.preview_lock = threading.Lock()
+        self.preview_image = None  # Newest rendered preview (RGB, display size)
+        self.preview_seq = 0
+        self.shown_seq = 0
+        self.previews_replaced = 0  # Rendered but replaced before the UI took them
+        
+        self.grab_rate = RateMeter()
+        self.display_rate = RateMeter()
+        self.decode_busy = RateMeter()  # Decode seconds per second, all workers
+    
+    def start(self, first_frame=None):
+        self.active = True
+        if first_frame is not None:
+            self._handle_frame(first_frame, time.time())  # Show the first frame right away
+        self.grabber.start()
+        self.thread = threading.Thread(target=self._feed, name=f"lane-{self.name}", daemon=True)
+        self.thread.start()
+    
+    def _on_grab(self, seconds):
+        self.grab_rate.tick()
+        if self.metrics:
+            self.metrics.record("capture", seconds)
+            self.metrics.tick("capture")
+    
+    def _feed(self):
+        """Preview every new frame; decode it too when a worker is free
+        
+        Blocks on the grabber's frame slot instead of sleep-polling. The
+        feeder is (nearly) always waiting there, so every grabbed frame is
+        retrieved for the preview; busy decoders only skip the decode.
+        """
+        last_seq = 0
+        while self.active:
+            try:
+                item = self.grabber.read(last_seq, timeout=0.5)
+                if item is None:
+                    if not self.grabber.running:
+                        break  # Stopped, or the camera kept failing
+                    continue
+                
+                last_seq, frame, timestamp = item
+                self._handle_frame(frame, timestamp)
+            except Exception as e:
+                print(f"{self.name} feeder error: {e}")
+                time.sleep(0.1)
+        
+        print(f"{self.name} feeder stopped ({self.grabber.summary()})")
+    
+    def _handle_frame(self, frame, timestamp):
+        if self.pipeline.pool.try_reserve():
+            self.pipeline.submit(frame, timestamp, reserved=True)
+        
+        image = self.pipeline.preview(frame)
+        with self.preview_lock:
+            if self.preview_seq > self.shown_seq:
+                self.previews_replaced += 1
+            self.preview_image = image
+            self.preview_seq += 1
+    
+    def poll(self):
+        """UI side: every finished decode result of this lane"""
+        results = self.pipeline.poll()
+        for result in results:
+            self.decode_busy.tick(amount=result.decode_seconds)
+        return results
+    
+    def take_preview(self):
+        """UI side: the newest preview image, or None if it was already shown"""
+        with self.preview_lock:
+            if self.preview_seq <= self.shown_seq:
+                return None
+            self.shown_seq = self.preview_seq
+            return self.preview_image
+    
+    def shown(self):
+        """The newest frame of this lane was displayed"""
+        self.display_rate.tick()
+    
+    def decode_load(self):
+        """Fraction of this lane's decoder capacity in use (0..1)"""
+        return min(1.0, self.decode_busy.rate() / self.pipeline.pool.workers)
+    
+    def status_text(self):
+        return (f"{self.name}: {self.grab_rate.rate():.0f} fps camera, "
+                f"{self.display_rate.rate():.0f} fps shown, "
+                f"decode load {self.decode_load() * 100:.0f}% "
+                f"({self.pipeline.pool.workers} worker(s))")
+    
+    def stop(self):
+        """Stop grabbing, join the feeder, then release the capture"""
+        self.active = False
+        self.grabber.stop()
+        if self.thread:
+            self.thread.join(timeout=1.0)
+            self.thread = None
+        self.capture.release()
+        print(f"🎞️  {self.name} capture: {self.grabber.summary()}")
+        print(f"📈 {self.name} decode stats: {self.pipeline.summary()}")
+        self.pipeline.shutdown()
@@ -0,0 +1,178 @@
+"""
+Dr. Alfredo Pio De Roda ES - Pipeline Metrics
+Per-stage latency for the Attendance System camera pipeline
+
+STAGES (seconds, rolling window of the most recent samples):
+- capture:    video_capture.grab() in the FrameGrabber thread
+- decode:     pyzbar decode of one frame in a decoder worker
+- validate:   name / badge ID check of one payload
+- match:      roster lookup of one payload
+- persist:    one auto-save of the workbook
+- display:    handing one frame to the preview ImageView
+- end_to_end: badge in front of the camera -> ✓ saved in the xlsx
+
+Plus capture/display FPS and frame counters (grabbed, not decoded
+because no decoder was ready, previews replaced before the UI showed
+them, grab failures). Thread-safe: the grabber thread, decoder
+callbacks, UI loop and auto-save thread all record into the same
+PipelineMetrics.
+"""
+
+import json
+import math
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+
+STAGES = ("capture", "decode", "validate", "match", "persist", "display", "end_to_end")
+COUNTERS = ("frames_captured", "frames_dropped", "frames_stale", "capture_failures",
+            "scans", "saved")
+
+
+class RollingHistogram:
+    """The last `size` samples of one stage with nearest-rank percentiles"""
+    
+    def __init__(self, size=512):
+        self.samples = deque(maxlen=size)
+        self.count = 0
+    
+    def add(self, seconds):
+        self.samples.append(seconds)
+        self.count += 1
+    
+    def snapshot(self):
+        if not self.samples:
+            return {"count": self.count}
+        ordered = sorted(self.samples)
+        
+        def percentile(p):
+            index = max(0, math.ceil(p / 100 * len(ordered)) - 1)
+            return round(ordered[index] * 1000, 2)
+        
+        return {
+            "count": self.count,
+            "p50_ms": percentile(50),
+            "p95_ms": percentile(95),
+            "p99_ms": percentile(99),
+            "max_ms": round(ordered[-1] * 1000, 2),
+        }
+
+
+class RateMeter:
+    """Events (or `amount`s, e.g. busy seconds) per second over the last `window` seconds"""
+    
+    def __init__(self, window=2.0):
+        self.window = window
+        self.times = deque()  # (time, amount)
+        self.total = 0.0
+    
+    def tick(self, now=None, amount=1):
+        now = time.monotonic() if now is None else now
+        self.times.append((now, amount))
+        self.total += amount
+        self._expire(now)
+    
+    def rate(self):
+        self._expire(time.monotonic())
+        return self.total / self.window
+    
+    def _expire(self, now):
+        while self.times and now - self.times[0][0] > self.window:
+            self.total -= self.times.popleft()[1]
+
+
+class PipelineMetrics:
+    """Stage histograms, FPS meters and counters for one scanning session"""
+    
+    def __init__(self, window=512):
+        self.window = window
+        self.lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        with self.lock:
+            self.started = time.time()
+            self.stages = {stage: RollingHistogram(self.window) for stage in STAGES}
+            self.rates = {"capture": RateMeter(), "display": RateMeter()}
+            self.counters = dict.fromkeys(COUNTERS, 0)
+            self.pending_saves = {}  # event_id -> time the badge was seen
+            self.startup_seconds = None  # START pressed -> first camera frame
+    
+    def record(self, stage, seconds):
+        with self.lock:
+            self.stages[stage].add(seconds)
+    
+    def tick(self, rate):
+        with self.lock:
+            self.rates[rate].tick()
+    
+    def count(self, counter, amount=1):
+        with self.lock:
+            self.counters[counter] += amount
+    
+    def set_startup(self, seconds):
+        with self.lock:
+            self.startup_seconds = seconds
+    
+    def set_counter(self, counter, value):
+        with self.lock:
+            self.counters[counter] = value
+    
+    def scan_queued(self, event_id, seen_at):
+        """A new scan went to the auto-save queue (seen_at: wall clock)"""
+        with self.lock:
+            self.counters["scans"] += 1
+            if event_id:
+                self.pending_saves[event_id] = seen_at
+    
+    def scans_saved(self, event_ids, saved_at=None):
+        """These scans are now in the workbook - close their end-to-end timers"""
+        saved_at = time.time() if saved_at is None else saved_at
+        with self.lock:
+            for event_id in event_ids:
+                seen_at = self.pending_saves.pop(event_id, None)
+                if seen_at is not None:  # Replayed journal scans were not seen this session
+                    self.stages["end_to_end"].add(saved_at - seen_at)
+                    self.counters["saved"] += 1
+    
+    def snapshot(self):
+        with self.lock:
+            return {
+                "started": datetime.fromtimestamp(self.started).isoformat(timespec="seconds"),
+                "taken": datetime.now().isoformat(timespec="seconds"),
+                "startup_ms": (None if self.startup_seconds is None
+                               else round(self.startup_seconds * 1000, 1)),
+                "fps": {name: round(meter.rate(), 1) for name, meter in self.rates.items()},
+                "counters": dict(self.counters),
+                "stages": {stage: hist.snapshot() for stage, hist in self.stages.items()},
+            }
+    
+    def summary_lines(self):
+        """Human readable lines for the SETTINGS tab and the console"""
+        data = self.snapshot()
+        counters = data["counters"]
+        startup = "--" if data["startup_ms"] is None else f"{data['startup_ms']:.0f} ms"
+        lines = [
+            f"Camera startup: {startup}",
+            f"FPS: capture {data['fps']['capture']:.1f}, display {data['fps']['display']:.1f}",
+            f"Frames: {counters['frames_captured']} grabbed, {counters['frames_dropped']} skipped "
+            f"(decoders busy), {counters['frames_stale']} previews replaced before shown, "
+            f"{counters['capture_failures']} grab failures",
+            f"Scans: {counters['scans']} queued, {counters['saved']} saved",
+            f"{'stage':<11s} {'n':>6s} {'p50':>8s} {'p95':>8s} {'p99':>8s}  (ms)",
+        ]
+        for stage, stats in data["stages"].items():
+            if "p50_ms" not in stats:
+                lines.append(f"{stage:<11s} {stats['count']:>6d} {'--':>8s} {'--':>8s} {'--':>8s}")
+                continue
+            lines.append(f"{stage:<11s} {stats['count']:>6d} {stats['p50_ms']:>8.1f} "
+                         f"{stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f}")
+        return lines
+    
+    def export(self, path):
+        """Write the current snapshot as JSON; returns the path"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, indent=2)
+        return path
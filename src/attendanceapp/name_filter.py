@@ -0,0 +1,120 @@
+"""
+Dr. Alfredo Pio De Roda ES - Student Name Filter
+Shared by the Attendance System and the QR Code Generator
+
+The exclusion list is compiled ONCE into a single trie-shaped regex
+(common prefixes are merged, so each position in the name is checked
+against one branch per letter instead of ~200 substrings). Verdicts
+are memoized - the scanner sees the same payloads frame after frame.
+"""
+
+import re
+from functools import lru_cache
+
+
+# COMPREHENSIVE EXCLUSION LIST (same as Tkinter version)
+EXCLUDED_PATTERNS = (
+    "SUMIF", "COUNTIF", "AVERAGE", "SUM(", "COUNT(", "IF(",
+    "VLOOKUP", "HLOOKUP", "INDEX", "MATCH",
+    "SCHOOL FORM", "SF2", "DAILY ATTENDANCE", "ATTENDANCE REPORT",
+    "LEARNER'S NAME", "LAST NAME", "FIRST NAME", "MIDDLE NAME",
+    "CODES FOR CHECKING", "PRESENT", "ABSENT", "TARDY",
+    "HALF SHADED", "UPPER", "LOWER", "CUTTING CLASSES", "LATE COMER",
+    "DROPPED", "TRANSFERRED", "ENROLLED", "REGISTRATION",
+    "TOTAL", "COMBINED", "PER DAY", "SUMMARY", "MALE", "FEMALE",
+    "MONTH:", "BLANK", "(BLANK)", "NO. OF DAYS", "CLASSES",
+    "PERCENTAGE", "ENROLMENT", "AVERAGE DAILY", "ATTENDANCE",
+    "REGISTERED LEARNERS", "END OF THE MONTH", "SCHOOL YEAR",
+    "1ST FRIDAY", "REPORTING MONTH", "SCHOOL DAYS",
+    "REASONS", "CAUSES", "DROPPING OUT", "DROP OUT", "DROPOUT",
+    "DOMESTIC-RELATED", "INDIVIDUAL-RELATED", "SCHOOL-RELATED",
+    "GEOGRAPHIC", "ENVIRONMENTAL", "FINANCIAL-RELATED",
+    "TAKE CARE", "SIBLINGS", "EARLY MARRIAGE", "PREGNANCY",
+    "PARENTS' ATTITUDE", "FAMILY PROBLEMS", "ILLNESS",
+    "OVERAGE", "DEATH", "DRUG ABUSE", "ACADEMIC PERFORMANCE",
+    "LACK OF INTEREST", "DISTRACTIONS", "HUNGER", "MALNUTRITION",
+    "TEACHER FACTOR", "PHYSICAL CONDITION", "CLASSROOM",
+    "PEER INFLUENCE", "DISTANCE", "HOME AND SCHOOL",
+    "ARMED CONFLICT", "TRIBAL WARS", "CLAN FEUDS",
+    "CALAMITIES", "DISASTERS", "CHILD LABOR", "WORK",
+    "OTHERS (SPECIFY)",
+    "GUIDELINES:", "ACCOMPLISHED", "REFER", "DATES SHALL",
+    "WRITTEN IN", "COLUMNS AFTER", "COMPUTE", "FOLLOWING",
+    "EVERY END", "ADVISER", "SUBMIT", "OFFICE", "PRINCIPAL",
+    "RECORDING", "SUMMARY TABLE", "FORM 4", "SIGNED",
+    "RETURNED", "PROVIDE", "NECESSARY", "INTERVENTIONS",
+    "HOME VISITATION", "ABSENT FOR 5", "CONSECUTIVE DAYS",
+    "RISK OF", "PERFORMANCE", "REFLECTED", "FORM 137", "FORM 138",
+    "GRADING PERIOD", "BEGINNING", "CUT-OFF",
+    "MONDAY", "TUESDAY", "WEDNESDAY", "THURSDAY", "FRIDAY",
+    "MONDAY,", "TUESDAY,", "WEDNESDAY,", "THURSDAY,", "FRIDAY,",
+    "CERTIFY", "TRUE", "CORRECT", "REPORT", "SIGNATURE",
+    "PRINTED NAME", "TEACHER", "SCHOOL HEAD", "ATTESTED",
+    "PAGE", "OF", "SCHOOL FORM 2", "___",
+    "LEARNER", "STUDENT", "NAME", "NAMES", "ID", "NUMBER",
+    "ENROLLMENT", "ENROL",
+    "NAN", "NONE", "N/A", "NULL", "BLANK", "EMPTY",
+    "PERCENTAGE OF ENROLMENT", "PERCENTAGE OF ENROLLMENT",
+    "AVERAGE DAILY ATTENDANCE",
+    "PERCENTAGE OF ATTENDANCE FOR THE MONTH",
+    "PERCENTAGE OF ATTENDANCE",
+)
+
+DATE_PATTERN = re.compile(r'^\d{1,2}[/-]\d{1,2}[/-]\d{2,4}$')
+
+
+def _trie_regex(words):
+    """Build a regex source that matches any of `words`, prefixes merged"""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}  # End of a word
+    
+    def walk(node):
+        if '' in node:
+            # A shorter word already ends here - any longer one also matches
+            # it, so the search can stop at this point
+            return ''
+        
+        branches = [re.escape(char) + walk(child) for char, child in sorted(node.items())]
+        if len(branches) == 1:
+            return branches[0]
+        return '(?:' + '|'.join(branches) + ')'
+    
+    return walk(trie)
+
+
+EXCLUDED_REGEX = re.compile(_trie_regex(set(EXCLUDED_PATTERNS)))
+
+
+@lru_cache(maxsize=4096)
+def _is_valid_name(name):
+    if len(name) < 2:
+        return False
+    
+    if EXCLUDED_REGEX.search(name.upper()):
+        return False
+    
+    if not any(c.isalpha() for c in name):
+        return False
+    
+    if name.replace('.', '').replace(',', '').replace(' ', '').isdigit():
+        return False
+    
+    if DATE_PATTERN.match(name):
+        return False
+    
+    if not any(c.isalnum() for c in name):
+        return False
+    
+    return True
+
+
+def is_valid_student_name(name):
+    """Validate if text is a real student name with comprehensive filtering"""
+    if not name or not isinstance(name, str):
+        return False
+    
+    return _is_valid_name(name.strip())
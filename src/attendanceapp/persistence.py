@@ -0,0 +1,238 @@
+"""
+Dr. Alfredo Pio De Roda ES - Write-behind Auto-save
+Background persistence of scan marks into the SF2 workbook
+
+Scans are queued and applied to the sheet by one worker thread. The
+editable workbook is opened lazily, on the first save, so loading a
+file for scanning only needs the read-only streaming parser.
+Saving re-zips the whole xlsx, so bursts are coalesced into one save
+per `interval` seconds or per `batch_size` marks, whichever comes
+first. flush() forces a save (used by stop_camera and on app exit); it
+blocks, so the app calls it from an executor, never on the UI thread.
+
+Each save goes to a temp file in the same folder which then replaces
+the workbook (os.replace), so a crash or an exit mid-save never leaves
+a truncated xlsx behind.
+
+While Excel has the workbook open the batch simply stays pending: the
+lock is re-checked every `lock_poll` seconds and the queue drains on
+its own as soon as the file is closed.
+
+The open workbook is only reused while the file on disk is still the one
+we last saved (same size and mtime); if the teacher edited and saved it
+in Excel meanwhile, it is reloaded before the marks are applied so their
+edits are not overwritten.
+
+Every event should already be in the ScanJournal; after a successful
+save the worker records the saved event ids as applied.
+"""
+
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+from collections import namedtuple
+
+from openpyxl import load_workbook
+
+
+# One ✓ to write: which learner, where, and when it was scanned
+ScanEvent = namedtuple("ScanEvent", ["name", "row", "column", "timestamp", "event_id"])
+
+_FLUSH = "flush"
+_STOP = "stop"
+
+
+class AutosaveWorker:
+    """Apply scan events to the workbook and save it in coalesced batches"""
+    
+    def __init__(self, file_path, interval=2.0, batch_size=10,
+                 is_locked=None, on_lock_change=None, on_flush=None, journal=None,
+                 lock_poll=1.0):
+        self.workbook = None  # Opened on the first save
+        self.workbook_stat = None  # (size, mtime_ns) of the file self.workbook matches
+        self.file_path = file_path
+        self.interval = interval
+        self.batch_size = batch_size
+        self.is_locked = is_locked  # file_path -> bool, checked before saving
+        self.on_lock_change = on_lock_change  # Called with True/False when the lock appears/clears
+        self.lock_poll = lock_poll  # Retry delay while the file is locked
+        self.on_flush = on_flush  # Called with the worker after each save
+        self.journal = journal  # Told which scans made it into the xlsx
+        
+        self.events = queue.Queue()
+        self.batch = []  # Events waiting to be written and saved
+        self.oldest_unsaved = None
+        self.locked = False
+        
+        self.flushes = 0
+        self.saved_events = 0
+        self.last_flush_latency = None  # Seconds spent in the last save
+        self.last_flush_time = None
+        self.last_saved = []  # Events written by the last save
+        self.last_pre_save_stat = None  # File stat right before that save
+        self.reloads = 0  # Workbook re-read because someone else saved the file
+        
+        self.thread = threading.Thread(target=self._run, name="autosave", daemon=True)
+        self.thread.start()
+    
+    def submit(self, name, row, column, timestamp=None, event_id=None):
+        """Queue one ✓ mark (never blocks the caller)"""
+        self.events.put(ScanEvent(name, row, column, timestamp or time.time(), event_id))
+    
+    @property
+    def unsaved(self):
+        return len(self.batch)
+    
+    @property
+    def queue_depth(self):
+        """Marks not yet saved to disk (queued + waiting in the batch)"""
+        return self.events.qsize() + self.unsaved
+    
+    def flush(self, timeout=10.0):
+        """Save everything queued so far; returns True once it is on disk
+        
+        Blocks up to timeout seconds (None = until saved) - keep it off the UI thread.
+        """
+        done = threading.Event()
+        self.events.put((_FLUSH, done))
+        return done.wait(timeout) and self.unsaved == 0
+    
+    def stop(self, timeout=10.0):
+        """Flush and stop the worker thread"""
+        self.flush(timeout)
+        self.events.put((_STOP, None))
+        self.thread.join(timeout)
+    
+    def _run(self):
+        while True:
+            wait = None
+            if self.unsaved:
+                delay = self.lock_poll if self.locked else self.interval
+                wait = max(0.0, self.oldest_unsaved + delay - time.monotonic())
+            
+            try:
+                item = self.events.get(timeout=wait)
+            except queue.Empty:
+                self._save()  # Interval elapsed
+                continue
+            
+            if isinstance(item, ScanEvent):
+                if not self.batch:
+                    self.oldest_unsaved = time.monotonic()
+                self.batch.append(item)
+                if self.unsaved >= self.batch_size:
+                    self._save()
+                continue
+            
+            command, done = item
+            if command == _FLUSH:
+                if self.unsaved:
+                    self._save()
+                done.set()
+            elif command == _STOP:
+                return
+    
+    def _apply(self):
+        """Write every batched ✓ into the (lazily opened) sheet
+        
+        Reloads the workbook first if the file changed since our last save.
+        """
+        stat = self._disk_stat()
+        if self.workbook is None or stat != self.workbook_stat:
+            if self.workbook is not None:
+                self.reloads += 1
+                print("🔄 Workbook changed on disk - reloading before saving")
+            self.workbook = load_workbook(self.file_path)
+            self.workbook_stat = stat  # Taken before loading: a save meanwhile reloads again
+        sheet = self.workbook.active
+        for event in self.batch:
+            sheet.cell(event.row, event.column).value = "✓"
+    
+    def _save(self):
+        if not self.unsaved:
+            return
+        
+        if self.is_locked and self.is_locked(self.file_path):
+            # Keep the marks in memory and try again after lock_poll
+            self.oldest_unsaved = time.monotonic()
+            if not self.locked:
+                print(f"⚠️  WARNING: Excel file is OPEN! {self.unsaved} mark(s) waiting to be saved")
+                self._set_locked(True)
+            return
+        if self.locked:
+            print(f"🔓 Excel file closed - saving {self.unsaved} waiting mark(s)")
+            self._set_locked(False)
+        
+        start = time.perf_counter()
+        try:
+            self._apply()
+            try:
+                pre_save_stat = os.stat(self.file_path)
+            except OSError:
+                pre_save_stat = None
+            self._write_atomic()
+            self.workbook_stat = self._disk_stat()  # Our own save - no reload next time
+        except Exception as e:
+            print(f"❌ Auto-save error: {e}")
+            self.oldest_unsaved = time.monotonic()  # Retry next interval
+            return
+        
+        self.last_flush_latency = time.perf_counter() - start
+        self.last_flush_time = time.time()
+        self.flushes += 1
+        self.saved_events += self.unsaved
+        print(f"  💾 Auto-saved {self.unsaved} mark(s) in {self.last_flush_latency * 1000:.0f} ms")
+        saved_ids = [event.event_id for event in self.batch]
+        self.last_saved = self.batch
+        self.last_pre_save_stat = pre_save_stat
+        self.batch = []
+        self.oldest_unsaved = None
+        
+        if self.journal:
+            try:
+                self.journal.mark_applied(saved_ids)
+            except OSError as e:
+                print(f"⚠️  Journal error: {e}")  # Replay is idempotent
+        
+        if self.on_flush:
+            self.on_flush(self)
+    
+    def _disk_stat(self):
+        try:
+            stat = os.stat(self.file_path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+    
+    def _write_atomic(self):
+        """Save into a temp file next to the workbook, then swap it in"""
+        folder = os.path.dirname(os.path.abspath(self.file_path))
+        fd, temp_path = tempfile.mkstemp(prefix=".autosave-", suffix=".tmp", dir=folder)
+        os.close(fd)
+        try:
+            self.workbook.save(temp_path)
+            try:
+                shutil.copymode(self.file_path, temp_path)  # mkstemp files are private
+            except OSError:
+                pass
+            os.replace(temp_path, self.file_path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+    
+    def _set_locked(self, locked):
+        self.locked = locked
+        if self.on_lock_change:
+            self.on_lock_change(locked)
+    
+    def summary(self):
+        if self.locked:
+            return f"Excel open - {self.queue_depth} scan(s) waiting"
+        latency = "--" if self.last_flush_latency is None else f"{self.last_flush_latency * 1000:.0f} ms"
+        return f"pending {self.queue_depth}, last save {latency}"
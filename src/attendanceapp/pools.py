@@ -0,0 +1,33 @@
+"""
+Dr. Alfredo Pio De Roda ES - Worker Pools
+Process pool with a thread fallback for every parallel stage
+
+QR decoding, QR rendering, section loading and the batch CLI all run on
+a ProcessPoolExecutor where the platform has one (real parallelism for
+the CPU-bound parts) and fall back to a ThreadPoolExecutor otherwise.
+Android has no usable multiprocessing, so "process" means threads there
+without even trying.
+"""
+
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+
+def processes_available():
+    """False where worker processes cannot be spawned (Android)"""
+    return not hasattr(sys, "getandroidapilevel")
+
+
+def default_mode():
+    """Pool type to use when the caller has no preference"""
+    return "process" if processes_available() else "thread"
+
+
+def create_executor(mode, workers, thread_name_prefix=""):
+    """Returns (executor, mode actually used: "process" or "thread")"""
+    if mode == "process" and processes_available():
+        try:
+            return ProcessPoolExecutor(max_workers=workers), "process"
+        except (NotImplementedError, OSError, ImportError) as e:
+            print(f"⚠️  Process pool unavailable ({e}), using threads")
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix=thread_name_prefix), "thread"
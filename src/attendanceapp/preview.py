@@ -0,0 +1,106 @@
+"""
+Dr. Alfredo Pio De Roda ES - Live Camera Preview
+In-memory display path for the Attendance System
+
+Frames are handed to the toga.ImageView directly as PIL images.
+Older Toga backends that cannot take a PIL image get in-memory JPEG
+bytes from one reused buffer. Only if neither works do we touch the
+disk, and then with a two-slot rotating file that is cleaned up.
+"""
+
+import io
+import os
+import threading
+from pathlib import Path
+
+import toga
+from PIL import Image
+
+
+class PreviewSink:
+    """Show RGB frames in an ImageView without writing a file per frame"""
+    
+    MODES = ("pil", "bytes", "file")
+    
+    def __init__(self, image_view, fallback_path):
+        self.image_view = image_view
+        self.fallback_path = Path(fallback_path)
+        self.mode = "pil"
+        self.buffer = io.BytesIO()  # Reused for every JPEG encode
+        self.slot = 0
+        self.frames_shown = 0
+    
+    def show(self, rgb_array):
+        """Display one RGB frame (numpy array, already resized)"""
+        # Shares memory with the array - no copy
+        pil_image = Image.fromarray(rgb_array)
+        
+        while True:
+            try:
+                self.image_view.image = self._make_image(pil_image)
+                self.frames_shown += 1
+                return
+            except (TypeError, ValueError, AttributeError, NotImplementedError) as e:
+                if self.mode == self.MODES[-1]:
+                    raise
+                # Backend cannot take this kind of source; step down once
+                self.mode = self.MODES[self.MODES.index(self.mode) + 1]
+                print(f"⚠️  Preview: falling back to '{self.mode}' display ({e})")
+    
+    def _make_image(self, pil_image):
+        if self.mode == "pil":
+            return toga.Image(pil_image)
+        
+        # Encode into the reused in-memory buffer
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        pil_image.save(self.buffer, 'JPEG', quality=85)
+        
+        if self.mode == "bytes":
+            return toga.Image(data=self.buffer.getvalue())
+        
+        # Disk fallback: alternate between two files so the backend never
+        # serves a cached copy, without leaving a file per frame behind
+        self.slot = 1 - self.slot
+        path = self._slot_path(self.slot)
+        with open(path, 'wb') as f:
+            f.write(self.buffer.getbuffer())
+        return toga.Image(str(path))
+    
+    def _slot_path(self, slot):
+        return self.fallback_path.with_name(f"{self.fallback_path.stem}_{'ab'[slot]}.jpg")
+    
+    def close(self):
+        """Remove the fallback files, if any were written"""
+        for slot in (0, 1):
+            try:
+                self._slot_path(slot).unlink()
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"Preview cleanup error: {e}")
+
+
+def cleanup_legacy_frames(fallback_path):
+    """Delete camera_feed_<millis>.jpg files left by older versions
+    
+    Runs in a background thread - after a full school day there can be
+    tens of thousands of them.
+    """
+    fallback_path = Path(fallback_path)
+    pattern = f"{fallback_path.stem}_*{fallback_path.suffix}"
+    
+    def worker():
+        removed = 0
+        for path in fallback_path.parent.glob(pattern):
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                pass
+        if removed:
+            print(f"🧹 Removed {removed} old camera preview files")
+    
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+    return thread
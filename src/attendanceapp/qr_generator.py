@@ -9,14 +9,29 @@ FIXED: Cleaner UI matching Tkinter design
 import toga
 from toga.style import Pack
 from toga.style.pack import COLUMN, ROW
-from openpyxl import load_workbook
-import qrcode
+import asyncio
 import os
+import time
 from datetime import datetime
 from pathlib import Path
 
+try:
+    from .sf2_reader import read_sf2
+    from .qr_render import QRBatch, QR_PARAMS, qr_filename
+    from .qr_manifest import QRManifest
+    from .qr_sheets import StickerSheetWriter, CELL_SIZES
+    from .badge_id import badge_collisions, make_badge_id, warn_badge_collisions, workbook_section
+except ImportError:
+    from sf2_reader import read_sf2
+    from qr_render import QRBatch, QR_PARAMS, qr_filename
+    from qr_manifest import QRManifest
+    from qr_sheets import StickerSheetWriter, CELL_SIZES
+    from badge_id import badge_collisions, make_badge_id, warn_badge_collisions, workbook_section
+
 
 class QRGenerator(toga.App):
+    OUTPUT_MODES = ["PNG per student", "Sticker sheets (PDF)", "Sticker sheets (PNG pages)"]
+    
     def startup(self):
         """Setup the application"""
         # Setup folders
@@ -30,39 +45,19 @@ class QRGenerator(toga.App):
         
         self.sf2_file = None
         self.student_names = []
+        self.student_numbers = {}  # name -> Column A learner number
+        self.student_rows = {}  # name -> sheet row (for warnings)
+        self.section = None  # Section code for ID badges
+        self.qr_batch = None  # Generation run in progress
+        self.qr_workers = os.cpu_count() or 1
+        self.qr_mode = "process"  # Falls back to threads where unavailable
+        self.sheet_cancelled = False  # Set by Cancel while sheets are composed
         
         # Build UI
         self.main_window = toga.MainWindow(title=self.formal_name)
         self.main_window.content = self.create_ui()
         self.main_window.show()
     
-    def is_valid_student_name(self, name):
-        """Validate student name"""
-        if not name or not isinstance(name, str):
-            return False
-        
-        name = name.strip()
-        if len(name) < 2:
-            return False
-        
-        name_upper = name.upper()
-        
-        excluded_patterns = [
-            "SUMIF", "COUNTIF", "AVERAGE", "SCHOOL FORM", "SF2", 
-            "TOTAL", "MALE", "FEMALE", "PERCENTAGE", "ENROLMENT",
-            "MONDAY", "TUESDAY", "WEDNESDAY", "THURSDAY", "FRIDAY",
-            "NAN", "NONE", "N/A", "NULL", "BLANK", "EMPTY",
-        ]
-        
-        for pattern in excluded_patterns:
-            if pattern in name_upper:
-                return False
-        
-        if not any(c.isalpha() for c in name):
-            return False
-        
-        return True
-    
     def create_ui(self):
         """Create the UI"""
         main_box = toga.Box(style=Pack(direction=COLUMN, padding=15))
@@ -108,16 +103,50 @@ class QRGenerator(toga.App):
         
         self.status_label = toga.Label("Status: Idle", style=Pack(padding=5))
         progress_box.add(self.status_label)
+        
+        self.remove_stale_switch = toga.Switch(
+            "Remove QR codes of students no longer in this file",
+            value=False,
+            style=Pack(padding=5)
+        )
+        progress_box.add(self.remove_stale_switch)
         main_box.add(progress_box)
         
+        # Output mode
+        output_box = toga.Box(style=Pack(direction=ROW, padding=10))
+        output_box.add(toga.Label("🖨️ Output:", style=Pack(padding=5, font_weight='bold')))
+        self.output_selection = toga.Selection(
+            items=self.OUTPUT_MODES,
+            value=self.OUTPUT_MODES[0],
+            style=Pack(flex=1, padding=5)
+        )
+        output_box.add(self.output_selection)
+        output_box.add(toga.Label("Cell:", style=Pack(padding=5)))
+        self.cell_selection = toga.Selection(
+            items=[f'{size:g}"' for size in CELL_SIZES],
+            style=Pack(padding=5)
+        )
+        output_box.add(self.cell_selection)
+        main_box.add(output_box)
+        
+        self.badge_id_switch = toga.Switch(
+            "Compact ID badges (section + learner no. instead of the full name)",
+            value=False,
+            style=Pack(padding=5)
+        )
+        main_box.add(self.badge_id_switch)
+        
         # Generate buttons
         button_box = toga.Box(style=Pack(direction=ROW, padding=10))
         
         self.generate_btn = toga.Button("🎯 Generate All QR Codes", on_press=self.generate_qr_codes,
                                        enabled=False, style=Pack(flex=1, padding=5))
+        self.cancel_btn = toga.Button("⏹ Cancel", on_press=self.cancel_generation,
+                                     enabled=False, style=Pack(flex=1, padding=5))
         qr_folder_btn = toga.Button("📂 QR FOLDER", on_press=self.open_qr_folder, style=Pack(flex=1, padding=5))
         
         button_box.add(self.generate_btn)
+        button_box.add(self.cancel_btn)
         button_box.add(qr_folder_btn)
         main_box.add(button_box)
         
@@ -136,11 +165,11 @@ class QRGenerator(toga.App):
                 "6. Use the Attendance System to scan QR codes\n\n"
                 "WHAT IT GENERATES:\n"
                 "• Individual QR code images for each student\n"
-                "• QR code contains student name\n"
+                "• QR code contains student name (or a short ID: section + learner no.)\n"
                 "• Organized in QR_Codes folder\n"
                 "• Easy to print and laminate\n\n"
                 "TIPS:\n"
-                "• Print on sticker sheets for easy ID attachment\n"
+                "• Choose a 'Sticker sheets' output to get print-ready pages\n"
                 "• Use 2\"x2\" or 1.5\"x1.5\" size for best scanning\n"
                 "• Laminate for durability"
             ),
@@ -173,28 +202,26 @@ class QRGenerator(toga.App):
         try:
             print(f"\nLOADING FILE: {file_path.name}")
             
-            workbook = load_workbook(file_path)
-            sheet = workbook.active
+            # Single read-only pass over the sheet
+            sf2_data = read_sf2(file_path)
             
             self.sf2_file = file_path
             self.student_names = []
+            self.student_numbers = {}
+            self.student_rows = {}
+            self.section = workbook_section(sf2_data.section, file_path)
             
             print(f"👥 Extracting students from Column B...")
             
-            for row in range(13, sheet.max_row + 1):
-                name_cell = sheet.cell(row, 2).value
-                
-                if not name_cell:
-                    continue
-                
-                if self.is_valid_student_name(name_cell):
-                    name = name_cell.strip()
-                    self.student_names.append(name)
-                    print(f"  ✅ {name}")
-                else:
-                    print(f"  ⊘  FILTERED - '{name_cell}'")
+            for student in sf2_data.students:
+                self.student_names.append(student.name)
+                self.student_numbers.setdefault(student.name, student.number)
+                self.student_rows.setdefault(student.name, student.row)
+                print(f"  ✅ {student.name}")
+            for name_cell in sf2_data.skipped:
+                print(f"  ⊘  FILTERED - '{name_cell}'")
             
-            print(f"✅ Loaded {len(self.student_names)} valid students\n")
+            print(f"✅ Loaded {len(self.student_names)} valid students (section code {self.section})\n")
             
             # Update UI
             self.file_status_label.text = f"✅ Loaded: {file_path.name}"
@@ -205,57 +232,213 @@ class QRGenerator(toga.App):
             print(f"❌ Error loading file: {e}")
             self.main_window.error_dialog("Error", f"Failed to load file: {e}")
     
-    def generate_qr_codes(self, widget):
-        """Generate QR codes for all students"""
+    async def generate_qr_codes(self, widget):
+        """Generate QR codes for new/changed students (in parallel, UI stays live)"""
         if not self.student_names:
             self.main_window.info_dialog("Warning", "No students loaded!")
             return
         
+        if self.output_selection.value != self.OUTPUT_MODES[0]:
+            await self.generate_sticker_sheets()
+            return
+        
+        manifest = None
         try:
             print(f"\nGENERATING QR CODES")
             print(f"Total students: {len(self.student_names)}")
             print(f"Output folder: {self.qr_folder}\n")
             
             self.generate_btn.enabled = False
-            self.progress_bar.max = len(self.student_names)
             
-            for index, student_name in enumerate(self.student_names):
-                # Generate QR code
-                qr = qrcode.QRCode(
-                    version=1,
-                    error_correction=qrcode.constants.ERROR_CORRECT_H,
-                    box_size=10,
-                    border=4,
-                )
-                qr.add_data(student_name)
-                qr.make(fit=True)
-                
-                img = qr.make_image(fill_color="black", back_color="white")
-                
-                # Save QR code
-                filename = self.qr_folder / f"{student_name.replace(' ', '_')}.png"
-                img.save(filename)
-                
-                print(f"  ✅ {index+1}/{len(self.student_names)}: {student_name}")
+            # Only new, changed or missing PNGs need rendering
+            manifest = QRManifest(self.qr_folder, self.section)
+            payloads = self.badge_payloads()
+            jobs, skipped, stale = manifest.plan(payloads, QR_PARAMS, qr_filename)
+            
+            removed = 0
+            if stale and self.remove_stale_switch.value:
+                removed = manifest.remove(stale)
+                print(f"🗑️  Removed {removed} stale QR code(s) of section {self.section}")
+            elif stale:
+                print(f"ℹ️  {len(stale)} QR code(s) of section {self.section} are not in this file (kept)")
+            
+            total = len(jobs)
+            print(f"⏭️  {skipped} up to date, {total} to render")
+            
+            self.progress_bar.max = max(total, 1)
+            self.progress_bar.value = 0
+            
+            done = 0
+            failed = []
+            batch = None
+            start = time.perf_counter()
+            if jobs:
+                self.cancel_btn.enabled = True
+                self.qr_batch = batch = QRBatch(jobs, workers=self.qr_workers, mode=self.qr_mode)
+                futures = [asyncio.wrap_future(f) for f in batch.start()]
+                print(f"⚙️  {batch.workers} {batch.mode} worker(s), {len(futures)} chunk(s)")
                 
-                # Update progress
-                self.progress_bar.value = index + 1
-                self.status_label.text = f"Status: Generated {index+1}/{len(self.student_names)}"
+                for next_chunk in asyncio.as_completed(futures):
+                    try:
+                        results = await next_chunk
+                    except asyncio.CancelledError:
+                        if not batch.cancelled:
+                            raise
+                        continue
+                    
+                    for student_name, path, error in results:
+                        done += 1
+                        if error:
+                            failed.append(student_name)
+                            print(f"  ❌ {student_name}: {error}")
+                        else:
+                            manifest.record(student_name, payloads[student_name], QR_PARAMS, path)
+                            print(f"  ✅ {done}/{total}: {student_name}")
+                    
+                    # Update progress once per finished chunk
+                    self.progress_bar.value = done
+                    self.status_label.text = f"Status: Generated {done}/{total}"
+            else:
+                self.progress_bar.value = 1
             
-            print(f"\n✅ All {len(self.student_names)} QR codes generated!")
-            print(f"📁 Location: {self.qr_folder}\n")
+            elapsed = time.perf_counter() - start
+            rate = done / elapsed if elapsed else 0.0
+            rendered = done - len(failed)
+            counts = f"rendered {rendered}, skipped {skipped}, removed {removed}"
             
-            self.status_label.text = f"Status: ✅ Completed! Generated {len(self.student_names)} QR codes"
-            self.main_window.info_dialog("Success", 
-                f"✅ Generated {len(self.student_names)} QR codes successfully!\n\n"
-                f"Location: {self.qr_folder}")
+            if batch and batch.cancelled:
+                print(f"\n⏹ Cancelled: {counts} ({rate:.0f}/s)\n")
+                self.status_label.text = f"Status: ⏹ Cancelled - {counts}"
+                return
             
-            self.generate_btn.enabled = True
+            print(f"\n✅ QR codes up to date: {counts} in {elapsed:.1f}s ({rate:.0f}/s)")
+            print(f"📁 Location: {self.qr_folder}\n")
+            
+            self.status_label.text = f"Status: ✅ Completed! {counts.capitalize()}"
+            message = (f"✅ QR codes are up to date!\n\n"
+                       f"Rendered: {rendered}\nSkipped (unchanged): {skipped}\n"
+                       f"Removed: {removed}\n\nLocation: {self.qr_folder}")
+            if failed:
+                message += f"\n\n❌ Failed: {len(failed)} (see console)"
+            self.main_window.info_dialog("Success", message)
         
         except Exception as e:
             print(f"❌ Error generating QR codes: {e}")
             self.main_window.error_dialog("Error", f"Failed to generate QR codes: {e}")
+        
+        finally:
+            if self.qr_batch:
+                self.qr_batch.shutdown()
+                self.qr_batch = None
+            if manifest:
+                try:
+                    manifest.save()
+                except OSError as e:
+                    print(f"⚠️  Manifest write error: {e}")
             self.generate_btn.enabled = True
+            self.cancel_btn.enabled = False
+    
+    def badge_payloads(self):
+        """name -> QR payload (compact ID when enabled and a unique learner no. exists)
+        
+        Learners sharing a number get name badges, like the scanner's roster
+        index, which does not resolve a shared badge ID.
+        """
+        collisions = {}
+        if self.badge_id_switch.value:
+            collisions = badge_collisions(self.section, (
+                (self.student_rows.get(name), name, self.student_numbers.get(name))
+                for name in self.student_names))
+            warn_badge_collisions(collisions)
+        shared = {name for rows in collisions.values() for _, name in rows}
+        
+        payloads = {}
+        missing = []
+        for name in self.student_names:
+            payload = None
+            if self.badge_id_switch.value and name not in shared:
+                payload = make_badge_id(self.section, self.student_numbers.get(name))
+                if payload is None:
+                    missing.append(f"row {self.student_rows.get(name)} ({name})")
+            payloads[name] = payload or name
+        if missing:
+            print(f"⚠️  {len(missing)} student(s) have no learner number - using name badges: "
+                  f"{', '.join(missing)}")
+        return payloads
+    
+    async def generate_sticker_sheets(self):
+        """Render the whole roster onto printable pages in one pass"""
+        fmt = "pdf" if "PDF" in self.output_selection.value else "png"
+        cell_inches = float(self.cell_selection.value.rstrip('"'))
+        stem = Path(self.sf2_file).stem if self.sf2_file else "students"
+        output_path = self.qr_folder / f"{stem}_stickers_{cell_inches:g}in"
+        total = len(self.student_names)
+        
+        def on_page(pages):
+            # Called on the worker thread after each page is written
+            self.loop.call_soon_threadsafe(set_page_status, pages)
+        
+        def set_page_status(pages):
+            self.status_label.text = f"Status: Page {pages} written ({self.progress_bar.value}/{total})"
+        
+        def set_progress(done):
+            self.progress_bar.value = done
+        
+        payloads = self.badge_payloads()
+        
+        def compose():
+            writer = StickerSheetWriter(output_path, fmt=fmt, cell_inches=cell_inches, on_page=on_page)
+            try:
+                for index, name in enumerate(self.student_names, 1):
+                    if self.sheet_cancelled:
+                        break
+                    writer.add(name, payloads[name])
+                    if index % writer.columns == 0 or index == total:
+                        self.loop.call_soon_threadsafe(set_progress, index)
+            finally:
+                outputs = writer.close()  # Partial pages are still written on cancel
+            return writer, outputs
+        
+        try:
+            print(f"\nGENERATING STICKER SHEETS ({fmt.upper()}, {cell_inches:g}\" cells)")
+            self.generate_btn.enabled = False
+            self.cancel_btn.enabled = True
+            self.sheet_cancelled = False
+            self.progress_bar.max = total
+            self.progress_bar.value = 0
+            
+            start = time.perf_counter()
+            writer, outputs = await self.loop.run_in_executor(None, compose)
+            elapsed = time.perf_counter() - start
+            
+            summary = f"{writer.stickers} badges on {writer.pages} page(s) ({writer.per_page} per page)"
+            print(f"✅ {summary} in {elapsed:.1f}s")
+            for output in outputs:
+                print(f"  📄 {output}")
+            
+            if self.sheet_cancelled:
+                self.status_label.text = f"Status: ⏹ Cancelled - {summary}"
+                return
+            
+            self.status_label.text = f"Status: ✅ Completed! {summary}"
+            self.main_window.info_dialog("Success",
+                f"✅ {summary}\n\nLocation: {self.qr_folder}")
+        
+        except Exception as e:
+            print(f"❌ Error generating sticker sheets: {e}")
+            self.main_window.error_dialog("Error", f"Failed to generate sticker sheets: {e}")
+        
+        finally:
+            self.generate_btn.enabled = True
+            self.cancel_btn.enabled = False
+    
+    def cancel_generation(self, widget):
+        """Stop a running generation (finishes the chunks already rendering)"""
+        if self.qr_batch:
+            self.qr_batch.cancel()
+        self.sheet_cancelled = True
+        self.cancel_btn.enabled = False
+        self.status_label.text = "Status: Cancelling..."
     
     def open_qr_folder(self, widget):
         """Open QR folder"""
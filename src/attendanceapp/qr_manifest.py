@@ -0,0 +1,112 @@
+"""
+Dr. Alfredo Pio De Roda ES - QR Manifest
+Incremental badge regeneration for the QR Code Generator
+
+QR_Codes/qr_manifest.json records, for every student, a SHA-256 of the
+QR payload plus the encoding parameters and the PNG it was written to.
+A run only renders students that are new, whose payload or parameters
+changed, or whose PNG is missing; students no longer in the roster are
+reported as stale and can optionally be removed.
+
+Every section shares the QR_Codes folder, so entries are kept per
+section: a run only compares against (and removes stale badges of) the
+section it generates, and a PNG another section still lists is never
+deleted.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+
+MANIFEST_NAME = "qr_manifest.json"
+MANIFEST_VERSION = 2
+
+
+def payload_hash(payload, params):
+    """Fingerprint of one rendered image: payload + encoding parameters"""
+    key = json.dumps([payload, params], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+class QRManifest:
+    """name -> {sha256, params, path} for one section's PNGs in a shared QR folder"""
+    
+    def __init__(self, folder, section):
+        self.folder = Path(folder)
+        self.path = self.folder / MANIFEST_NAME
+        self.section = section
+        self.sections = self._load()  # section -> {name: entry}
+        self.entries = self.sections.setdefault(section, {})
+    
+    def _load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != MANIFEST_VERSION:
+            return {}  # Old single-roster manifest: everything is re-rendered once
+        return data.get("sections", {})
+    
+    def _listed_elsewhere(self, file_name):
+        return any(entry["path"] == file_name
+                   for section, entries in self.sections.items() if section != self.section
+                   for entry in entries.values())
+    
+    def plan(self, payloads, params, filename):
+        """Split a roster into work to do
+        
+        `payloads` maps student name -> QR payload, `filename(name)` gives the
+        PNG name. Returns (jobs, skipped, stale): jobs are (name, payload, path)
+        to render, skipped counts up-to-date PNGs, stale lists names that are
+        in this section's manifest but no longer in its roster.
+        """
+        jobs = []
+        skipped = 0
+        for name, payload in payloads.items():
+            path = self.folder / filename(name)
+            entry = self.entries.get(name)
+            if (entry and entry["sha256"] == payload_hash(payload, params)
+                    and entry["path"] == path.name and path.exists()):
+                skipped += 1
+            else:
+                jobs.append((name, payload, path))
+        
+        stale = [name for name in self.entries if name not in payloads]
+        return jobs, skipped, stale
+    
+    def record(self, name, payload, params, path):
+        self.entries[name] = {
+            "sha256": payload_hash(payload, params),
+            "params": params,
+            "path": Path(path).name,
+        }
+    
+    def remove(self, names):
+        """Delete the PNGs of these students and forget them; returns count
+        
+        A PNG that another section still lists is only forgotten here.
+        """
+        removed = 0
+        for name in names:
+            entry = self.entries.pop(name, None)
+            if entry is None or self._listed_elsewhere(entry["path"]):
+                continue
+            try:
+                (self.folder / entry["path"]).unlink()
+                removed += 1
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"⚠️  Could not remove {entry['path']}: {e}")
+        return removed
+    
+    def save(self):
+        """Atomic rewrite of the manifest"""
+        temp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": MANIFEST_VERSION, "sections": self.sections},
+                      f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(temp_path, self.path)
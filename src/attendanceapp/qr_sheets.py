@@ -0,0 +1,227 @@
+"""
+Dr. Alfredo Pio De Roda ES - QR Sticker Sheets
+Printable badge pages straight from the roster
+
+Instead of one PNG per student that teachers lay out by hand, badges
+are composed in memory onto letter-size pages of 1.5" or 2" cells with
+the student name under each code (light gray cut lines around cells).
+Only the page being filled is held in memory: every finished page is
+written out immediately, either as a page of a streaming PDF (one
+Flate-compressed grayscale image per page) or as its own PNG file.
+"""
+
+import zlib
+from pathlib import Path
+
+import qrcode
+from PIL import Image, ImageDraw, ImageFont
+
+try:
+    from .qr_render import QR_VERSION, QR_BORDER
+except ImportError:
+    from qr_render import QR_VERSION, QR_BORDER
+
+
+SHEET_FORMATS = ("pdf", "png")
+CELL_SIZES = (2.0, 1.5)  # Inches - the sizes that scan reliably
+PAGE_INCHES = (8.5, 11.0)  # Letter
+MARGIN_INCHES = 0.25
+CAPTION_INCHES = 0.22
+DPI = 300
+
+FONT_NAMES = ("DejaVuSans.ttf", "arial.ttf", "Arial.ttf", "Roboto-Regular.ttf")
+
+
+def make_qr_sticker(payload, max_px):
+    """QR code as a grayscale image, scaled by whole pixels to fit max_px"""
+    qr = qrcode.QRCode(
+        version=QR_VERSION,
+        error_correction=qrcode.constants.ERROR_CORRECT_H,
+        box_size=1,
+        border=QR_BORDER,
+    )
+    qr.add_data(payload)
+    qr.make(fit=True)
+    matrix = qr.get_matrix()  # Includes the quiet-zone border
+    
+    size = len(matrix)
+    image = Image.new("L", (size, size), 255)
+    image.putdata([0 if cell else 255 for row in matrix for cell in row])
+    scale = max(1, max_px // size)
+    return image.resize((size * scale, size * scale), Image.NEAREST)
+
+
+def load_caption_font(size):
+    for name in FONT_NAMES:
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    return ImageFont.load_default()
+
+
+def fit_caption(draw, text, font, width):
+    """Shorten text with an ellipsis until it fits the cell width"""
+    if draw.textlength(text, font=font) <= width:
+        return text
+    while len(text) > 1 and draw.textlength(text + "…", font=font) > width:
+        text = text[:-1]
+    return text + "…"
+
+
+class PdfPageWriter:
+    """Minimal streaming PDF: each page is one full-page grayscale image
+    
+    Objects are written as pages arrive; only the xref offsets and page
+    ids are kept until close() writes the page tree and trailer.
+    """
+    
+    def __init__(self, path, page_points):
+        self.path = Path(path)
+        self.page_points = page_points
+        self.file = open(self.path, 'wb')
+        self.file.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self.offsets = {}
+        self.page_ids = []
+        self.next_id = 3  # 1 = catalog, 2 = page tree (written last)
+    
+    def _allocate(self):
+        obj_id = self.next_id
+        self.next_id += 1
+        return obj_id
+    
+    def _write_object(self, obj_id, body, stream=None):
+        self.offsets[obj_id] = self.file.tell()
+        self.file.write(f"{obj_id} 0 obj\n".encode())
+        self.file.write(body.encode())
+        if stream is not None:
+            self.file.write(b"\nstream\n")
+            self.file.write(stream)
+            self.file.write(b"\nendstream")
+        self.file.write(b"\nendobj\n")
+    
+    def add_page(self, image):
+        """Append one "L" mode page image, stretched to the page size"""
+        width_pt, height_pt = self.page_points
+        data = zlib.compress(image.tobytes(), 6)
+        content = f"q {width_pt} 0 0 {height_pt} 0 0 cm /Im0 Do Q".encode()
+        
+        image_id = self._allocate()
+        content_id = self._allocate()
+        page_id = self._allocate()
+        
+        self._write_object(image_id,
+                           f"<< /Type /XObject /Subtype /Image /Width {image.width} "
+                           f"/Height {image.height} /ColorSpace /DeviceGray /BitsPerComponent 8 "
+                           f"/Filter /FlateDecode /Length {len(data)} >>", data)
+        self._write_object(content_id, f"<< /Length {len(content)} >>", content)
+        self._write_object(page_id,
+                           f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {width_pt} {height_pt}] "
+                           f"/Resources << /XObject << /Im0 {image_id} 0 R >> >> "
+                           f"/Contents {content_id} 0 R >>")
+        self.page_ids.append(page_id)
+    
+    def close(self):
+        kids = " ".join(f"{page_id} 0 R" for page_id in self.page_ids)
+        self._write_object(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(self.page_ids)} >>")
+        self._write_object(1, "<< /Type /Catalog /Pages 2 0 R >>")
+        
+        xref_offset = self.file.tell()
+        self.file.write(f"xref\n0 {self.next_id}\n".encode())
+        self.file.write(b"0000000000 65535 f \n")
+        for obj_id in range(1, self.next_id):
+            self.file.write(f"{self.offsets[obj_id]:010d} 00000 n \n".encode())
+        self.file.write(f"trailer\n<< /Size {self.next_id} /Root 1 0 R >>\n"
+                        f"startxref\n{xref_offset}\n%%EOF\n".encode())
+        self.file.close()
+
+
+class StickerSheetWriter:
+    """Lay out (name, payload) badges on pages, writing each page when full"""
+    
+    def __init__(self, output_path, fmt="pdf", cell_inches=2.0, dpi=DPI, on_page=None):
+        if fmt not in SHEET_FORMATS:
+            raise ValueError(f"Unknown sheet format: {fmt}")
+        self.output_path = Path(output_path)  # Base name, extension is added per format
+        self.fmt = fmt
+        self.dpi = dpi
+        self.on_page = on_page  # Called with the page number after each page is written
+        
+        self.page_px = (int(PAGE_INCHES[0] * dpi), int(PAGE_INCHES[1] * dpi))
+        self.cell_px = int(cell_inches * dpi)
+        self.margin_px = int(MARGIN_INCHES * dpi)
+        self.caption_px = int(CAPTION_INCHES * dpi)
+        self.columns = (self.page_px[0] - 2 * self.margin_px) // self.cell_px
+        self.rows = (self.page_px[1] - 2 * self.margin_px) // self.cell_px
+        if self.columns < 1 or self.rows < 1:
+            raise ValueError(f"{cell_inches}\" cells do not fit on the page")
+        self.per_page = self.columns * self.rows
+        self.font = load_caption_font(int(self.caption_px * 0.6))
+        
+        self.pdf = None
+        if fmt == "pdf":
+            page_points = (PAGE_INCHES[0] * 72, PAGE_INCHES[1] * 72)
+            self.pdf = PdfPageWriter(self.output_path.with_name(self.output_path.name + ".pdf"),
+                                     page_points)
+        
+        self.page = None
+        self.draw = None
+        self.slot = 0
+        self.pages = 0
+        self.stickers = 0
+        self.outputs = []
+    
+    def _new_page(self):
+        self.page = Image.new("L", self.page_px, 255)
+        self.draw = ImageDraw.Draw(self.page)
+        self.slot = 0
+    
+    def add(self, name, payload):
+        """Place one badge in the next free cell"""
+        if self.page is None:
+            self._new_page()
+        
+        row, column = divmod(self.slot, self.columns)
+        left = self.margin_px + column * self.cell_px
+        top = self.margin_px + row * self.cell_px
+        
+        # Cut guide
+        self.draw.rectangle([left, top, left + self.cell_px - 1, top + self.cell_px - 1], outline=200)
+        
+        qr_area = self.cell_px - self.caption_px
+        sticker = make_qr_sticker(payload, qr_area)
+        self.page.paste(sticker, (left + (self.cell_px - sticker.width) // 2,
+                                  top + (qr_area - sticker.height) // 2))
+        
+        caption = fit_caption(self.draw, name, self.font, self.cell_px - 8)
+        text_width = self.draw.textlength(caption, font=self.font)
+        self.draw.text((left + (self.cell_px - text_width) / 2, top + qr_area),
+                       caption, fill=0, font=self.font)
+        
+        self.stickers += 1
+        self.slot += 1
+        if self.slot == self.per_page:
+            self._flush_page()
+    
+    def _flush_page(self):
+        self.pages += 1
+        if self.pdf:
+            self.pdf.add_page(self.page)
+        else:
+            page_path = self.output_path.with_name(f"{self.output_path.name}_page{self.pages:03d}.png")
+            self.page.save(page_path, dpi=(self.dpi, self.dpi))
+            self.outputs.append(page_path)
+        self.page = None
+        self.draw = None
+        if self.on_page:
+            self.on_page(self.pages)
+    
+    def close(self):
+        """Write the last partial page and finish the output; returns file paths"""
+        if self.page is not None and self.slot:
+            self._flush_page()
+        if self.pdf:
+            self.pdf.close()
+            self.outputs.append(self.pdf.path)
+            self.pdf = None
+        return self.outputs
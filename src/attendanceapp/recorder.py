@@ -0,0 +1,92 @@
+"""
+Dr. Alfredo Pio De Roda ES - Scan Recorder
+Shared dedupe / match / mark stage for the Attendance System
+
+Every camera lane feeds its detections into one ScanRecorder, so a
+student is counted once no matter which entry lane they walk through.
+Validate, lookup, the already-marked / already-scanned / rapid re-scan
+checks and mark_scanned run as one step under a lock: two lanes seeing
+the same badge at the same moment produce exactly one NEW scan.
+"""
+
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+
+
+# Outcome of one detection: NEW, BEFORE, AGAIN, RAPID (student set) or
+# INVALID / UNKNOWN (student None)
+ScanOutcome = namedtuple("ScanOutcome", ["status", "student", "payload", "lane"])
+
+NEW = "new"          # First scan today - mark and save
+BEFORE = "before"    # ✓ was already in the workbook
+AGAIN = "again"      # Already scanned in this session
+RAPID = "rapid"      # Same badge again within rapid_window seconds
+INVALID = "invalid"  # Not a badge we could match
+UNKNOWN = "unknown"  # Valid badge, but not in this roster
+
+
+class ScanRecorder:
+    """Thread-safe match + dedupe + mark over the loaded roster"""
+    
+    def __init__(self, roster, metrics=None, rapid_window=1.0):
+        self.roster = roster
+        self.metrics = metrics
+        self.rapid_window = rapid_window
+        self.lock = threading.Lock()
+        self.last_scanned = None  # Track last scan to prevent rapid re-scans
+        self.last_scan_time = 0
+        self.counts = {}  # lane -> NEW scans recorded from it
+    
+    def set_roster(self, roster):
+        """A new file was loaded"""
+        with self.lock:
+            self.roster = roster
+            self.last_scanned = None
+            self.last_scan_time = 0
+            self.counts = {}
+    
+    def record(self, detection, lane=None, before_mark=None):
+        """Match, dedupe and (if new) mark one detection; returns a ScanOutcome
+        
+        before_mark(student) runs under the lock right before a NEW scan is
+        marked (e.g. journaling a remote scan); if it raises, the student
+        stays unmarked and the exception propagates.
+        """
+        payload = detection.payload
+        with self.lock:
+            start = time.perf_counter()
+            valid = self.roster.validate(payload)  # ID badge or valid name
+            matched = time.perf_counter()
+            self._record_metric("validate", matched - start)
+            if not valid:
+                return ScanOutcome(INVALID, None, payload, lane)
+            
+            student = self.roster.lookup(payload)
+            self._record_metric("match", time.perf_counter() - matched)
+            if student is None:
+                return ScanOutcome(UNKNOWN, None, payload, lane)
+            
+            current_time = detection.timestamp
+            if student.marked_before:
+                return ScanOutcome(BEFORE, student, payload, lane)
+            if student.scanned:
+                return ScanOutcome(AGAIN, student, payload, lane)
+            if (student.name == self.last_scanned and
+                    (current_time - self.last_scan_time) < self.rapid_window):
+                return ScanOutcome(RAPID, student, payload, lane)
+            
+            # NEW SCAN!
+            if before_mark:
+                before_mark(student)
+            self.roster.mark_record(student,
+                                    datetime.fromtimestamp(current_time).strftime("%H:%M:%S"))
+            self.last_scanned = student.name
+            self.last_scan_time = current_time
+            self.counts[lane] = self.counts.get(lane, 0) + 1
+            return ScanOutcome(NEW, student, payload, lane)
+    
+    def _record_metric(self, stage, seconds):
+        if self.metrics:
+            self.metrics.record(stage, seconds)
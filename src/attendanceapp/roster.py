@@ -0,0 +1,139 @@
+"""
+Dr. Alfredo Pio De Roda ES - Roster Index
+Hash-indexed student roster and scan state for the Attendance System
+
+Built once per file load. Every lookup on the scan path (match,
+already-marked, already-scanned, row for auto-save) is a dict or set
+hit, and the attendance counters are maintained as scans happen
+instead of being re-summed.
+
+Students can be found by name (name badges) or by their compact badge
+ID (section code + learner number, see badge_id). A badge ID shared by
+several rows is taken out of the ID index: those learners are only
+found by name, and warn_collisions() lists the rows.
+"""
+
+try:
+    from .badge_id import badge_key, parse_badge_id, is_badge_id, warn_badge_collisions
+    from .name_filter import is_valid_student_name
+except ImportError:
+    from badge_id import badge_key, parse_badge_id, is_badge_id, warn_badge_collisions
+    from name_filter import is_valid_student_name
+
+
+class StudentRecord:
+    """One learner row from the SF2 sheet plus today's mark state"""
+    
+    __slots__ = ("name", "number", "row", "marked_before", "scan_time")
+    
+    def __init__(self, name, number, row, marked_before=False):
+        self.name = name
+        self.number = number
+        self.row = row
+        self.marked_before = marked_before  # ✓ already in Excel on load
+        self.scan_time = None  # "HH:MM:SS" once scanned this session
+    
+    @property
+    def scanned(self):
+        return self.scan_time is not None
+    
+    @property
+    def status(self):
+        """Status text for the preview table"""
+        if self.marked_before:
+            return "✅ (Before)"
+        if self.scanned:
+            return "✅ (Today)"
+        return "⭕ Absent"
+
+
+class RosterIndex:
+    """name / badge ID -> StudentRecord index with maintained attendance counters"""
+    
+    def __init__(self, section=None):
+        self.section = section  # Section code used in badge IDs
+        self.records = []  # Sheet order, for the preview table
+        self.by_name = {}
+        self.by_id = {}  # "SECTION-NUM" -> record (unique keys only)
+        self.id_collisions = {}  # "SECTION-NUM" -> [record, ...] sharing that key
+        self.scanned_names = set()
+        self.scanned = []  # Scan order, for the scanned students table
+        self.existing_present = 0
+    
+    def add(self, name, number, row, marked_before=False):
+        """Add a learner row; the first row wins for duplicate names
+        
+        A learner number already used in this section disables that
+        badge ID for every row sharing it.
+        """
+        record = StudentRecord(name, number, row, marked_before)
+        self.records.append(record)
+        self.by_name.setdefault(name, record)
+        key = badge_key(self.section, number) if self.section else None
+        if key in self.id_collisions:
+            self.id_collisions[key].append(record)
+        elif key in self.by_id:
+            self.id_collisions[key] = [self.by_id.pop(key), record]
+        elif key:
+            self.by_id[key] = record
+        if marked_before:
+            self.existing_present += 1
+        return record
+    
+    def warn_collisions(self):
+        """Print the rows whose learner numbers collide (call after loading)"""
+        warn_badge_collisions({key: [(r.row, r.name) for r in records]
+                               for key, records in self.id_collisions.items()})
+    
+    def get(self, name):
+        return self.by_name.get(name)
+    
+    def get_by_id(self, payload):
+        """Record for an ID: badge payload (None if the check char fails)"""
+        key = parse_badge_id(payload)
+        return self.by_id.get(key) if key else None
+    
+    @staticmethod
+    def validate(payload):
+        """Is this payload a badge we could match? (ID badge or valid name)"""
+        # ID badges first - "ID" is an excluded word for names
+        return is_badge_id(payload) or is_valid_student_name(payload)
+    
+    def lookup(self, payload):
+        """Record for an already validated payload"""
+        if is_badge_id(payload):
+            return self.get_by_id(payload)
+        return self.by_name.get(payload)
+    
+    def match(self, payload):
+        """Record for a scanned payload - compact ID or validated name"""
+        return self.lookup(payload) if self.validate(payload) else None
+    
+    def is_scanned(self, name):
+        return name in self.scanned_names
+    
+    def mark_scanned(self, name, scan_time):
+        """Record a new scan for this session and return its record"""
+        return self.mark_record(self.by_name[name], scan_time)
+    
+    def mark_record(self, record, scan_time):
+        """Same as mark_scanned for a record that is already at hand"""
+        record.scan_time = scan_time
+        self.scanned_names.add(record.name)
+        self.scanned.append(record)
+        return record
+    
+    def __len__(self):
+        return len(self.records)
+    
+    @property
+    def new_present(self):
+        return len(self.scanned)
+    
+    @property
+    def total_present(self):
+        return self.existing_present + self.new_present
+    
+    @property
+    def absent(self):
+        return len(self.records) - self.total_present
@@ -0,0 +1,172 @@
+"""
+Dr. Alfredo Pio De Roda ES - Parsed Roster Cache
+Instant startup for the Attendance System
+
+The parsed SF2 result (date-column map, roster, existing ✓ marks) is
+stored next to the workbook as .<workbook name>.roster.json, keyed on
+path, size, mtime and a SHA-256 of the file contents.
+
+- size + mtime unchanged      -> HIT with just a stat and a cache read
+- size same, mtime changed    -> hash the file; same content is still a HIT
+- anything else               -> MISS, re-parse and rewrite the cache
+
+Our own auto-saves refresh the cache (apply_marks) so the next launch
+does not miss just because today's ✓ marks were written.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+try:
+    from .sf2_reader import SF2Data, SF2Student, read_sf2
+except ImportError:
+    from sf2_reader import SF2Data, SF2Student, read_sf2
+
+
+CACHE_VERSION = 2
+
+
+def file_hash(file_path):
+    """SHA-256 of the workbook contents"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_path_for(file_path):
+    file_path = Path(file_path)
+    return file_path.with_name(f".{file_path.name}.roster.json")
+
+
+class RosterCache:
+    """Read-through cache of parsed SF2 workbooks"""
+    
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+    
+    def read(self, file_path):
+        """Return (SF2Data, hit) - parses and stores the file on a miss"""
+        file_path = Path(file_path)
+        data, reason = self._load(file_path)
+        if data is not None:
+            self.hits += 1
+            print(f"⚡ Roster cache HIT: {file_path.name} ({reason})")
+            return data, True
+        
+        self.misses += 1
+        print(f"🐢 Roster cache MISS: {file_path.name} ({reason}) - parsing workbook")
+        data = read_sf2(file_path)
+        try:
+            self.store(file_path, data)
+        except OSError as e:
+            print(f"⚠️  Roster cache write error: {e}")
+        return data, False
+    
+    def store(self, file_path, data):
+        file_path = Path(file_path)
+        stat = file_path.stat()
+        entry = {
+            "version": CACHE_VERSION,
+            "path": str(file_path.resolve()),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": file_hash(file_path),
+            "date_columns": {str(day): [col, letter]
+                             for day, (col, letter) in data.date_columns.items()},
+            "students": [[s.name, s.number, s.row, sorted(s.marks)] for s in data.students],
+            "skipped": [str(value) for value in data.skipped],
+            "section": data.section,
+        }
+        self._write(cache_path_for(file_path), entry)
+    
+    def apply_marks(self, file_path, marks, before_stat):
+        """Fold our own saved ✓ marks into the cache after an auto-save
+        
+        `marks` is a list of (row, column); `before_stat` is the stat of the
+        file just before the save. If the cache did not describe that file
+        (someone else edited it) the entry is left to go stale instead.
+        """
+        file_path = Path(file_path)
+        cache_path = cache_path_for(file_path)
+        entry = self._read_entry(cache_path)
+        if entry is None:
+            return False
+        if (entry["size"], entry["mtime_ns"]) != (before_stat.st_size, before_stat.st_mtime_ns):
+            return False
+        
+        new_marks = {}
+        for row, column in marks:
+            new_marks.setdefault(row, set()).add(column)
+        for student in entry["students"]:
+            if student[2] in new_marks:
+                student[3] = sorted(set(student[3]) | new_marks[student[2]])
+        
+        stat = file_path.stat()
+        entry["size"] = stat.st_size
+        entry["mtime_ns"] = stat.st_mtime_ns
+        entry["sha256"] = file_hash(file_path)
+        self._write(cache_path, entry)
+        return True
+    
+    def _load(self, file_path):
+        entry = self._read_entry(cache_path_for(file_path))
+        if entry is None:
+            return None, "no cache"
+        if entry["path"] != str(file_path.resolve()):
+            return None, "different path"
+        
+        stat = file_path.stat()
+        if entry["size"] != stat.st_size:
+            return None, "size changed"
+        
+        reason = "size+mtime match"
+        if entry["mtime_ns"] != stat.st_mtime_ns:
+            if entry["sha256"] != file_hash(file_path):
+                return None, "content changed"
+            # Touched or copied but identical - remember the new mtime
+            entry["mtime_ns"] = stat.st_mtime_ns
+            try:
+                self._write(cache_path_for(file_path), entry)
+            except OSError:
+                pass
+            reason = "content hash match"
+        
+        date_columns = {int(day): (col, letter)
+                        for day, (col, letter) in entry["date_columns"].items()}
+        students = [SF2Student(name, number, row, frozenset(marks))
+                    for name, number, row, marks in entry["students"]]
+        return SF2Data(date_columns, students, entry["skipped"], entry["section"]), reason
+    
+    @staticmethod
+    def _read_entry(cache_path):
+        try:
+            with open(cache_path, encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("version") != CACHE_VERSION:
+            return None
+        return entry
+    
+    @staticmethod
+    def _write(cache_path, entry):
+        """Atomic rewrite; a unique temp name per write, since store() (load_file)
+        and apply_marks() (auto-save thread) can write the same cache at once"""
+        fd, temp_path = tempfile.mkstemp(prefix=cache_path.name + ".", suffix=".tmp",
+                                         dir=cache_path.parent)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False, default=str)
+            os.replace(temp_path, cache_path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
@@ -0,0 +1,398 @@
+"""
+Dr. Alfredo Pio De Roda ES - QR Scan Pipeline
+Per-frame decoding for the Attendance System
+
+Each camera frame is decoded ONCE. The detections it produces
+(payload, polygon, timestamp) are shared by matching, dedupe and
+the overlay drawing instead of calling decode() again per stage.
+
+STAGES:
+1. A CameraLane feeder takes every new frame from the FrameGrabber and
+   renders its preview right away, with the last known boxes drawn, so
+   the preview follows the camera instead of decode throughput
+2. Only if a decoder is free at that moment, FrameGate decides whether
+   the frame changed since the last decode and narrows decoding to a
+   region of interest around the last code found
+3. A bounded DecoderPool decodes (detections only, no display work)
+4. The UI loop matches every finished result and shows the newest preview
+"""
+
+import queue
+import threading
+import time
+from collections import namedtuple
+
+import cv2
+import numpy as np
+from pyzbar.pyzbar import decode
+
+try:
+    from .pools import create_executor
+except ImportError:
+    from pools import create_executor
+
+
+# One decoded QR code: text payload, corner points and capture timestamp
+Detection = namedtuple("Detection", ["payload", "polygon", "timestamp"])
+
+# A captured frame handed to the decoder pool (roi None = full frame)
+FrameJob = namedtuple("FrameJob", ["seq", "frame", "timestamp", "roi"])
+
+# What a decoder worker hands back to the UI loop
+FrameResult = namedtuple("FrameResult", ["seq", "timestamp", "detections",
+                                         "decode_seconds", "roi"])
+
+DISPLAY_SIZE = (640, 480)
+
+
+def decode_frame(frame, timestamp=None, roi=None):
+    """Decode every QR code in a frame into a list of Detection tuples
+    
+    With an roi (x0, y0, x1, y1) only that part of the frame is decoded;
+    polygons are still returned in full-frame coordinates.
+    """
+    if timestamp is None:
+        timestamp = time.time()
+    
+    offset_x = offset_y = 0
+    if roi is not None:
+        offset_x, offset_y, x1, y1 = roi
+        frame = frame[offset_y:y1, offset_x:x1]
+    
+    detections = []
+    for obj in decode(frame):
+        try:
+            payload = obj.data.decode('utf-8').strip()
+        except UnicodeDecodeError:
+            continue
+        
+        polygon = [(int(p.x) + offset_x, int(p.y) + offset_y) for p in obj.polygon]
+        detections.append(Detection(payload, polygon, timestamp))
+    
+    return detections
+
+
+def draw_detections(frame, detections):
+    """Draw a box around each detected QR code (in place)"""
+    for detection in detections:
+        if detection.polygon:
+            pts_array = np.array([detection.polygon], dtype=np.int32)
+            cv2.polylines(frame, pts_array, True, (0, 255, 0), 3)  # Thicker line for mobile
+
+
+def render_preview(frame, overlay):
+    """RGB display image of a frame with the given boxes drawn
+    
+    The captured frame is not modified - a decoder may still be reading it.
+    """
+    image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    draw_detections(image, overlay)
+    return cv2.resize(image, DISPLAY_SIZE)
+
+
+class DecodeStats:
+    """Decode cost counters for the scan pipeline
+    
+    Savings are estimated against the old loop, which decoded every
+    frame twice (scan + draw boxes) on the full frame: each frame would
+    have cost two average full-frame decodes. Only measured full-frame
+    decodes feed that average.
+    """
+    
+    def __init__(self):
+        self.frames = 0  # Decoded frames (full + ROI)
+        self.decode_seconds = 0.0
+        self.full_frames = 0
+        self.full_seconds = 0.0
+        self.roi_frames = 0
+        self.skipped_frames = 0  # Not decoded: the gate saw no change
+    
+    def record(self, elapsed, roi=None):
+        """Record one decode of one frame (roi: decoded region, None = full frame)"""
+        self.frames += 1
+        self.decode_seconds += elapsed
+        if roi is None:
+            self.full_frames += 1
+            self.full_seconds += elapsed
+        else:
+            self.roi_frames += 1
+    
+    def record_skip(self):
+        """The gate skipped a frame a decoder was free for"""
+        self.skipped_frames += 1
+    
+    @property
+    def avg_full_seconds(self):
+        return self.full_seconds / self.full_frames if self.full_frames else None
+    
+    @property
+    def saved_seconds(self):
+        """Estimated decode time avoided vs. two full decodes per frame (None = no estimate yet)"""
+        avg_full = self.avg_full_seconds
+        if avg_full is None:
+            return None
+        baseline = 2 * avg_full * (self.frames + self.skipped_frames)
+        return max(0.0, baseline - self.decode_seconds)
+    
+    def summary(self):
+        """Human readable summary for the console"""
+        if not self.frames:
+            return "no frames decoded"
+        
+        avg_ms = self.decode_seconds / self.frames * 1000
+        text = (f"{self.frames} frames decoded ({self.full_frames} full, {self.roi_frames} ROI), "
+                f"{self.skipped_frames} skipped as unchanged, avg decode {avg_ms:.1f} ms")
+        saved = self.saved_seconds
+        if saved is not None:
+            text += (f", est. {saved:.2f} s saved vs. decoding every frame twice "
+                     f"(avg full-frame decode {self.avg_full_seconds * 1000:.1f} ms)")
+        return text
+
+
+def process_frame(job):
+    """Decode one frame (or its region of interest)
+    
+    Runs inside a decoder worker (thread or process), never on the UI loop.
+    """
+    start = time.perf_counter()
+    try:
+        detections = decode_frame(job.frame, job.timestamp, job.roi)
+    except Exception:
+        detections = []  # Silently ignore QR decode errors
+    
+    return FrameResult(job.seq, job.timestamp, detections,
+                       time.perf_counter() - start, job.roi)
+
+
+class FrameGate:
+    """Cheap pre-filter in front of decode()
+    
+    - A frame is only decoded if its downscaled grayscale thumbnail
+      differs from the one of the last decoded frame (or every
+      `max_skip` frames as a safety net).
+    - After a code is found, decoding is limited to a region of interest
+      around its polygon. A miss widens back to the full frame.
+    
+    check() runs on the capture thread, update() on decoder callbacks.
+    """
+    
+    def __init__(self, thumb_size=(80, 60), threshold=3.0, max_skip=15, roi_margin=0.6):
+        self.thumb_size = thumb_size
+        self.threshold = threshold  # Mean absolute gray-level difference
+        self.max_skip = max_skip
+        self.roi_margin = roi_margin  # Fraction of the code size added per side
+        self.lock = threading.Lock()
+        self.reference = None
+        self.frame_shape = None
+        self.roi = None
+        self.overlay = []
+        self.last_update_seq = 0
+        self.skip_run = 0
+        
+        self.frames = 0
+        self.skipped = 0
+        self.roi_decodes = 0
+        self.full_decodes = 0
+    
+    def check(self, frame):
+        """Return (decode, roi) for a freshly captured frame"""
+        thumb = cv2.resize(frame, self.thumb_size, interpolation=cv2.INTER_AREA)
+        if thumb.ndim == 3:
+            thumb = cv2.cvtColor(thumb, cv2.COLOR_BGR2GRAY)
+        
+        with self.lock:
+            self.frames += 1
+            self.frame_shape = frame.shape[:2]
+            changed = (self.reference is None or
+                       cv2.absdiff(thumb, self.reference).mean() > self.threshold)
+            
+            if not changed and self.skip_run < self.max_skip:
+                self.skip_run += 1
+                self.skipped += 1
+                return False, None
+            
+            self.reference = thumb
+            self.skip_run = 0
+            if self.roi is not None:
+                self.roi_decodes += 1
+            else:
+                self.full_decodes += 1
+            return True, self.roi
+    
+    def update(self, seq, detections, roi):
+        """Feed back a decode result to move or widen the region of interest"""
+        with self.lock:
+            if seq < self.last_update_seq:
+                return  # An older frame finished late
+            self.last_update_seq = seq
+            
+            if detections:
+                self.roi = self._roi_around(detections)
+                self.overlay = detections
+                return
+            
+            self.roi = None
+            self.overlay = []
+            if roi is not None:
+                # Missed inside the ROI - the code may have moved, so make
+                # the next frame a full-frame decode even if nothing changed
+                self.reference = None
+    
+    def invalidate(self):
+        """Force the next frame to be decoded"""
+        with self.lock:
+            self.reference = None
+    
+    def _roi_around(self, detections):
+        xs = [x for d in detections for x, _ in d.polygon]
+        ys = [y for d in detections for _, y in d.polygon]
+        if not xs:
+            return None
+        
+        height, width = self.frame_shape
+        margin_x = int((max(xs) - min(xs)) * self.roi_margin) + 16
+        margin_y = int((max(ys) - min(ys)) * self.roi_margin) + 16
+        return (max(0, min(xs) - margin_x), max(0, min(ys) - margin_y),
+                min(width, max(xs) + margin_x), min(height, max(ys) + margin_y))
+    
+    def summary(self):
+        if not self.frames:
+            return "gate: no frames"
+        
+        skipped_pct = self.skipped / self.frames * 100
+        return (f"gate: {self.skipped}/{self.frames} frames skipped ({skipped_pct:.0f}%), "
+                f"{self.roi_decodes} ROI + {self.full_decodes} full-frame decodes")
+
+
+class DecoderPool:
+    """Bounded pool of decoder workers feeding a results queue
+    
+    At most `workers` frames are in flight. When every worker is busy
+    new frames are dropped instead of piling up behind the decoder;
+    try_reserve() lets the caller find that out before any gate work.
+    """
+    
+    def __init__(self, workers=2, mode="thread", on_result=None):
+        self.workers = max(1, int(workers))
+        self.on_result = on_result  # Called on the worker side before queueing
+        self.executor, self.mode = create_executor(mode, self.workers, "qr-decoder")
+        self.slots = threading.BoundedSemaphore(self.workers)
+        self.results = queue.Queue()
+        self.submitted = 0
+        self.dropped = 0
+        self.failed = 0
+    
+    def try_reserve(self):
+        """Hold a free worker for the next submit(reserved=True), without waiting
+        
+        False (counted as dropped) when every worker is busy.
+        """
+        if self.slots.acquire(blocking=False):
+            return True
+        self.dropped += 1
+        return False
+    
+    def release(self):
+        """Give back a reservation that was not used"""
+        self.slots.release()
+    
+    def submit(self, job, reserved=False):
+        """Hand a frame to a free worker; returns False if it was dropped"""
+        if not reserved and not self.slots.acquire(blocking=False):
+            self.dropped += 1
+            return False
+        
+        try:
+            future = self.executor.submit(process_frame, job)
+        except Exception as e:
+            self.slots.release()
+            if self.mode != "process":
+                raise
+            print(f"⚠️  Process pool failed ({e}), using threads")
+            self.executor, self.mode = create_executor("thread", self.workers, "qr-decoder")
+            return self.submit(job)
+        
+        self.submitted += 1
+        future.add_done_callback(self._on_done)
+        return True
+    
+    def _on_done(self, future):
+        self.slots.release()
+        try:
+            result = future.result()
+            if self.on_result:
+                self.on_result(result)
+            self.results.put(result)
+        except Exception as e:
+            self.failed += 1
+            print(f"Decoder worker error: {e}")
+    
+    def drain(self):
+        """Return every finished result without blocking"""
+        results = []
+        while True:
+            try:
+                results.append(self.results.get_nowait())
+            except queue.Empty:
+                return results
+    
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class ScanPipeline:
+    """Capture -> decoder pool -> results drained by the UI loop"""
+    
+    def __init__(self, workers=2, mode="thread", gate=None):
+        self.gate = gate or FrameGate()
+        self.pool = DecoderPool(workers, mode, on_result=self._on_result)
+        self.stats = DecodeStats()
+        self.next_seq = 0  # Written by the capture side only
+    
+    def submit(self, frame, timestamp=None, reserved=False):
+        """Capture side: send a frame to the decoders if the gate wants it decoded
+        
+        reserved: the caller already holds a worker from pool.try_reserve();
+        it is given back if the gate skips the frame. Returns True if a
+        decode was queued.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        should_decode, roi = self.gate.check(frame)
+        if not should_decode:
+            if reserved:
+                self.pool.release()
+            self.stats.record_skip()
+            return False
+        
+        self.next_seq += 1
+        accepted = self.pool.submit(FrameJob(self.next_seq, frame, timestamp, roi), reserved)
+        if not accepted:
+            self.gate.invalidate()  # The change was never decoded
+        return accepted
+    
+    def preview(self, frame):
+        """Display image of a frame with the boxes of the last decode"""
+        return render_preview(frame, self.gate.overlay)
+    
+    def _on_result(self, result):
+        self.gate.update(result.seq, result.detections, result.roi)
+    
+    def poll(self):
+        """UI side: every finished result, in capture order
+        
+        All of them go to matching and dedupe - a slow decode can still
+        hold the only sighting of a badge. Display does not wait on them.
+        """
+        results = sorted(self.pool.drain(), key=lambda r: r.seq)
+        for result in results:
+            self.stats.record(result.decode_seconds, result.roi)
+        return results
+    
+    def summary(self):
+        return (f"{self.stats.summary()}; {self.gate.summary()}; submitted {self.pool.submitted}, "
+                f"dropped {self.pool.dropped} (workers busy), "
+                f"{self.pool.workers} {self.pool.mode} worker(s)")
+    
+    def shutdown(self):
+        self.pool.shutdown()
@@ -0,0 +1,206 @@
+"""
+Dr. Alfredo Pio De Roda ES - Multi-section Mode
+One gate scanner for every SF2 workbook in SF2_Files/Active
+
+load_sections() parses all active workbooks at once, each through the
+roster cache, on a process pool (threads on Android or where processes
+are unavailable, see pools), so loading 30 sections takes about as long
+as the slowest file instead of the sum of all of them.
+
+SectionIndex merges the per-section rosters into one name / badge ID
+-> (section, record) index. It looks like a RosterIndex to the
+ScanRecorder and the counters, and every scan is routed to the
+workbook its record came from - each workbook keeps its own
+AutosaveWorker.
+
+A name found in more than one section is ambiguous: it is not marked
+(the learner needs their ID badge, which includes the section code).
+
+Enabled with "multi_section": true in SF2_Files/station.json, or the
+LOAD ALL SECTIONS button on the FILES tab.
+"""
+
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import as_completed
+from pathlib import Path
+
+try:
+    from .badge_id import is_badge_id, parse_badge_id, workbook_section
+    from .roster import RosterIndex
+    from .roster_cache import RosterCache
+    from .pools import create_executor, default_mode
+except ImportError:
+    from badge_id import is_badge_id, parse_badge_id, workbook_section
+    from roster import RosterIndex
+    from roster_cache import RosterCache
+    from pools import create_executor, default_mode
+
+
+# Result of parsing one workbook in a loader worker
+SectionLoad = namedtuple("SectionLoad", ["path", "data", "hit", "error", "seconds"])
+
+
+def active_workbooks(folder):
+    """Every SF2 workbook in the folder (Excel owner files skipped)"""
+    return sorted(f for f in Path(folder).glob("*.xlsx") if not f.name.startswith('~'))
+
+
+def read_section(path):
+    """Parse one workbook through the roster cache (runs in a loader worker)"""
+    start = time.perf_counter()
+    try:
+        data, hit = RosterCache().read(path)
+        return SectionLoad(str(path), data, hit, None, time.perf_counter() - start)
+    except Exception as e:
+        return SectionLoad(str(path), None, False, str(e), time.perf_counter() - start)
+
+
+def load_sections(paths, workers=None, mode=None):
+    """Parse every workbook concurrently; SectionLoad list in path order
+    
+    mode: "process" or "thread" (None = processes, threads on Android)
+    """
+    mode = mode or default_mode()
+    paths = [str(p) for p in paths]
+    if not paths:
+        return []
+    workers = max(1, min(len(paths), int(workers or os.cpu_count() or 1)))
+    results = {}
+    
+    executor, mode = create_executor(mode, workers, "section-load")
+    try:
+        futures = {executor.submit(read_section, path): path for path in paths}
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+    except Exception as e:
+        if mode != "process":
+            raise
+        # Spawning workers failed on first use - finish on threads
+        print(f"⚠️  Process pool failed ({e}), using threads")
+        executor.shutdown(wait=False, cancel_futures=True)
+        executor, mode = create_executor("thread", workers, "section-load")
+        remaining = [path for path in paths if path not in results]
+        for path, load in zip(remaining, executor.map(read_section, remaining)):
+            results[path] = load
+    finally:
+        executor.shutdown(wait=False)
+    
+    return [results[path] for path in paths]
+
+
+class SectionWorkbook:
+    """One loaded section: its roster, today's column and its own auto-saver"""
+    
+    def __init__(self, path, data, day):
+        self.path = Path(path)
+        self.section = workbook_section(data.section, self.path)
+        self.roster = RosterIndex(self.section)
+        self.column, self.day_letter = data.date_columns.get(day, (None, None))
+        self.autosave = None  # AutosaveWorker, created by the app
+        
+        for student in data.students:
+            self.roster.add(student.name, student.number, student.row,
+                            self.column in student.marks)
+        self.roster.warn_collisions()
+    
+    def counters(self):
+        """Row for the per-section counters table"""
+        return {
+            'section': self.section,
+            'file': self.path.name,
+            'present': str(self.roster.total_present),
+            'new': str(self.roster.new_present),
+            'absent': str(self.roster.absent),
+            'total': str(len(self.roster)),
+        }
+
+
+class SectionIndex:
+    """Global name / badge ID -> (section, record) index over every loaded section
+    
+    Quacks like a RosterIndex (validate, lookup, get, mark_record and the
+    attendance counters) so the ScanRecorder and the SCAN tab work on it
+    unchanged.
+    """
+    
+    validate = staticmethod(RosterIndex.validate)
+    section = None  # No single section code
+    
+    def __init__(self, workbooks):
+        self.workbooks = list(workbooks)
+        self.records = []
+        self.by_name = {}  # name -> [record, ...] (more than one = ambiguous)
+        self.by_id = {}  # "SECTION-NUM" -> [record, ...]
+        self.section_of = {}  # id(record) -> SectionWorkbook
+        self.scanned = []  # Scan order across all sections
+        self.ambiguous_scans = 0
+        self.ambiguous_seen = set()
+        
+        for workbook in self.workbooks:
+            for record in workbook.roster.records:
+                self.records.append(record)
+                self.section_of[id(record)] = workbook
+            for name, record in workbook.roster.by_name.items():
+                self.by_name.setdefault(name, []).append(record)
+            for key, record in workbook.roster.by_id.items():
+                self.by_id.setdefault(key, []).append(record)
+        
+        self.ambiguous_names = {name: [self.section_of[id(r)].section for r in records]
+                                for name, records in self.by_name.items() if len(records) > 1}
+    
+    def workbook_of(self, record):
+        return self.section_of[id(record)]
+    
+    def get(self, name):
+        """Record for a name that exists in exactly one section"""
+        records = self.by_name.get(name)
+        return records[0] if records and len(records) == 1 else None
+    
+    def lookup(self, payload):
+        """Record for an already validated payload (None if unknown or ambiguous)"""
+        if is_badge_id(payload):
+            key = parse_badge_id(payload)
+            records = self.by_id.get(key) if key else None
+        else:
+            records = self.by_name.get(payload)
+        
+        if not records:
+            return None
+        if len(records) > 1:
+            self.ambiguous_scans += 1
+            if payload not in self.ambiguous_seen:  # Once, not on every frame
+                self.ambiguous_seen.add(payload)
+                sections = ", ".join(self.section_of[id(r)].section for r in records)
+                print(f"⚠️  {payload} is in several sections ({sections}) - use the ID badge")
+            return None
+        return records[0]
+    
+    def match(self, payload):
+        return self.lookup(payload) if self.validate(payload) else None
+    
+    def mark_record(self, record, scan_time):
+        """Mark in the record's own section roster"""
+        self.workbook_of(record).roster.mark_record(record, scan_time)
+        self.scanned.append(record)
+        return record
+    
+    def __len__(self):
+        return len(self.records)
+    
+    @property
+    def existing_present(self):
+        return sum(w.roster.existing_present for w in self.workbooks)
+    
+    @property
+    def new_present(self):
+        return len(self.scanned)
+    
+    @property
+    def total_present(self):
+        return self.existing_present + self.new_present
+    
+    @property
+    def absent(self):
+        return len(self.records) - self.total_present
@@ -0,0 +1,112 @@
+"""
+Dr. Alfredo Pio De Roda ES - Streaming SF2 Reader
+Single-pass, read-only parser shared by the Attendance System and the
+QR Code Generator
+
+SF2 LAYOUT (EXACT Tkinter logic):
+- Rows 1-10: school header, including the "Section" label and value
+- Row 11: day of month for each attendance column
+- Row 12: day letter (M, T, W, TH, F) under each date
+- Row 13+: Column A learner number, Column B learner name,
+  ✓ in the date columns for days already marked present
+
+The sheet is streamed with openpyxl read_only mode and
+iter_rows(values_only=True) - no styles, no cell objects, one sweep.
+The editable workbook is only opened when a mark is actually written
+(see persistence.AutosaveWorker).
+"""
+
+from collections import namedtuple
+
+from openpyxl import load_workbook
+
+try:
+    from .name_filter import is_valid_student_name
+    from .badge_id import find_section
+except ImportError:
+    from name_filter import is_valid_student_name
+    from badge_id import find_section
+
+
+DATE_ROW = 11
+DAY_LETTER_ROW = 12
+FIRST_STUDENT_ROW = 13
+NUMBER_COL = 1  # Column A
+NAME_COL = 2  # Column B
+MARK = "✓"
+
+# One learner row: marks is the set of date columns that already have a ✓
+SF2Student = namedtuple("SF2Student", ["name", "number", "row", "marks"])
+
+# date_columns: day of month -> (column, day letter); section from the header or None
+SF2Data = namedtuple("SF2Data", ["date_columns", "students", "skipped", "section"],
+                     defaults=(None,))
+
+
+def _cell(values, col):
+    """1-based column lookup in a values_only row (rows can be short)"""
+    return values[col - 1] if len(values) >= col else None
+
+
+def parse_rows(rows):
+    """Parse (row_number, values) pairs into SF2Data"""
+    date_columns = {}
+    students = []
+    skipped = []
+    section = None
+    mark_columns = ()
+    
+    for row, values in rows:
+        if row < DATE_ROW:
+            if section is None:
+                section = find_section(values)
+        
+        elif row == DATE_ROW:
+            for col, cell_value in enumerate(values, 1):
+                if cell_value is None:
+                    continue
+                try:
+                    date_num = int(cell_value)
+                except (ValueError, TypeError):
+                    continue
+                date_columns.setdefault(date_num, (col, None))  # First match wins
+        
+        elif row == DAY_LETTER_ROW:
+            date_columns = {day: (col, _cell(values, col))
+                            for day, (col, _) in date_columns.items()}
+        
+        elif row >= FIRST_STUDENT_ROW:
+            if not mark_columns:
+                mark_columns = sorted(col for col, _ in date_columns.values())
+            
+            name_cell = _cell(values, NAME_COL)
+            if not name_cell:
+                continue
+            
+            if not is_valid_student_name(name_cell):
+                skipped.append(name_cell)
+                continue
+            
+            num_cell = _cell(values, NUMBER_COL)
+            student_num = str(num_cell).strip() if num_cell else ""
+            
+            marks = frozenset(col for col in mark_columns
+                              if _is_mark(_cell(values, col)))
+            students.append(SF2Student(name_cell.strip(), student_num, row, marks))
+    
+    return SF2Data(date_columns, students, skipped, section)
+
+
+def _is_mark(value):
+    return bool(value) and str(value).strip() == MARK
+
+
+def read_sf2(file_path):
+    """Stream the active sheet of an SF2 workbook into SF2Data"""
+    workbook = load_workbook(file_path, read_only=True)
+    try:
+        sheet = workbook.active
+        rows = sheet.iter_rows(min_row=1, values_only=True)
+        return parse_rows(enumerate(rows, 1))
+    finally:
+        workbook.close()
@@ -0,0 +1,48 @@
+"""
+Dr. Alfredo Pio De Roda ES - Incremental Table Model
+Row-level updates for toga.Table widgets
+
+Reassigning table.data makes Toga rebuild every row. After the initial
+load we keep a key -> Row map instead, so a scan only appends one row
+or changes one cell (Row attribute changes notify the table of that
+single row).
+"""
+
+
+class IncrementalTable:
+    """A toga.Table whose rows are addressed by one accessor value"""
+    
+    def __init__(self, table, key):
+        self.table = table
+        self.key = key
+        self.rows = {}
+        self.full_rebuilds = 0
+        self.row_updates = 0
+    
+    def reset(self, items):
+        """Full rebuild - reserved for file loads and manual refreshes"""
+        self.table.data = items
+        self.rows = {}
+        for row in self.table.data:
+            self.rows.setdefault(getattr(row, self.key), row)  # First row wins
+        self.full_rebuilds += 1
+    
+    def append(self, item):
+        """Add one row at the end"""
+        row = self.table.data.append(item)
+        if row is None:
+            row = self.table.data[len(self.table.data) - 1]
+        self.rows.setdefault(item[self.key], row)
+        self.row_updates += 1
+        return row
+    
+    def update(self, key, **values):
+        """Change cells of the row with this key; False if there is none"""
+        row = self.rows.get(key)
+        if row is None:
+            return False
+        
+        for accessor, value in values.items():
+            setattr(row, accessor, value)
+        self.row_updates += 1
+        return True
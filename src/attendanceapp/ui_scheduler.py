@@ -0,0 +1,61 @@
+"""
+Dr. Alfredo Pio De Roda ES - UI Refresh Scheduler
+Frame-rate-bounded widget updates on the Toga event loop
+
+Components mark a widget (label, counters, table) as dirty together
+with the function that refreshes it. All dirty widgets are committed
+together at most once per display tick, so a burst of scans costs one
+relayout instead of one per scan. Must be used from the UI loop; other
+threads go through loop.call_soon_threadsafe(scheduler.mark_dirty, ...).
+"""
+
+import time
+
+
+class UiRefreshScheduler:
+    """Coalesce widget refreshes into at most `max_fps` commits per second"""
+    
+    def __init__(self, loop, max_fps=30):
+        self.loop = loop
+        self.interval = 1.0 / max_fps
+        self.dirty = {}  # key -> refresh function (last one wins)
+        self.handle = None
+        self.last_commit = 0.0
+        
+        self.requested = 0
+        self.committed = 0
+        self.ticks = 0
+        self.slowest_tick = 0.0
+    
+    @property
+    def coalesced(self):
+        """Refresh requests that were absorbed by another one in the same tick"""
+        return self.requested - self.committed - len(self.dirty)
+    
+    def mark_dirty(self, key, refresh):
+        """Ask for `refresh()` to run on the next tick"""
+        self.requested += 1
+        self.dirty[key] = refresh
+        if self.handle is None:
+            delay = max(0.0, self.last_commit + self.interval - time.monotonic())
+            self.handle = self.loop.call_later(delay, self._tick)
+    
+    def _tick(self):
+        self.handle = None
+        self.last_commit = time.monotonic()
+        dirty, self.dirty = self.dirty, {}
+        
+        for key, refresh in dirty.items():
+            try:
+                refresh()
+            except Exception as e:
+                print(f"UI refresh error ({key}): {e}")
+            self.committed += 1
+        
+        self.ticks += 1
+        self.slowest_tick = max(self.slowest_tick, time.monotonic() - self.last_commit)
+    
+    def summary(self):
+        return (f"{self.requested} refresh requests -> {self.committed} commits in "
+                f"{self.ticks} ticks ({self.coalesced} coalesced), "
+                f"slowest tick {self.slowest_tick * 1000:.1f} ms")
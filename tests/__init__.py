@@ -0,0 +1,19 @@
+"""
+Tests for the Attendance System
+
+    python -m unittest discover -s tests -t .
+    python -m pytest tests
+
+Everything runs on 127.0.0.1 with temporary files; no camera, workbook
+or Toga needed.
+"""
+
+import sys
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parent.parent / "src" / "attendanceapp"
+
+# The app modules import each other by plain module name when they are
+# not loaded as a package (same as running the app from the sources)
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
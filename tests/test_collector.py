@@ -0,0 +1,205 @@
+"""
+Collector <-> scanner round trips on 127.0.0.1
+
+A real CollectorServer (port 0) records into a RosterIndex through the
+ScanRecorder, the way the app's record_remote_scans does, with the
+journal replaced by an optional injected failure.
+"""
+
+import json
+import socket
+import tempfile
+import time
+import unittest
+import urllib.error
+from pathlib import Path
+
+from tests import APP_DIR  # noqa: F401  (puts the app modules on sys.path)
+from collector import AckLog, CollectorServer, CollectorUnavailable, ScanForwarder, post_json
+from recorder import ScanRecorder, NEW
+from roster import RosterIndex
+
+
+TOKEN = "test-token"
+NAMES = ("SANTOS, JUAN A.", "REYES, MARIA B.", "CRUZ, ANA C.")
+
+
+def wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return condition()
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class FakeCollectorApp:
+    """Roster + recorder behind handle_batch; fail_at makes a batch fail
+    (CollectorUnavailable, like a journal write error) at that scan index"""
+    
+    def __init__(self):
+        self.roster = RosterIndex()
+        for row, name in enumerate(NAMES, start=13):
+            self.roster.add(name, row - 12, row)
+        self.recorder = ScanRecorder(self.roster, rapid_window=0)
+        self.fail_at = None
+        self.failures = 0
+    
+    def handle_batch(self, station, scans, acknowledge):
+        for index, scan in enumerate(scans):
+            if index == self.fail_at:
+                self.fail_at = None
+                self.failures += 1
+                raise CollectorUnavailable("Journal write failed: disk full")
+            acknowledge(scan, self.recorder.record(scan, station))
+
+
+class CollectorTestCase(unittest.TestCase):
+    
+    def setUp(self):
+        self.temp = tempfile.TemporaryDirectory()
+        self.folder = Path(self.temp.name)
+        self.app = FakeCollectorApp()
+        self.collector = None
+        self.forwarders = []
+    
+    def tearDown(self):
+        for forwarder in self.forwarders:
+            forwarder.stop()
+        if self.collector:
+            self.collector.stop()
+        self.temp.cleanup()
+    
+    def start_collector(self, port=0):
+        self.collector = CollectorServer(self.app.handle_batch, port=port, token=TOKEN,
+                                         ack_log=AckLog(self.folder / "collector_acks.jsonl"))
+        self.collector.start()
+        self.url = f"http://127.0.0.1:{self.collector.port}"
+    
+    def forwarder(self, url=None, token=TOKEN, **kwargs):
+        acked = []
+        forwarder = ScanForwarder(url or self.url, self.folder / "forward_buffer.jsonl", "door 2",
+                                  timeout=2.0, max_backoff=0.2, token=token,
+                                  on_ack=acked.extend, **kwargs)
+        self.forwarders.append(forwarder)
+        return forwarder, acked
+    
+    def post(self, scans, token=TOKEN):
+        return post_json(f"{self.url}/scans", {"station": "cli", "scans": scans}, token=token)["results"]
+    
+    @staticmethod
+    def scans(*names):
+        return [{"event_id": f"e{i}", "payload": name, "timestamp": time.time()}
+                for i, name in enumerate(names)]
+    
+    def test_forwarder_round_trip(self):
+        self.start_collector()
+        forwarder, acked = self.forwarder()
+        for name in NAMES:
+            forwarder.submit(name)
+        
+        self.assertTrue(wait_for(lambda: forwarder.acked == len(NAMES)))
+        self.assertEqual([r["status"] for r in acked], [NEW] * len(NAMES))
+        self.assertEqual(self.app.roster.new_present, len(NAMES))
+        self.assertEqual(forwarder.waiting, 0)
+        self.assertTrue(forwarder.online)
+        self.assertEqual((self.folder / "forward_buffer.jsonl").read_text(), "")
+    
+    def test_503_is_retried(self):
+        self.start_collector()
+        self.app.fail_at = 0
+        forwarder, acked = self.forwarder()
+        forwarder.submit(NAMES[0])
+        
+        self.assertTrue(wait_for(lambda: forwarder.acked == 1))
+        self.assertEqual(self.app.failures, 1)
+        self.assertGreaterEqual(forwarder.retries, 1)
+        self.assertEqual([r["status"] for r in acked], [NEW])
+    
+    def test_duplicate_batch_is_acked_once(self):
+        self.start_collector()
+        batch = self.scans(NAMES[0], NAMES[1])
+        first = self.post(batch)
+        again = self.post(batch)
+        
+        self.assertEqual(first, again)
+        self.assertEqual([r["status"] for r in again], [NEW, NEW])
+        self.assertEqual(self.collector.accepted, 2)
+        self.assertEqual(self.collector.duplicates, 2)
+        self.assertEqual(len(self.app.roster.scanned), 2)
+        
+        # The ack log outlives a collector restart
+        self.collector.stop()
+        self.start_collector()
+        self.assertEqual(self.post(batch), first)
+        self.assertEqual(len(self.app.roster.scanned), 2)
+    
+    def test_partial_failure_replays_original_results(self):
+        self.start_collector()
+        self.app.fail_at = 2
+        batch = self.scans(*NAMES)
+        with self.assertRaises(urllib.error.HTTPError) as refused:
+            self.post(batch)
+        self.assertEqual(refused.exception.code, 503)
+        self.assertEqual(len(self.app.roster.scanned), 2)  # Recorded before the failure
+        
+        results = self.post(batch)
+        self.assertEqual([r["status"] for r in results], [NEW, NEW, NEW])
+        self.assertEqual(len(self.app.roster.scanned), 3)
+    
+    def test_bad_token_is_refused(self):
+        self.start_collector()
+        with self.assertRaises(urllib.error.HTTPError) as refused:
+            self.post(self.scans(NAMES[0]), token="wrong")
+        self.assertEqual(refused.exception.code, 401)
+        
+        rejections = []
+        forwarder, acked = self.forwarder(token="wrong",
+                                          on_reject=lambda message, halted: rejections.append(halted))
+        forwarder.submit(NAMES[0])
+        self.assertTrue(wait_for(lambda: rejections))
+        self.assertEqual(rejections, [True])
+        self.assertTrue(forwarder.halted)
+        self.assertEqual(forwarder.waiting, 1)  # Kept for a restart with the right token
+        self.assertEqual(self.app.roster.new_present, 0)
+    
+    def test_bad_batch_is_parked(self):
+        self.start_collector()
+        buffer_path = self.folder / "forward_buffer.jsonl"
+        with open(buffer_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"event_id": "broken", "timestamp": time.time()}) + "\n")  # No payload
+        forwarder, acked = self.forwarder(batch_size=1)
+        forwarder.submit(NAMES[0])
+        
+        self.assertTrue(wait_for(lambda: forwarder.acked == 1))
+        self.assertEqual(forwarder.rejected, 1)
+        self.assertIsNone(forwarder.halted)
+        rejected = [json.loads(line) for line in forwarder.rejected_path.read_text().splitlines()]
+        self.assertEqual([r["status"] for r in rejected], [400])
+        self.assertEqual(rejected[0]["scans"][0]["event_id"], "broken")
+    
+    def test_buffer_survives_restart(self):
+        port = free_port()
+        url = f"http://127.0.0.1:{port}"
+        offline, acked = self.forwarder(url=url)
+        offline.submit(NAMES[0])
+        offline.submit(NAMES[1])
+        self.assertTrue(wait_for(lambda: offline.online is False))
+        offline.stop()
+        self.assertEqual(offline.waiting, 2)
+        
+        self.start_collector(port=port)
+        forwarder, acked = self.forwarder(url=url)
+        self.assertEqual(forwarder.waiting, 2)
+        self.assertTrue(wait_for(lambda: forwarder.acked == 2))
+        self.assertEqual(sorted(r["student"] for r in acked), sorted(NAMES[:2]))
+
+
+if __name__ == '__main__':
+    unittest.main()